@@ -0,0 +1,80 @@
+# checkpoint_journal.py
+# Append-only JSONL journal of completed translation records, plus atomic compaction.
+#
+# Each checkpoint appends only the new records (one JSON object per line), so its
+# cost is proportional to new work. fsync is batched by time; a crash can lose at
+# most the last unsynced records and never corrupts what is already on disk
+# (a torn last line is dropped on load).
+
+import os, json, time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+class CheckpointJournal:
+    def __init__(self, path: Path, fsync_interval: float = 5.0):
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self._f = None
+        self._last_sync = time.monotonic()
+        self._unsynced = 0
+
+    def load(self) -> Dict[str, Dict]:
+        """Return {id: last record}; truncates a torn trailing line so appends stay valid."""
+        records: Dict[str, Dict] = {}
+        if not self.path.exists():
+            return records
+        good_end = 0
+        with self.path.open("rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    break
+                records[rec["id"]] = rec
+                good_end += len(raw)
+        if good_end < self.path.stat().st_size:
+            with self.path.open("r+b") as f:
+                f.truncate(good_end)
+        return records
+
+    def reset(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def append(self, records: Iterable[Dict]):
+        if self._f is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._f = self.path.open("a", encoding="utf-8")
+        for rec in records:
+            self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._unsynced += 1
+        self._f.flush()
+        if self._unsynced and time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        if self._f is not None and self._unsynced:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._f is not None:
+            self.sync()
+            self._f.close()
+            self._f = None
+
+
+def atomic_write_json(path: Path, data: List[Dict], indent: int = 2):
+    """Write to a temp file in the same directory, fsync, then os.replace()."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
@@ -0,0 +1,253 @@
+# extract_all.py
+# Single-pass extraction driver for NaturalRemediesEncyclopedia.pdf.
+#
+# extract_chunks.py, extract_curated_v2.py and extract_diseases_by_system.py each
+# parse overlapping page ranges with pdfplumber. This driver extracts every page
+# needed by any registered parser exactly once (in parallel, see pdf_pages.py),
+# hands each parser the pages of its span and writes all outputs:
+#
+#   principles / herbs / conditions -> structured_extracted.json, en_chunks_curated.json
+#   chunks                          -> en_chunks.json
+#   systems                         -> ../assets/corpus/en/diseases_<system>.json
+#
+# systems writes into the app corpus, so it only runs when asked for with --only,
+# and its items are always merged by id: contentSw, image/imageMeta and
+# sections/sectionsSw added by later stages are kept.
+#
+# Run (from data-pipeline, with venv python):
+#   python extract_all.py [--workers N] [--only chunks systems]
+#   python extract_all.py --layout            # parse from page_layout.npz (built on first use)
+#   python extract_all.py --incremental       # only changed pages/parsers; merge outputs by id
+#   python extract_all.py --profile-json run_profile.json [--cprofile run.prof]
+#
+# Page text comes from one extract_text() call per page (blank pages retried with
+# x_tolerance=1.5), the setting extract_curated_v2 and extract_chunks already used;
+# extract_diseases_by_system.py on its own still uses x/y_tolerance=2.
+#
+# Bump a parser's version= when its logic changes so --incremental re-runs it.
+
+from __future__ import annotations
+import argparse, json
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import extract_chunks as chunks_mod
+import extract_curated_v2 as curated
+import extract_diseases_by_system as systems_mod
+from incremental import CHANGES_PATH, ExtractState, parser_fingerprint, write_merged
+from pdf_pages import extract_page_list, extract_pages, page_count, page_fingerprints
+from stage_profile import RunProfile
+from utils_extract import item_payload
+
+ROOT = curated.ROOT
+PDF_PATH = curated.PDF_PATH
+
+
+@dataclass
+class SectionParser:
+    name: str
+    span: Tuple[int, Optional[int]]                       # book pages, inclusive; None = last page
+    parse: Callable[[List[str], Tuple[int, int]], Any]    # (raw page texts, human span) -> result
+    version: int = 1
+    default: bool = True                                  # part of a run without --only
+
+PARSERS: Dict[str, SectionParser] = {}
+WRITERS: List[Tuple[Tuple[str, ...], Callable[..., Dict[Path, List[Dict]]], bool]] = []   # (parser names, writer(*results) -> {path: items}, always merge)
+
+def register(name: str, span: Tuple[int, Optional[int]], version: int = 1, default: bool = True):
+    def deco(fn):
+        PARSERS[name] = SectionParser(name, span, fn, version, default)
+        return fn
+    return deco
+
+def writes(*names: str, merge: bool = False):
+    def deco(fn):
+        WRITERS.append((names, fn, merge))
+        return fn
+    return deco
+
+def section_text(pages: List[str]) -> str:
+    # same joining as extract_curated_v2.collect_text
+    return curated.clean_text("\n\n".join(curated.clean_text(t) for t in pages))
+
+# ------------------------------ PARSERS ------------------------------
+@register("principles", curated.PRINCIPLES_PAGES)
+def _principles(pages, human):
+    return curated.parse_principles(section_text(pages), human)
+
+@register("herbs", curated.HERBS_PAGES)
+def _herbs(pages, human):
+    return curated.parse_herbs(section_text(pages), human)
+
+@register("conditions", curated.DISEASES_PAGES)
+def _conditions(pages, human):
+    return curated.parse_conditions(section_text(pages), human)
+
+@register("chunks", (1, None))
+def _chunks(pages, human):
+    return chunks_mod.chunk_pages(zip(range(human[0], human[1] + 1), pages))
+
+@register("systems", (systems_mod.START_PAGE, systems_mod.END_PAGE), default=False)
+def _systems(pages, human):
+    return systems_mod.bucket_diseases("\n".join(pages))
+
+# ------------------------------ OUTPUTS ------------------------------
+@writes("principles", "herbs", "conditions")
+def _write_curated(principles, herbs, conditions):
+    structured, chunks = curated.build_outputs([*principles, *herbs, *conditions])
+    return {curated.OUT_STRUCT: structured, curated.OUT_CHUNKS: chunks}
+
+@writes("chunks")
+def _write_chunks(items):
+    return {chunks_mod.OUT_PATH: items}
+
+@writes("systems", merge=True)
+def _write_systems(buckets):
+    return {systems_mod.OUT_DIR / f"diseases_{system}.json": item_payload(items) for system, items in buckets.items()}
+
+# ------------------------------ MAIN ------------------------------
+# helpers called per page / line / item, timed individually with --profile-json
+TIMED_FUNCTIONS = [
+    (curated, ("clean_text", "normalize_bullets", "is_all_caps_heading", "item_to_chunks")),
+    (chunks_mod, ("split_paragraphs", "looks_like_heading")),
+    (systems_mod, ("clean_lines", "chunk_diseases", "detect_system")),
+]
+
+def record_slices(prof: RunProfile, timings: List[Dict]):
+    for t in sorted(timings, key=lambda t: t["pages"]):
+        prof.add("pdf_extract", t["wall_s"], t["cpu_s"], pages=t["pages"], items=t["pages"][1] - t["pages"][0] + 1)
+
+def page_texts_incremental(zspan: Tuple[int, int], state: ExtractState, workers: Optional[int],
+                           prof: RunProfile) -> List[str]:
+    """Extract only pages whose content-stream fingerprint changed; the rest come from the cache."""
+    with prof.stage("fingerprint", pages=(zspan[0] + 1, zspan[1] + 1)) as st:
+        fps = page_fingerprints(PDF_PATH, zspan)
+        st["items"] = len(fps)
+    idx = range(zspan[0], zspan[1] + 1)
+    stale = [i for i, fp in zip(idx, fps) if state.cached_text(i, fp) is None]
+    print(f"Pages {zspan[0]+1} → {zspan[1]+1}: {len(stale)} changed or new, {len(fps) - len(stale)} cached")
+    timings: List[Dict] = []
+    fresh = extract_page_list(PDF_PATH, stale, workers=workers, timings=timings)
+    record_slices(prof, timings)
+    for i, fp in zip(idx, fps):
+        if i in fresh:
+            state.set_page(i, fp, fresh[i])
+    return [state.texts[i] for i in idx]
+
+def run(names: List[str], workers: Optional[int] = None, layout: Optional[Path] = None,
+        state: Optional[ExtractState] = None, prof: Optional[RunProfile] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """Returns (results, names of parsers that actually ran)."""
+    prof = prof or RunProfile("extract_all")
+    dump = None
+    if layout:
+        from page_layout import load_or_build
+        with prof.stage("layout_load"):
+            dump = load_or_build(layout, PDF_PATH, workers)
+        n_pages = dump.last + 1
+    else:
+        assert PDF_PATH.exists(), f"PDF not found: {PDF_PATH}"
+        n_pages = page_count(PDF_PATH)
+    spans = {n: curated.get_page_span(n_pages, PARSERS[n].span) for n in names}
+
+    # one extraction over the union of all spans
+    lo = min(s for s, _ in spans.values())
+    hi = max(e for _, e in spans.values())
+    if dump:
+        texts = dump.texts((lo, hi))
+        if state:
+            for i, t in zip(range(lo, hi + 1), texts):
+                state.set_page(i, "layout", t)
+    elif state:
+        texts = page_texts_incremental((lo, hi), state, workers, prof)
+    else:
+        print(f"Extracting pages {lo+1} → {hi+1} once for: {', '.join(names)}")
+        timings: List[Dict] = []
+        texts = extract_pages(PDF_PATH, (lo, hi), workers=workers, timings=timings)
+        record_slices(prof, timings)
+
+    results: Dict[str, Any] = {}
+    ran: List[str] = []
+    for n in names:
+        s, e = spans[n]
+        parser = PARSERS[n]
+        if state:
+            fp = parser_fingerprint(parser.version, (s, e), state.page_hashes((s, e)))
+            if state.parsers.get(n, {}).get("fp") == fp and n in state.results:
+                results[n] = state.results[n]
+                print(f"  {n:<11} pages {s+1}–{e+1}: unchanged")
+                continue
+        with prof.stage(f"parse:{n}", pages=(s + 1, e + 1)) as st:
+            results[n] = parser.parse(texts[s - lo:e - lo + 1], (s + 1, e + 1))
+            st["items"] = len(results[n])
+        ran.append(n)
+        print(f"  {n:<11} pages {s+1}–{e+1}: {len(results[n])} result(s) in {st['wall_s']:.2f}s")
+        if state:
+            state.parsers[n] = {"version": parser.version, "span": [s + 1, e + 1], "fp": fp}
+            state.results[n] = results[n]
+    return results, ran
+
+def write_all(results: Dict[str, Any], ran: Optional[List[str]] = None, state: Optional[ExtractState] = None,
+              prof: Optional[RunProfile] = None):
+    """Full rewrite, or (with state) merge by id into the outputs of parsers that ran.
+    Writers registered with merge=True always merge by id."""
+    prof = prof or RunProfile("extract_all")
+    changes: Dict[str, Dict[str, List[str]]] = {}
+    for names, fn, merge in WRITERS:
+        if not all(n in results for n in names):
+            continue
+        if state and not any(n in ran for n in names):
+            continue
+        with prof.stage(f"build:{fn.__name__.lstrip('_')}"):
+            outputs = fn(*(results[n] for n in names))
+        for path, items in outputs.items():
+            with prof.stage(f"write:{path.name}", items=len(items)):
+                if state or merge:
+                    changes[str(path)] = ch = write_merged(path, items)
+                    if state:
+                        state.outputs.append(str(path))
+                    print(f"{path}: +{len(ch['added'])} ~{len(ch['updated'])} -{len(ch['removed'])}")
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+                    print(f"Wrote {len(items)} items → {path}")
+    return changes
+
+def main():
+    ap = argparse.ArgumentParser(description="Extract every output from one pass over the PDF")
+    ap.add_argument("--workers", type=int, default=None, help="Extraction processes (default: all cores)")
+    ap.add_argument("--only", nargs="+", choices=list(PARSERS), default=None,
+                    help="Run a subset of parsers (outputs needing other parsers are skipped); "
+                         "systems, which writes into assets/corpus, only runs when named here")
+    ap.add_argument("--layout", nargs="?", type=Path, const=ROOT / "page_layout.npz", default=None,
+                    help="Read pages from a page_layout.py dump instead of the PDF (built if missing)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Re-extract changed pages only, re-run affected parsers and merge outputs by id")
+    ap.add_argument("--profile-json", type=Path, default=None,
+                    help="Write wall/CPU time and item counts per stage and page range to this JSON")
+    ap.add_argument("--cprofile", type=Path, default=None, help="Also dump cProfile stats (snakeviz / flameprof)")
+    args = ap.parse_args()
+
+    names = args.only or [n for n, p in PARSERS.items() if p.default]
+    prof = RunProfile("extract_all", cprofile_path=args.cprofile)
+    if args.profile_json or args.cprofile:
+        for module, fnames in TIMED_FUNCTIONS:
+            prof.time_functions(module, *fnames)
+
+    if not args.incremental:
+        results, _ = run(names, args.workers, args.layout, prof=prof)
+        write_all(results, prof=prof)
+    else:
+        state = ExtractState()
+        results, ran = run(names, args.workers, args.layout, state, prof)
+        changes = write_all(results, ran, state, prof)
+        with prof.stage("save_state"):
+            state.save()
+        CHANGES_PATH.write_text(json.dumps(changes, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"{len(ran)} parser(s) re-ran; change set → {CHANGES_PATH}")
+
+    if args.profile_json or args.cprofile:
+        prof.write(args.profile_json)
+
+if __name__ == "__main__":
+    main()
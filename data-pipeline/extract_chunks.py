@@ -2,15 +2,24 @@
 # Purpose: Convert the Natural Remedies PDF into JSON "chunks" suitable for the app.
 # Run inside your venv:
 #   python extract_chunks.py
+#   python extract_chunks.py --jsonl     # stream en_chunks.jsonl page by page (bounded memory)
+#
+# --jsonl ids are stable per page ("p{page}-{n:03d}"), so re-extracting one page
+# never renumbers the rest. Readers: tools/chunk_io.iter_chunks (follow=True
+# consumes the file while extraction is still running).
 
-import json, re, textwrap
+import argparse, json, re, sys, textwrap
 from pathlib import Path
 import pdfplumber
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from chunk_io import ChunkWriter
+
 # Resolve paths relative to THIS file's folder (no backslash escaping needed)
 ROOT = Path(__file__).parent
 PDF_PATH = ROOT / "NaturalRemediesEncyclopedia.pdf"   # your local copy
 OUT_PATH = ROOT / "en_chunks.json"
+OUT_JSONL = ROOT / "en_chunks.jsonl"
 MIN_PARA_LEN = 160
 CHUNK_WIDTH = 600
 SOURCE_NAME = "Natural Remedies Encyclopedia (PDF)"
@@ -39,53 +48,85 @@ def split_paragraphs(page_text: str):
         raw = re.split(r"(?<=\.)\s+(?=[A-Z])", page_text)
     return [clean(p) for p in raw if clean(p)]
 
+def iter_chunk_pages(pages, stable_ids: bool = True):
+    """pages: iterable of (pageno, page text), in book order. Yields chunks as pages arrive."""
+    n = 0
+    current_section = "General"
+
+    for pageno, text in pages:
+        if not text.strip():
+            continue
+
+        # Keep original line breaks for heading detection
+        lines = [clean(l) for l in text.splitlines() if clean(l)]
+        # Mark headings we see on the page
+        for ln in lines[:5]:  # headings tend to be near the top
+            if looks_like_heading(ln):
+                current_section = ln.title()
+                break
+
+        # Recompose paragraphs and chunk
+        paragraphs = split_paragraphs(text)
+        k = 0
+        for para in paragraphs:
+            if len(para) < MIN_PARA_LEN:
+                continue
+            for chunk in textwrap.wrap(
+                para,
+                width=CHUNK_WIDTH,
+                replace_whitespace=False,
+                break_long_words=False,
+                break_on_hyphens=False,
+            ):
+                yield {
+                    "id": f"p{pageno}-{k:03d}" if stable_ids else f"p{pageno}-{n:06d}",
+                    "type": "chunk",
+                    "title": current_section,
+                    "section": "Body",
+                    "content_en": chunk,
+                    "content_sw": None,
+                    "lang_original": "en",
+                    "translation_status": "original",
+                    "tags": [],
+                    "source": SOURCE_NAME,
+                    "page_range": [pageno, pageno],
+                }
+                k += 1
+                n += 1
+
+def chunk_pages(pages) -> list:
+    # en_chunks.json keeps its book-wide counter ids
+    return list(iter_chunk_pages(pages, stable_ids=False))
+
+def iter_pdf_pages(pdf):
+    for pageno, page in enumerate(pdf.pages, start=1):
+        yield pageno, page.extract_text() or ""
+        close = getattr(page, "close", None)   # drop the page's layout objects
+        if close:
+            close()
+
+def write_chunks(items, out_path: Path = OUT_PATH):
+    out_path.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Wrote {len(items)} chunks → {out_path.resolve()}")
+
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jsonl", nargs="?", type=Path, const=OUT_JSONL, default=None,
+                    help="Stream chunks to JSONL with stable per-page ids (default path: en_chunks.jsonl)")
+    args = ap.parse_args()
+
     assert PDF_PATH.exists(), f"PDF not found: {PDF_PATH.resolve()}"
-    items = []
-    current_section = "General"
 
     with pdfplumber.open(PDF_PATH) as pdf:
-        for pageno, page in enumerate(pdf.pages, start=1):
-            text = page.extract_text() or ""
-            if not text.strip():
-                continue
+        if args.jsonl:
+            with ChunkWriter(args.jsonl) as w:
+                for item in iter_chunk_pages(iter_pdf_pages(pdf)):
+                    w.write(item)
+            print(f"Wrote {w.count} chunks → {args.jsonl.resolve()}")
+            return
+        items = chunk_pages(iter_pdf_pages(pdf))
 
-            # Keep original line breaks for heading detection
-            lines = [clean(l) for l in text.splitlines() if clean(l)]
-            # Mark headings we see on the page
-            for ln in lines[:5]:  # headings tend to be near the top
-                if looks_like_heading(ln):
-                    current_section = ln.title()
-                    break
-
-            # Recompose paragraphs and chunk
-            paragraphs = split_paragraphs(text)
-            for para in paragraphs:
-                if len(para) < MIN_PARA_LEN:
-                    continue
-                for chunk in textwrap.wrap(
-                    para,
-                    width=CHUNK_WIDTH,
-                    replace_whitespace=False,
-                    break_long_words=False,
-                    break_on_hyphens=False,
-                ):
-                    items.append({
-                        "id": f"p{pageno}-{len(items):06d}",
-                        "type": "chunk",
-                        "title": current_section,
-                        "section": "Body",
-                        "content_en": chunk,
-                        "content_sw": None,
-                        "lang_original": "en",
-                        "translation_status": "original",
-                        "tags": [],
-                        "source": SOURCE_NAME,
-                        "page_range": [pageno, pageno],
-                    })
-
-    OUT_PATH.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Wrote {len(items)} chunks → {OUT_PATH.resolve()}")
+    write_chunks(items)
 
 if __name__ == "__main__":
     main()
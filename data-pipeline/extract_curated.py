@@ -11,12 +11,15 @@
 # Requires: pdfplumber (with matching pdfminer.six), Pillow
 
 from __future__ import annotations
-import re, json, textwrap
+import re, json, sys, textwrap
 from dataclasses import dataclass, asdict, field
 from typing import List, Dict, Tuple
 from pathlib import Path
 import pdfplumber
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from section_heuristics import HeadingClassifier
+
 ROOT = Path(__file__).parent
 PDF_PATH = ROOT / "NaturalRemediesEncyclopedia.pdf"   # ensure this filename
 OUT_STRUCT = ROOT / "structured_extracted.json"
@@ -43,7 +46,7 @@ SUBSECTION_KEYS = [
     "HOW TO USE", "CAUTIONS", "WARNING", "PREVENTION", "PROGNOSIS",
     "NOTES", "OVERVIEW"
 ]
-SUB_RE = re.compile(rf"^\s*({'|'.join(map(re.escape, SUBSECTION_KEYS))})\s*[:\-–—]?\s*$", re.I)
+SUB_HEADINGS = HeadingClassifier({k: [k] for k in SUBSECTION_KEYS}, markers=False, inline=False)
 
 def to_zero_based_span(pdf: pdfplumber.PDF, human_span: Tuple[int,int|None]) -> Tuple[int,int]:
     start, end = human_span
@@ -137,11 +140,12 @@ def split_subsections(body: str) -> Dict[str,str]:
     blocks = []
     buf, current = [], "overview"
     for ln in body.splitlines():
-        if SUB_RE.match(ln.strip()):
+        sub = SUB_HEADINGS.classify(ln)
+        if sub:
             # start new block
             if buf:
                 blocks.append((current.lower(), clean_text("\n".join(buf))))
-            current = SUB_RE.match(ln.strip()).group(1).upper()
+            current = sub
             buf = []
         else:
             buf.append(ln)
@@ -9,14 +9,17 @@
 #   en_chunks_curated.json
 #
 # Run (from data-pipeline, with venv python):
-#   python extract_curated_v2.py
+#   python extract_curated_v2.py [--workers N]
 
 from __future__ import annotations
-import re, json, textwrap
+import re, json, sys, textwrap, argparse
 from dataclasses import dataclass, field, asdict
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
-import pdfplumber
+from pdf_pages import extract_pages, page_count
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from section_heuristics import HeadingClassifier
 
 ROOT = Path(__file__).parent
 PDF_PATH = ROOT / "NaturalRemediesEncyclopedia.pdf"
@@ -40,7 +43,8 @@ SUB_KEYS = [
     "DIET", "HYDROTHERAPY", "USES", "PREPARATION", "PREPARATIONS",
     "CAUTIONS", "WARNING", "NOTES", "OVERVIEW", "PREVENTION", "PROGNOSIS"
 ]
-SUB_RE = re.compile(rf"^\s*({'|'.join(map(re.escape, SUB_KEYS))})\s*[:\-–—]?\s*$", re.I)
+# whole-line labels, e.g. "Symptoms:" / "TREATMENT —"; classify() returns the SUB_KEYS entry
+SUB_HEADINGS = HeadingClassifier({k: [k] for k in SUB_KEYS}, markers=False, inline=False)
 
 # Helpers to avoid false headings like "SECTION", "PART", etc.
 NOISE_HEAD_RE = re.compile(r"^(SECTION|PART|CHAPTER|BASIC PRINCIPLES|THE MOST IMPORTANT HERBS)\b", re.I)
@@ -55,23 +59,16 @@ def clean_text(s: str) -> str:
     s = re.sub(r"[ \t]{2,}", " ", s)
     return s.strip()
 
-def get_page_span(pdf: pdfplumber.PDF, span: Tuple[int, Optional[int]]) -> Tuple[int, int]:
+def get_page_span(n: int, span: Tuple[int, Optional[int]]) -> Tuple[int, int]:
     start, end = span
-    n = len(pdf.pages)
     end = n if end is None else end
     start = max(1, start); end = min(n, end)
     return (start-1, end-1)  # zero-based inclusive
 
-def page_text(pdf: pdfplumber.PDF, idx: int) -> str:
-    page = pdf.pages[idx]
-    txt = page.extract_text() or ""
-    if not txt.strip():
-        txt = page.extract_text(x_tolerance=1.5) or ""
-    return clean_text(txt)
-
-def collect_text(pdf, zspan: Tuple[int,int]) -> str:
-    s, e = zspan
-    return clean_text("\n\n".join(page_text(pdf, i) for i in range(s, e+1)))
+def collect_text(pdf_path: Path, zspan: Tuple[int,int], workers: Optional[int] = None) -> str:
+    # pages are extracted in parallel (blank pages retried with x_tolerance=1.5), in order
+    pages = extract_pages(pdf_path, zspan, workers=workers)
+    return clean_text("\n\n".join(clean_text(t) for t in pages))
 
 def is_all_caps_heading(line: str) -> bool:
     t = line.strip()
@@ -223,11 +220,11 @@ def parse_herbs(text: str, human_pages: Tuple[int,int]) -> List[Item]:
         segs = []
         buf, label = [], "overview"
         for raw in block.splitlines():
-            m = SUB_RE.match(raw.strip())
-            if m:
+            sub = SUB_HEADINGS.classify(raw)
+            if sub:
                 if buf:
                     segs.append((label.lower(), "\n".join(buf).strip()))
-                label = m.group(1).upper()
+                label = sub
                 buf = []
             else:
                 buf.append(raw)
@@ -327,11 +324,10 @@ def parse_conditions(text: str, human_pages: Tuple[int,int]) -> List[Item]:
             cur_sections, cur_label, buf = {}, "overview", []
             continue
         # New subsection?
-        m = SUB_RE.match(ln)
-        if m and cur_title:
+        lbl = SUB_HEADINGS.classify(ln)
+        if lbl and cur_title:
             if buf:
                 cur_sections.setdefault(cur_label, []).append("\n".join(buf).strip())
-            lbl = m.group(1).upper()
             lbl = {"TREATMENTS":"TREATMENT","REMEDIES":"TREATMENT","PREPARATIONS":"PREPARATION"}.get(lbl, lbl)
             cur_label = lbl.lower()
             buf = []
@@ -345,32 +341,36 @@ def parse_conditions(text: str, human_pages: Tuple[int,int]) -> List[Item]:
 
 # ------------------------------ MAIN ------------------------------
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=None, help="Extraction processes (default: all cores)")
+    args = ap.parse_args()
+
     assert PDF_PATH.exists(), f"PDF not found: {PDF_PATH}"
 
-    with pdfplumber.open(str(PDF_PATH)) as pdf:
-        p_span = get_page_span(pdf, PRINCIPLES_PAGES)
-        h_span = get_page_span(pdf, HERBS_PAGES)
-        d_span = get_page_span(pdf, DISEASES_PAGES)
+    n_pages = page_count(PDF_PATH)
+    p_span = get_page_span(n_pages, PRINCIPLES_PAGES)
+    h_span = get_page_span(n_pages, HERBS_PAGES)
+    d_span = get_page_span(n_pages, DISEASES_PAGES)
 
-        print("Extracting Principles:", p_span[0]+1, "→", p_span[1]+1)
-        principles_txt = collect_text(pdf, p_span)
-        principles = parse_principles(principles_txt, (p_span[0]+1, p_span[1]+1))
+    print("Extracting Principles:", p_span[0]+1, "→", p_span[1]+1)
+    principles_txt = collect_text(PDF_PATH, p_span, args.workers)
+    principles = parse_principles(principles_txt, (p_span[0]+1, p_span[1]+1))
 
-        print("Extracting Herbs:", h_span[0]+1, "→", h_span[1]+1)
-        herbs_txt = collect_text(pdf, h_span)
-        herbs = parse_herbs(herbs_txt, (h_span[0]+1, h_span[1]+1))
+    print("Extracting Herbs:", h_span[0]+1, "→", h_span[1]+1)
+    herbs_txt = collect_text(PDF_PATH, h_span, args.workers)
+    herbs = parse_herbs(herbs_txt, (h_span[0]+1, h_span[1]+1))
 
-        print("Extracting Conditions:", d_span[0]+1, "→", d_span[1]+1)
-        cond_txt = collect_text(pdf, d_span)
-        conditions = parse_conditions(cond_txt, (d_span[0]+1, d_span[1]+1))
+    print("Extracting Conditions:", d_span[0]+1, "→", d_span[1]+1)
+    cond_txt = collect_text(PDF_PATH, d_span, args.workers)
+    conditions = parse_conditions(cond_txt, (d_span[0]+1, d_span[1]+1))
 
-    items: List[Item] = [*principles, *herbs, *conditions]
+    write_outputs([*principles, *herbs, *conditions])
 
-    # Write hierarchical
+def build_outputs(items: List[Item]) -> Tuple[List[Dict], List[Dict]]:
+    # Hierarchical
     structured = [asdict(it) for it in items if any(it.fields.values())]
-    OUT_STRUCT.write_text(json.dumps(structured, ensure_ascii=False, indent=2), encoding="utf-8")
 
-    # Write chunks
+    # Chunks
     chunks: List[Dict] = []
     for it in items:
         chunks.extend(item_to_chunks(it))
@@ -385,11 +385,15 @@ def main():
             continue
         seen.add(c["id"])
         curated.append(c)
+    return structured, curated
 
-    OUT_CHUNKS.write_text(json.dumps(curated, ensure_ascii=False, indent=2), encoding="utf-8")
+def write_outputs(items: List[Item], out_struct: Path = OUT_STRUCT, out_chunks: Path = OUT_CHUNKS):
+    structured, curated = build_outputs(items)
+    out_struct.write_text(json.dumps(structured, ensure_ascii=False, indent=2), encoding="utf-8")
+    out_chunks.write_text(json.dumps(curated, ensure_ascii=False, indent=2), encoding="utf-8")
 
-    print(f"Wrote {len(structured)} items → {OUT_STRUCT}")
-    print(f"Wrote {len(curated)} curated chunks → {OUT_CHUNKS}")
+    print(f"Wrote {len(structured)} items → {out_struct}")
+    print(f"Wrote {len(curated)} curated chunks → {out_chunks}")
 
 if __name__ == "__main__":
     main()
@@ -94,12 +94,7 @@ def chunk_diseases(lines: list[str]):
     flush()
     return entries
 
-def main():
-    with pdfplumber.open(PDF) as pdf:
-        start_idx = START_PAGE - 1
-        pages = pdf.pages[start_idx : (END_PAGE-1 if END_PAGE else None)]
-        text = "\n".join(p.extract_text(x_tolerance=2, y_tolerance=2) or "" for p in pages)
-
+def bucket_diseases(text: str) -> dict:
     lines = clean_lines(text)
     entries = chunk_diseases(lines)
 
@@ -113,12 +108,21 @@ def main():
             "title": e["title"],
             "contentEn": e["contentEn"]
         })
+    return buckets
 
-    # write each bucket
+def write_buckets(buckets: dict, out_dir: Path = OUT_DIR):
     for system, items in buckets.items():
-        out = OUT_DIR / f"diseases_{system}.json"
+        out = out_dir / f"diseases_{system}.json"
         write_items(items, out)
         print(f"{system:16s} → {len(items):3d} items → {out}")
 
+def main():
+    with pdfplumber.open(PDF) as pdf:
+        start_idx = START_PAGE - 1
+        pages = pdf.pages[start_idx : (END_PAGE-1 if END_PAGE else None)]
+        text = "\n".join(p.extract_text(x_tolerance=2, y_tolerance=2) or "" for p in pages)
+
+    write_buckets(bucket_diseases(text))
+
 if __name__ == "__main__":
     main()
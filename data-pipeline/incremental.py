@@ -0,0 +1,120 @@
+# incremental.py
+# State for incremental re-extraction (extract_all.py --incremental).
+#
+# extract_state.json (next to the outputs) holds, per PDF page, a fingerprint of
+# its raw content streams and a hash of its extracted text, and per parser its
+# version, page span and a fingerprint over the text hashes of that span.
+# extract_cache.pkl holds the page texts and the last result of each parser, so
+# a re-run only extracts pages whose content changed and only re-runs parsers
+# whose pages, span or version changed. Outputs are merged by id: unchanged items
+# are kept as they are on disk (including fields filled in later, e.g. contentSw),
+# and the per-file change set is written to extract_changes.json.
+
+from __future__ import annotations
+import hashlib, json, os, pickle
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).parent
+STATE_PATH = ROOT / "extract_state.json"
+CACHE_PATH = ROOT / "extract_cache.pkl"
+CHANGES_PATH = ROOT / "extract_changes.json"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def parser_fingerprint(version: int, zspan: Tuple[int, int], page_hashes: List[str]) -> str:
+    h = hashlib.sha1(f"{version}|{zspan[0]}|{zspan[1]}".encode())
+    for ph in page_hashes:
+        h.update(ph.encode())
+    return h.hexdigest()
+
+
+class ExtractState:
+    def __init__(self, state_path: Path = STATE_PATH, cache_path: Path = CACHE_PATH):
+        self.state_path, self.cache_path = state_path, cache_path
+        self.pages: Dict[str, Dict[str, str]] = {}     # "pageno" -> {"fp": content sha1, "sha": text sha1}
+        self.parsers: Dict[str, Dict[str, Any]] = {}   # name -> {"version", "span", "fp"}
+        self.outputs: List[str] = []
+        self.texts: Dict[int, str] = {}                # zero-based index -> text
+        self.results: Dict[str, Any] = {}
+        if state_path.exists():
+            st = json.loads(state_path.read_text(encoding="utf-8"))
+            self.pages, self.parsers, self.outputs = st.get("pages", {}), st.get("parsers", {}), st.get("outputs", [])
+        if cache_path.exists():
+            try:
+                with cache_path.open("rb") as f:
+                    cache = pickle.load(f)
+                self.texts, self.results = cache["texts"], cache["results"]
+            except Exception as e:   # stale or torn cache: everything is re-extracted
+                print(f"Ignoring unreadable {cache_path.name}: {e}")
+                self.pages, self.parsers = {}, {}
+
+    def cached_text(self, idx: int, fp: str):
+        """Cached text of page idx if its content fingerprint is unchanged, else None."""
+        rec = self.pages.get(str(idx + 1))
+        if rec and rec.get("fp") == fp and idx in self.texts:
+            return self.texts[idx]
+        return None
+
+    def set_page(self, idx: int, fp: str, text: str):
+        self.pages[str(idx + 1)] = {"fp": fp, "sha": text_hash(text)}
+        self.texts[idx] = text
+
+    def page_hashes(self, zspan: Tuple[int, int]) -> List[str]:
+        return [self.pages.get(str(i + 1), {}).get("sha") or text_hash(self.texts.get(i, "")) for i in range(zspan[0], zspan[1] + 1)]
+
+    def save(self):
+        atomic_write(self.state_path, json.dumps(
+            {"pages": self.pages, "parsers": self.parsers, "outputs": sorted(set(self.outputs))}, indent=2).encode("utf-8"))
+        atomic_write(self.cache_path, pickle.dumps({"texts": self.texts, "results": self.results}, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def atomic_write(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def merge_by_id(old: List[Dict], new: List[Dict]) -> Tuple[List[Dict], Dict[str, List[str]]]:
+    """New item order; unchanged items keep their on-disk form, changed ones keep extra keys from disk
+    (and their on-disk value wherever the new item has None, e.g. contentSw from item_payload)."""
+    new = json.loads(json.dumps(new, ensure_ascii=False))   # tuples -> lists, like the file
+    by_key = dict(zip(_keys(old), old))   # repeated ids are paired by occurrence
+    merged, changes = [], {"added": [], "updated": [], "removed": []}
+    new_keys = _keys(new)
+    for key, it in zip(new_keys, new):
+        prev = by_key.get(key)
+        if prev is None:
+            changes["added"].append(it["id"])
+            merged.append(it)
+        elif all(prev.get(k) == v for k, v in it.items() if v is not None):
+            merged.append(prev)
+        else:
+            changes["updated"].append(it["id"])
+            merged.append({**{k: v for k, v in prev.items() if k not in it},
+                           **{k: prev.get(k) if v is None else v for k, v in it.items()}})
+    seen = set(new_keys)
+    changes["removed"] = [k[0] for k in by_key if k not in seen]
+    return merged, changes
+
+def _keys(items: List[Dict]) -> List[Tuple[Any, int]]:
+    n: Dict[Any, int] = {}
+    out = []
+    for it in items:
+        i = it.get("id")
+        n[i] = n.get(i, -1) + 1
+        out.append((i, n[i]))
+    return out
+
+def write_merged(path: Path, payload: List[Dict]) -> Dict[str, List[str]]:
+    old = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+    merged, changes = merge_by_id(old, payload)
+    if any(changes.values()) or not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, json.dumps(merged, ensure_ascii=False, indent=2).encode("utf-8"))
+    return changes
@@ -0,0 +1,209 @@
+# page_layout.py
+# One-time page layout dump of NaturalRemediesEncyclopedia.pdf.
+#
+# Stores, per page, the extract_text() output plus every word and line with
+# font name, size and bbox in one columnar .npz (strings as a UTF-8 blob with
+# offsets, fonts as indices into a font table). Loading takes milliseconds, so
+# parsers (extract_all.py --layout) can be re-run without pdfplumber, and
+# font-size based heading detection is a numpy comparison.
+#
+# Run (from data-pipeline, with venv python):
+#   python page_layout.py build [--workers N]          # full parse, once
+#   python page_layout.py headings --pages 180 190     # lines set larger than body text
+#   python page_layout.py info
+
+from __future__ import annotations
+import argparse, time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).parent
+PDF_PATH = ROOT / "NaturalRemediesEncyclopedia.pdf"
+LAYOUT_PATH = ROOT / "page_layout.npz"
+
+FORMAT_VERSION = 1
+LINE_Y_TOLERANCE = 3.0   # words whose tops differ by less than this share a line (pdfplumber's default)
+
+COORDS = ("x0", "x1", "top", "bottom")
+
+
+class Line(NamedTuple):
+    text: str
+    x0: float
+    x1: float
+    top: float
+    bottom: float
+    fontname: str
+    size: float
+
+
+# ------------------------------ encoding ------------------------------
+def _pack_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    data = [s.encode("utf-8") for s in strings]
+    off = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in data], out=off[1:])
+    return np.frombuffer(b"".join(data), dtype=np.uint8), off
+
+def _unpack(blob: np.ndarray, off: np.ndarray, i: int) -> str:
+    return blob[off[i]:off[i + 1]].tobytes().decode("utf-8")
+
+def group_lines(words: List[Tuple]) -> List[List[Tuple]]:
+    """Cluster words (text, x0, x1, top, bottom, fontname, size) into reading-order lines."""
+    lines: List[List[Tuple]] = []
+    for w in sorted(words, key=lambda w: (w[3], w[1])):
+        if lines and abs(w[3] - lines[-1][0][3]) <= LINE_Y_TOLERANCE:
+            lines[-1].append(w)
+        else:
+            lines.append([w])
+    return [sorted(ln, key=lambda w: w[1]) for ln in lines]
+
+def encode(pages: List[Dict], first: int, source: str) -> Dict[str, np.ndarray]:
+    fonts: Dict[str, int] = {}
+    words, lines, word_page_off, line_page_off = [], [], [0], [0]
+
+    for page in pages:
+        for ln in group_lines(page["words"]):
+            words.extend(ln)
+            sizes = [w[6] for w in ln]
+            main = max(ln, key=lambda w: len(w[0]))   # font of the longest word
+            lines.append((" ".join(w[0] for w in ln), min(w[1] for w in ln), max(w[2] for w in ln),
+                          min(w[3] for w in ln), max(w[4] for w in ln), main[5], max(sizes)))
+        word_page_off.append(len(words))
+        line_page_off.append(len(lines))
+
+    arrays: Dict[str, np.ndarray] = {
+        "version": np.array(FORMAT_VERSION),
+        "first_page": np.array(first),
+        "source": np.array(source),
+    }
+    arrays["page_text"], arrays["page_text_off"] = _pack_strings([p["text"] for p in pages])
+    for prefix, rows, page_off in (("word", words, word_page_off), ("line", lines, line_page_off)):
+        arrays[f"{prefix}_text"], arrays[f"{prefix}_text_off"] = _pack_strings([r[0] for r in rows])
+        for k, name in enumerate(COORDS, start=1):
+            arrays[f"{prefix}_{name}"] = np.array([r[k] for r in rows], dtype=np.float32)
+        arrays[f"{prefix}_font"] = np.array([fonts.setdefault(r[5], len(fonts)) for r in rows], dtype=np.uint16)
+        arrays[f"{prefix}_size"] = np.array([r[6] for r in rows], dtype=np.float32)
+        arrays[f"{prefix}_page_off"] = np.array(page_off, dtype=np.int64)
+    arrays["fonts"] = np.array(list(fonts) or [""])
+    return arrays
+
+
+# ------------------------------ reading ------------------------------
+class LayoutDump:
+    """Page layout read back from page_layout.npz. Page indices are zero-based PDF indices."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        if int(arrays["version"]) != FORMAT_VERSION:
+            raise ValueError(f"layout dump version {int(arrays['version'])}, expected {FORMAT_VERSION}; rebuild it")
+        self.a = arrays
+        self.first = int(arrays["first_page"])
+        self.n_pages = len(arrays["page_text_off"]) - 1
+        self.fonts = [str(f) for f in arrays["fonts"]]
+
+    @classmethod
+    def load(cls, path: Path = LAYOUT_PATH) -> "LayoutDump":
+        with np.load(path, allow_pickle=False) as z:
+            return cls({k: z[k] for k in z.files})
+
+    @property
+    def last(self) -> int:
+        return self.first + self.n_pages - 1
+
+    def _rel(self, idx: int) -> int:
+        if not self.first <= idx <= self.last:
+            raise IndexError(f"page {idx + 1} not in dump (pages {self.first + 1}–{self.last + 1})")
+        return idx - self.first
+
+    def page_text(self, idx: int) -> str:
+        return _unpack(self.a["page_text"], self.a["page_text_off"], self._rel(idx))
+
+    def texts(self, zspan: Tuple[int, int]) -> List[str]:
+        return [self.page_text(i) for i in range(zspan[0], zspan[1] + 1)]
+
+    def _rows(self, prefix: str, idx: int) -> Tuple[int, int]:
+        off = self.a[f"{prefix}_page_off"]
+        r = self._rel(idx)
+        return int(off[r]), int(off[r + 1])
+
+    def columns(self, prefix: str, idx: int) -> Dict[str, np.ndarray]:
+        """Numeric columns (x0, x1, top, bottom, font, size) of a page's words or lines."""
+        s, e = self._rows(prefix, idx)
+        return {k: self.a[f"{prefix}_{k}"][s:e] for k in (*COORDS, "font", "size")}
+
+    def _records(self, prefix: str, idx: int) -> List[Line]:
+        s, e = self._rows(prefix, idx)
+        a, blob, off = self.a, self.a[f"{prefix}_text"], self.a[f"{prefix}_text_off"]
+        return [Line(_unpack(blob, off, i), *(float(a[f"{prefix}_{k}"][i]) for k in COORDS),
+                     self.fonts[a[f"{prefix}_font"][i]], float(a[f"{prefix}_size"][i]))
+                for i in range(s, e)]
+
+    def words(self, idx: int) -> List[Line]:
+        return self._records("word", idx)
+
+    def lines(self, idx: int) -> List[Line]:
+        return self._records("line", idx)
+
+    def body_size(self, idx: int) -> float:
+        sizes = self.columns("word", idx)["size"]
+        return float(np.median(sizes)) if len(sizes) else 0.0
+
+    def heading_lines(self, idx: int, ratio: float = 1.15) -> List[Line]:
+        """Lines set at least `ratio` times larger than the page's median word size."""
+        cols = self.columns("line", idx)
+        keep = np.nonzero(cols["size"] >= self.body_size(idx) * ratio)[0]
+        lines = self.lines(idx) if len(keep) else []
+        return [lines[i] for i in keep]
+
+
+def build(pdf_path: Path = PDF_PATH, out: Path = LAYOUT_PATH, zspan: Optional[Tuple[int, int]] = None,
+          workers: Optional[int] = None) -> LayoutDump:
+    from pdf_pages import extract_layout, page_count
+
+    assert pdf_path.exists(), f"PDF not found: {pdf_path}"
+    if zspan is None:
+        zspan = (0, page_count(pdf_path) - 1)
+    pages = extract_layout(pdf_path, zspan, workers=workers)
+    arrays = encode(pages, zspan[0], pdf_path.name)
+    np.savez(out, **arrays)
+    print(f"Wrote {out} ({out.stat().st_size / 1e6:.1f} MB, {len(pages)} pages, "
+          f"{len(arrays['word_x0'])} words, {len(arrays['line_x0'])} lines)")
+    return LayoutDump(arrays)
+
+def load_or_build(path: Path = LAYOUT_PATH, pdf_path: Path = PDF_PATH, workers: Optional[int] = None) -> LayoutDump:
+    if path.exists():
+        t0 = time.perf_counter()
+        dump = LayoutDump.load(path)
+        print(f"Loaded {path.name}: pages {dump.first + 1}–{dump.last + 1} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        return dump
+    return build(pdf_path, path, workers=workers)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Columnar page layout dump")
+    ap.add_argument("--layout", type=Path, default=LAYOUT_PATH)
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="Parse the PDF once and write the dump")
+    p.add_argument("--workers", type=int, default=None)
+    p = sub.add_parser("headings", help="Lines set larger than body text, per page")
+    p.add_argument("--pages", type=int, nargs=2, metavar=("FIRST", "LAST"), required=True, help="Book pages, inclusive")
+    p.add_argument("--ratio", type=float, default=1.15)
+    sub.add_parser("info", help="Dump summary and load time")
+    args = ap.parse_args()
+
+    if args.command == "build":
+        build(out=args.layout, workers=args.workers)
+        return
+
+    dump = load_or_build(args.layout)
+    if args.command == "info":
+        print(f"pages {dump.first + 1}–{dump.last + 1} | {len(dump.a['word_x0'])} words | "
+              f"{len(dump.a['line_x0'])} lines | {len(dump.fonts)} fonts")
+    else:
+        for idx in range(args.pages[0] - 1, args.pages[1]):
+            for ln in dump.heading_lines(idx, args.ratio):
+                print(f"p{idx + 1:<4} {ln.size:5.1f} {ln.fontname:<28} {ln.text}")
+
+if __name__ == "__main__":
+    main()
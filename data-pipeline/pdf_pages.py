@@ -0,0 +1,160 @@
+# pdf_pages.py
+# Parallel per-page PDF text extraction.
+#
+# pdfminer layout analysis is CPU bound and per page, so page ranges are split
+# into contiguous slices and handed to worker processes; each worker opens the
+# PDF once (pool initializer) and extracts its slices. Results come back in page
+# order. The per-page fallback is kept: a page whose text is blank is extracted
+# again with a tighter x_tolerance.
+#
+#   texts = extract_pages(PDF_PATH, (179, 420), workers=8)   # zero-based, inclusive
+#   pages = extract_layout(PDF_PATH, (0, 420))                # text + words with font/size/bbox
+#   texts = extract_page_list(PDF_PATH, [12, 13, 200])        # {idx: text}, scattered pages
+#   fps   = page_fingerprints(PDF_PATH, (0, 420))             # content-stream hashes, no layout
+
+import os, time, hashlib
+import multiprocessing as mp
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_FALLBACK = {"x_tolerance": 1.5}
+
+_W: Dict = {}
+
+
+def _init_worker(pdf_path: str, extract_kwargs: Optional[Dict], fallback_kwargs: Optional[Dict], layout: bool = False):
+    import pdfplumber
+
+    _W["pdf"] = pdfplumber.open(pdf_path)
+    _W["extract"] = extract_kwargs or {}
+    _W["fallback"] = fallback_kwargs
+    _W["layout"] = layout
+
+
+def _text(page) -> str:
+    txt = page.extract_text(**_W["extract"]) or ""
+    if not txt.strip() and _W["fallback"] is not None:
+        txt = page.extract_text(**_W["fallback"]) or ""
+    return txt
+
+
+def _page(idx: int):
+    page = _W["pdf"].pages[idx]
+    out = _text(page)
+    if _W["layout"]:
+        words = page.extract_words(extra_attrs=["fontname", "size"], **_W["extract"])
+        out = {
+            "text": out,
+            "words": [(w["text"], w["x0"], w["x1"], w["top"], w["bottom"], w["fontname"], w["size"]) for w in words],
+        }
+    close = getattr(page, "close", None)  # drop cached layout objects (pdfplumber >= 0.10)
+    if close:
+        close()
+    return out
+
+
+def _extract_slice(indices: List[int]) -> Tuple[List[Tuple[int, object]], float, float]:
+    w0, c0 = time.perf_counter(), time.process_time()
+    pages = [(i, _page(i)) for i in indices]
+    return pages, time.perf_counter() - w0, time.process_time() - c0
+
+
+def page_count(pdf_path) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(str(pdf_path)) as pdf:
+        return len(pdf.pages)
+
+
+def page_fingerprints(pdf_path, zspan: Tuple[int, int]) -> List[str]:
+    """sha1 of each page's raw content streams and media box; cheap, no layout analysis."""
+    import pdfplumber
+    from pdfminer.pdftypes import resolve1
+
+    s, e = zspan
+    out = []
+    with pdfplumber.open(str(pdf_path)) as pdf:
+        for i in range(s, e + 1):
+            obj = pdf.pages[i].page_obj
+            h = hashlib.sha1(repr(obj.mediabox).encode())
+            for stream in obj.contents:
+                h.update(resolve1(stream).get_rawdata() or b"")
+            out.append(h.hexdigest())
+    return out
+
+
+def split_slices(indices: List[int], parts: int) -> List[List[int]]:
+    """Split page indices into at most `parts` consecutive, near-equal slices."""
+    n = len(indices)
+    parts = max(1, min(parts, n))
+    size, extra = divmod(n, parts)
+    out, start = [], 0
+    for k in range(parts):
+        end = start + size + (1 if k < extra else 0)
+        out.append(indices[start:end])
+        start = end
+    return out
+
+
+def extract_page_list(
+    pdf_path,
+    indices: List[int],
+    workers: Optional[int] = None,
+    extract_kwargs: Optional[Dict] = None,
+    fallback_kwargs: Optional[Dict] = DEFAULT_FALLBACK,
+    slices_per_worker: int = 4,
+    log=print,
+    layout: bool = False,
+    timings: Optional[List[Dict]] = None,
+) -> Dict[int, object]:
+    """Raw text of the given pages (zero-based indices), keyed by index.
+
+    With layout=True each page is {"text": str, "words": [(text, x0, x1, top, bottom, fontname, size)]}.
+    timings, if given, receives {"pages": (first, last), "wall_s", "cpu_s"} per slice (book page numbers).
+    """
+    indices = sorted(set(indices))
+    if not indices:
+        return {}
+    workers = max(1, workers or os.cpu_count() or 1)
+    init_args = (str(Path(pdf_path)), extract_kwargs, fallback_kwargs, layout)
+    slices = split_slices(indices, workers * slices_per_worker)
+
+    t0 = time.perf_counter()
+    texts: Dict[int, object] = {}
+
+    def collect(result):
+        part, wall, cpu = result
+        texts.update(part)
+        if timings is not None:
+            timings.append({"pages": (part[0][0] + 1, part[-1][0] + 1), "wall_s": wall, "cpu_s": cpu})
+
+    if workers == 1 or len(slices) == 1:
+        _init_worker(*init_args)
+        try:
+            for sl in slices:
+                collect(_extract_slice(sl))
+        finally:
+            _W.pop("pdf").close()
+    else:
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(min(workers, len(slices)), initializer=_init_worker, initargs=init_args) as pool:
+            for result in pool.imap_unordered(_extract_slice, slices):
+                collect(result)
+
+    dt = time.perf_counter() - t0
+    n = len(indices)
+    if log:
+        log(f"  pages {indices[0]+1}–{indices[-1]+1}: {n} pages in {dt:.1f}s "
+            f"({n / max(dt, 1e-9):.1f} pages/sec, workers={workers})")
+    return texts
+
+
+def extract_pages(pdf_path, zspan: Tuple[int, int], workers: Optional[int] = None, **kwargs) -> List:
+    """Raw text of pages zspan[0]..zspan[1] (zero-based, inclusive), in page order."""
+    s, e = zspan
+    texts = extract_page_list(pdf_path, list(range(s, e + 1)), workers=workers, **kwargs)
+    return [texts[i] for i in range(s, e + 1)]
+
+
+def extract_layout(pdf_path, zspan: Tuple[int, int], workers: Optional[int] = None, **kwargs) -> List[Dict]:
+    return extract_pages(pdf_path, zspan, workers=workers, layout=True, **kwargs)
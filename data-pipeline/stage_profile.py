@@ -0,0 +1,114 @@
+# stage_profile.py
+# Wall/CPU timing per pipeline stage and page range, with an optional cProfile dump.
+#
+#   prof = RunProfile("extract_all")
+#   with prof.stage("parse:conditions", pages=(180, 420)) as st:
+#       items = parse_conditions(...)
+#       st["items"] = len(items)
+#   prof.time_functions(extract_curated_v2, "clean_text", "normalize_bullets", "is_all_caps_heading")
+#   prof.write(Path("run_profile.json"))
+#
+# Stages are exclusive top-level steps; timed functions are called inside stages
+# and are reported separately (calls, wall, cpu) so their share can be read off.
+# The .prof file from --cprofile opens in snakeviz, or renders as a flame graph
+# with flameprof / gprof2dot.
+
+from __future__ import annotations
+import cProfile, functools, json, os, platform, time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RunProfile:
+    def __init__(self, name: str, cprofile_path: Optional[Path] = None):
+        self.name = name
+        self.stages: List[Dict[str, Any]] = []
+        self.functions: Dict[str, Dict[str, float]] = {}
+        self.cprofile_path = cprofile_path
+        self._cprof = cProfile.Profile() if cprofile_path else None
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        if self._cprof:
+            self._cprof.enable()
+
+    @contextmanager
+    def stage(self, name: str, pages: Optional[Tuple[int, int]] = None, **extra):
+        rec: Dict[str, Any] = {"stage": name, **extra}
+        if pages:
+            rec["pages"] = list(pages)
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        finally:
+            rec["wall_s"] = round(time.perf_counter() - w0, 4)
+            rec["cpu_s"] = round(time.process_time() - c0, 4)
+            self.stages.append(rec)
+
+    def add(self, name: str, wall_s: float, cpu_s: float, pages: Optional[Tuple[int, int]] = None, **extra):
+        """Record a stage timed elsewhere (e.g. inside an extraction worker)."""
+        rec: Dict[str, Any] = {"stage": name, **extra, "wall_s": round(wall_s, 4), "cpu_s": round(cpu_s, 4)}
+        if pages:
+            rec["pages"] = list(pages)
+        self.stages.append(rec)
+
+    def time_functions(self, module, *names: str):
+        """Wrap module-level functions so every call adds to a per-function total."""
+        for fname in names:
+            fn = getattr(module, fname)
+            key = f"{module.__name__}.{fname}"
+            tot = self.functions.setdefault(key, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+
+            @functools.wraps(fn)
+            def timed(*a, _fn=fn, _tot=tot, **kw):
+                w0, c0 = time.perf_counter(), time.process_time()
+                try:
+                    return _fn(*a, **kw)
+                finally:
+                    _tot["calls"] += 1
+                    _tot["wall_s"] += time.perf_counter() - w0
+                    _tot["cpu_s"] += time.process_time() - c0
+
+            setattr(module, fname, timed)
+
+    def summary(self) -> Dict[str, Any]:
+        by_stage: Dict[str, Dict[str, Any]] = {}
+        for rec in self.stages:
+            agg = by_stage.setdefault(rec["stage"].split(":", 1)[0], {"wall_s": 0.0, "cpu_s": 0.0, "count": 0, "items": 0})
+            agg["wall_s"] += rec["wall_s"]
+            agg["cpu_s"] += rec["cpu_s"]
+            agg["count"] += 1
+            agg["items"] += rec.get("items", 0)
+        return {
+            "run": self.name,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "wall_s": round(time.perf_counter() - self._t0, 4),
+            "cpu_s": round(time.process_time() - self._c0, 4),   # this process only; workers are in their stages
+            "totals": {k: {**v, "wall_s": round(v["wall_s"], 4), "cpu_s": round(v["cpu_s"], 4)} for k, v in by_stage.items()},
+            "stages": self.stages,
+            "functions": {k: {**v, "wall_s": round(v["wall_s"], 4), "cpu_s": round(v["cpu_s"], 4)}
+                          for k, v in sorted(self.functions.items(), key=lambda kv: -kv[1]["wall_s"])},
+        }
+
+    def print_table(self, summary: Optional[Dict[str, Any]] = None):
+        s = summary or self.summary()
+        print(f"\n{'stage':<44}{'wall s':>10}{'cpu s':>10}{'count':>8}{'items':>9}")
+        for k, v in sorted(s["totals"].items(), key=lambda kv: -kv[1]["wall_s"]):
+            print(f"{k:<44}{v['wall_s']:>10.2f}{v['cpu_s']:>10.2f}{v['count']:>8}{v['items']:>9}")
+        for k, v in s["functions"].items():
+            print(f"  {k:<42}{v['wall_s']:>10.2f}{v['cpu_s']:>10.2f}{v['calls']:>8}")
+        print(f"{'total':<44}{s['wall_s']:>10.2f}{s['cpu_s']:>10.2f}")
+
+    def write(self, path: Optional[Path]) -> Dict[str, Any]:
+        if self._cprof:
+            self._cprof.disable()
+            self._cprof.dump_stats(str(self.cprofile_path))
+            print(f"cProfile stats → {self.cprofile_path}")
+        summary = self.summary()
+        self.print_table(summary)
+        if path:
+            path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+            print(f"Run summary → {path}")
+        return summary
@@ -3,11 +3,15 @@
 # It only fills content_sw when it's missing, and marks translation_status="machine".
 # Run:
 #   python translate_sw.py
+#   python translate_sw.py --in en_chunks.jsonl --follow   # stream, even while extract_chunks.py --jsonl runs
 
-import json
+import argparse, json, sys
 from pathlib import Path
 from argostranslate import translate
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from chunk_io import ChunkWriter, iter_chunks
+
 ROOT = Path(__file__).parent
 IN_PATH  = ROOT / "en_chunks.json"
 OUT_PATH = ROOT / "en_sw_chunks.json"
@@ -25,30 +29,62 @@ def get_engine(from_code="en", to_code="sw"):
         )
     return from_lang.get_translation(to_lang)
 
+def translate_item(engine, item) -> bool:
+    if item.get("content_sw"):  # already has Swahili (human or prior machine)
+        return False
+    text = item.get("content_en")
+    if not text:
+        return False
+    # Optional safety: limit very long strings (Argos can handle, but keep it tidy)
+    text = text[:3000]
+    item["content_sw"] = engine.translate(text)
+    # Set status only if it was 'original' (keep 'human' if you pre-filled any)
+    if item.get("translation_status") == "original":
+        item["translation_status"] = "machine"
+    return True
+
+def stream(engine, in_path: Path, out_path: Path, follow: bool):
+    # one item in memory at a time; re-runs skip ids already in the output
+    done = {it["id"] for it in iter_chunks(out_path)} if out_path.exists() else set()
+    count = 0
+    with ChunkWriter(out_path, append=True) as w:
+        for item in iter_chunks(in_path, follow=follow):
+            if item.get("id") in done:
+                continue
+            if BATCH_LIMIT and count >= BATCH_LIMIT:
+                break
+            if translate_item(engine, item):
+                count += 1
+            w.write(item)
+    print(f"Translated {count} items → {out_path.resolve()}")
+
 def main():
-    assert IN_PATH.exists(), f"Input JSON not found: {IN_PATH.resolve()}"
-    data = json.loads(IN_PATH.read_text(encoding="utf-8"))
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="in_path", type=Path, default=IN_PATH)
+    ap.add_argument("--out", dest="out_path", type=Path, default=None,
+                    help="Default: en_sw_chunks.json, or en_sw_chunks.jsonl for .jsonl input")
+    ap.add_argument("--follow", action="store_true", help="Keep reading a .jsonl input that is still being written (waits up to 30s for it to appear)")
+    args = ap.parse_args()
+
+    in_path = args.in_path
+    assert in_path.exists() or args.follow, f"Input JSON not found: {in_path.resolve()}"
     engine = get_engine("en", "sw")
 
+    if in_path.suffix == ".jsonl":
+        stream(engine, in_path, args.out_path or OUT_PATH.with_suffix(".jsonl"), args.follow)
+        return
+
+    out_path = args.out_path or OUT_PATH
+    data = json.loads(in_path.read_text(encoding="utf-8"))
     count = 0
     for item in data:
-        if item.get("content_sw"):  # already has Swahili (human or prior machine)
-            continue
-        text = item.get("content_en")
-        if not text:
-            continue
-        # Optional safety: limit very long strings (Argos can handle, but keep it tidy)
-        text = text[:3000]
-        item["content_sw"] = engine.translate(text)
-        # Set status only if it was 'original' (keep 'human' if you pre-filled any)
-        if item.get("translation_status") == "original":
-            item["translation_status"] = "machine"
-        count += 1
+        if translate_item(engine, item):
+            count += 1
         if BATCH_LIMIT and count >= BATCH_LIMIT:
             break
 
-    OUT_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Translated {count} items → {OUT_PATH.resolve()}")
+    out_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Translated {count} items → {out_path.resolve()}")
 
 if __name__ == "__main__":
     main()
@@ -45,10 +45,13 @@ def join_paragraphs(lines: list[str]) -> str:
     if buf: out.append(" ".join(buf))
     return "\n".join(out)
 
+def item_payload(items) -> list:
+    # Only include keys your app expects
+    return [{"id": it["id"], "title": it["title"], "contentEn": it["contentEn"], "contentSw": None} for it in items]
+
 def write_items(items, out_path: Path):
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    # Only include keys your app expects
-    payload = [{"id": it["id"], "title": it["title"], "contentEn": it["contentEn"], "contentSw": None} for it in items]
+    payload = item_payload(items)
     out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
 def looks_like_header(line: str) -> bool:
@@ -1,5 +1,4 @@
 import argparse
-import glob
 import json
 import re
 import struct
@@ -9,6 +8,8 @@ import numpy as np
 import torch
 from transformers import AutoTokenizer, AutoModel
 
+from corpus import load_glob
+
 
 MODEL_ID = "intfloat/multilingual-e5-small"
 
@@ -25,50 +26,23 @@ def average_pool(last_hidden_states, attention_mask):
 def load_items(corpus_glob):
     items = []
 
-    for path in sorted(glob.glob(corpus_glob)):
-        file_path = Path(path)
-        data = json.loads(file_path.read_text(encoding="utf-8"))
+    for item in load_glob(corpus_glob):
+        item_id = item["id"]
+        title = item["title"]
+        content = item["contentEn"] or item["contentSw"]
 
-        if not isinstance(data, list):
+        if not item_id or not title:
             continue
 
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-
-            item_id = item.get("id")
-            title = item.get("title") or ""
-
-            content = (
-                item.get("contentEn")
-                or item.get("content_en")
-                or item.get("contentSw")
-                or item.get("content_sw")
-                or item.get("content")
-                or ""
-            )
-
-            if not content and isinstance(item.get("sections"), list):
-                parts = []
-                for section in item["sections"]:
-                    if isinstance(section, dict):
-                        parts.append(section.get("title", ""))
-                        parts.append(section.get("body", ""))
-                        parts.append(section.get("text", ""))
-                content = "\n".join(parts)
-
-            if not item_id or not title:
-                continue
-
-            # E5 convention: documents/passages should be prefixed with "passage:"
-            text = clean_text(f"passage: {title}. {content}")
-
-            items.append({
-                "id": item_id,
-                "title": title,
-                "source_file": file_path.name,
-                "text": text,
-            })
+        # E5 convention: documents/passages should be prefixed with "passage:"
+        text = clean_text(f"passage: {title}. {content}")
+
+        items.append({
+            "id": item_id,
+            "title": title,
+            "source_file": item.file.name,
+            "text": text,
+        })
 
     return items
 
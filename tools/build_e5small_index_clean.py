@@ -31,13 +31,12 @@ import numpy as np
 import torch
 from transformers import AutoTokenizer, AutoModel
 
+from corpus import SKIP_FILES, load_files
+
 
 MODEL_ID = "intfloat/multilingual-e5-small"
 
-SKIP_FILENAMES = {
-    "sw_import.json",
-    "synonyms.json",
-}
+SKIP_FILENAMES = SKIP_FILES
 
 # These are section headers or recurring generic/noisy entries that often behave like retrieval hubs.
 # You can remove items from this list if you intentionally want them searchable.
@@ -57,98 +56,63 @@ def average_pool(last_hidden_states, attention_mask):
     return last_hidden.sum(dim=1) / attention_mask.sum(dim=1)[..., None]
 
 
-def extract_sections(item, key):
-    sections = item.get(key)
-    if not isinstance(sections, list):
-        return ""
-    parts = []
-    for section in sections:
-        if isinstance(section, dict):
-            parts.append(section.get("title", ""))
-            parts.append(section.get("body", ""))
-            parts.append(section.get("text", ""))
-    return "\n".join(parts)
-
-
 def load_items(corpus_glob, lang="sw", min_chars=80, bilingual=True):
     items = []
     skipped = []
 
-    for path in sorted(glob.glob(corpus_glob)):
-        file_path = Path(path)
+    paths = sorted(glob.glob(corpus_glob))
+    for path in paths:
+        if Path(path).name in SKIP_FILENAMES:
+            skipped.append((Path(path).name, "helper/import file"))
+
+    for item in load_files(paths):
+        item_id = item["id"]
+        title = item["title"]
+
+        if not item_id or not title:
+            skipped.append((item.file.name, "missing id/title"))
+            continue
+
+        if item_id in SKIP_IDS:
+            skipped.append((item_id, "skip-id"))
+            continue
 
-        if file_path.name in SKIP_FILENAMES:
-            skipped.append((file_path.name, "helper/import file"))
+        if not VALID_ID_RE.match(item_id):
+            skipped.append((item_id[:80], "malformed id"))
             continue
 
-        data = json.loads(file_path.read_text(encoding="utf-8"))
+        if "too_short" in item["missingFields"]:
+            skipped.append((item_id, "too_short"))
+            continue
+
+        content_en = clean_text(item["contentEn"])
+        content_sw = clean_text(item["contentSw"])
+
+        if lang == "sw":
+            main_content = content_sw
+            secondary_content = content_en
+        else:
+            main_content = content_en
+            secondary_content = content_sw
 
-        if not isinstance(data, list):
-            skipped.append((file_path.name, "not a list"))
+        if len(main_content) < min_chars and len(secondary_content) < min_chars:
+            skipped.append((item_id, "content too short"))
             continue
 
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-
-            item_id = item.get("id", "")
-            title = item.get("title", "")
-
-            if not item_id or not title:
-                skipped.append((file_path.name, "missing id/title"))
-                continue
-
-            if item_id in SKIP_IDS:
-                skipped.append((item_id, "skip-id"))
-                continue
-
-            if not VALID_ID_RE.match(item_id):
-                skipped.append((item_id[:80], "malformed id"))
-                continue
-
-            missing_fields = item.get("missingFields") or []
-            if "too_short" in missing_fields:
-                skipped.append((item_id, "too_short"))
-                continue
-
-            content_en = clean_text(
-                item.get("contentEn")
-                or item.get("content_en")
-                or item.get("content")
-                or extract_sections(item, "sections")
-            )
-
-            content_sw = clean_text(
-                item.get("contentSw")
-                or item.get("content_sw")
-                or extract_sections(item, "sectionsSw")
-            )
-
-            if lang == "sw":
-                main_content = content_sw
-                secondary_content = content_en
-            else:
-                main_content = content_en
-                secondary_content = content_sw
-
-            if len(main_content) < min_chars and len(secondary_content) < min_chars:
-                skipped.append((item_id, "content too short"))
-                continue
-
-            # For Swahili, keep English title too because many medical terms in the corpus remain English.
-            # For E5, documents/passages use "passage:" prefix.
-            if bilingual:
-                doc_text = f"passage: {title}. {main_content}. English reference: {title}. {secondary_content}"
-            else:
-                doc_text = f"passage: {title}. {main_content}"
-
-            items.append({
-                "id": item_id,
-                "title": title,
-                "source_file": file_path.name,
-                "text": clean_text(doc_text),
-                "lang": lang,
-            })
+        # For Swahili, keep English title too because many medical terms in the corpus remain English.
+        # For E5, documents/passages use "passage:" prefix.
+        if bilingual:
+            doc_text = f"passage: {title}. {main_content}. English reference: {title}. {secondary_content}"
+        else:
+            doc_text = f"passage: {title}. {main_content}"
+
+        items.append({
+            "id": item_id,
+            "title": title,
+            "source_file": item.file.name,
+            "text": clean_text(doc_text),
+            "lang": lang,
+        })
 
     return items, skipped
 
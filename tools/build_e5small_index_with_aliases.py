@@ -19,8 +19,10 @@ import numpy as np
 import torch
 from transformers import AutoTokenizer, AutoModel
 
+from corpus import SKIP_FILES, load_files
+
 MODEL_ID = "intfloat/multilingual-e5-small"
-SKIP_FILENAMES = {"sw_import.json", "synonyms.json", "enrichment_summary.json"}
+SKIP_FILENAMES = SKIP_FILES | {"enrichment_summary.json"}
 SKIP_IDS = {"principle-section-0"}
 VALID_ID_RE = re.compile(r"^[a-z0-9][a-z0-9\-]*$")
 
@@ -34,93 +36,64 @@ def average_pool(last_hidden_states, attention_mask):
     return last_hidden.sum(dim=1) / attention_mask.sum(dim=1)[..., None]
 
 
-def extract_sections(item, key):
-    sections = item.get(key)
-    if not isinstance(sections, list):
-        return ""
-    parts = []
-    for section in sections:
-        if isinstance(section, dict):
-            parts.append(section.get("title", ""))
-            parts.append(section.get("body", ""))
-            parts.append(section.get("text", ""))
-    return "\n".join(parts)
-
-
 def load_items(corpus_glob, lang="sw", min_chars=80):
     items = []
     skipped = []
 
+    paths = []
     for path in sorted(glob.glob(corpus_glob)):
         file_path = Path(path)
-
         if file_path.name in SKIP_FILENAMES or file_path.suffix.lower() != ".json":
             skipped.append((file_path.name, "helper/import/non-json file"))
+        else:
+            paths.append(file_path)
+
+    for item in load_files(paths):
+        item_id = item["id"]
+        title = item["title"]
+        title_sw = item["titleSw"] or title
+        aliases_sw = item["aliasesSw"]
+
+        if not item_id or not title:
+            skipped.append((item.file.name, "missing id/title"))
+            continue
+        if item_id in SKIP_IDS:
+            skipped.append((item_id, "skip-id"))
+            continue
+        if not VALID_ID_RE.match(item_id):
+            skipped.append((item_id[:80], "malformed id"))
             continue
+        if "too_short" in item["missingFields"]:
+            skipped.append((item_id, "too_short"))
+            continue
+
+        content_en = clean_text(item["contentEn"])
+        content_sw = clean_text(item["contentSw"])
 
-        data = json.loads(file_path.read_text(encoding="utf-8"))
-        if not isinstance(data, list):
-            skipped.append((file_path.name, "not a list"))
+        if len(content_sw) < min_chars and len(content_en) < min_chars:
+            skipped.append((item_id, "content too short"))
             continue
 
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-
-            item_id = item.get("id", "")
-            title = item.get("title", "")
-            title_sw = item.get("titleSw") or title
-            aliases_sw = item.get("aliasesSw") or []
-
-            if not item_id or not title:
-                skipped.append((file_path.name, "missing id/title"))
-                continue
-            if item_id in SKIP_IDS:
-                skipped.append((item_id, "skip-id"))
-                continue
-            if not VALID_ID_RE.match(item_id):
-                skipped.append((item_id[:80], "malformed id"))
-                continue
-            if "too_short" in (item.get("missingFields") or []):
-                skipped.append((item_id, "too_short"))
-                continue
-
-            content_en = clean_text(
-                item.get("contentEn")
-                or item.get("content_en")
-                or item.get("content")
-                or extract_sections(item, "sections")
-            )
-            content_sw = clean_text(
-                item.get("contentSw")
-                or item.get("content_sw")
-                or extract_sections(item, "sectionsSw")
-            )
-
-            if len(content_sw) < min_chars and len(content_en) < min_chars:
-                skipped.append((item_id, "content too short"))
-                continue
-
-            aliases_text = "; ".join([str(a) for a in aliases_sw if str(a).strip()])
-
-            # E5 document convention: use passage prefix.
-            # The alias block is deliberately near the front because user queries are short.
-            text = clean_text(
-                f"passage: {title_sw}. {title}. "
-                f"Search aliases: {aliases_text}. "
-                f"Swahili content: {content_sw}. "
-                f"English reference: {content_en}"
-            )
-
-            items.append({
-                "id": item_id,
-                "title": title,
-                "titleSw": title_sw,
-                "aliasesSw": aliases_sw,
-                "source_file": file_path.name,
-                "text": text,
-                "lang": lang,
-            })
+        aliases_text = "; ".join([str(a) for a in aliases_sw if str(a).strip()])
+
+        # E5 document convention: use passage prefix.
+        # The alias block is deliberately near the front because user queries are short.
+        text = clean_text(
+            f"passage: {title_sw}. {title}. "
+            f"Search aliases: {aliases_text}. "
+            f"Swahili content: {content_sw}. "
+            f"English reference: {content_en}"
+        )
+
+        items.append({
+            "id": item_id,
+            "title": title,
+            "titleSw": title_sw,
+            "aliasesSw": aliases_sw,
+            "source_file": item.file.name,
+            "text": text,
+            "lang": lang,
+        })
 
     return items, skipped
 
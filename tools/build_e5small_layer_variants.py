@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+build_e5small_layer_variants.py
+
+Builds layer-truncated multilingual-e5-small encoders (top transformer layers
+dropped, same mean pooling as E5Encoder.average_pool) and reports retrieval
+accuracy against latency and model size for each variant.
+
+For every --layers value N the tool:
+1. truncates the encoder to its bottom N layers and exports ONNX
+2. converts it to a dynamic-quant TFLite model (what the app ships)
+3. rebuilds the en and sw TFLite indexes with that model
+4. evaluates top-1/3/5 accuracy on the eval queries and measures per-query
+   TFLite latency
+
+Recommended CMD:
+python tools\\build_e5small_layer_variants.py --layers 12 8 6 --output tools\\eval_report_e5small_layers.json
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import onnx
+import tensorflow as tf
+from onnx_tf.backend import prepare
+from transformers import AutoTokenizer, AutoModel
+
+from export_e5small_onnx import MODEL_ID, MAX_LEN, E5Encoder, export_onnx, truncate_layers
+from build_e5small_tflite_index import load_items, encode_text, write_index
+
+
+def convert_to_tflite(onnx_path, saved_model_dir, tflite_path):
+    tf_rep = prepare(onnx.load(str(onnx_path)))
+    saved_model_dir.mkdir(parents=True, exist_ok=True)
+    tf_rep.export_graph(str(saved_model_dir))
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(str(saved_model_dir))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS,
+        tf.lite.OpsSet.SELECT_TF_OPS,
+    ]
+    converter.experimental_enable_resource_variables = True
+
+    tflite_path.write_bytes(converter.convert())
+
+
+def build_index(interpreter, tokenizer, items, max_len):
+    vectors = [encode_text(interpreter, tokenizer, item["text"], max_len=max_len) for item in items]
+    return np.vstack(vectors).astype(np.float32)
+
+
+def evaluate(interpreter, tokenizer, queries, vectors, items, max_len):
+    hits = {1: 0, 3: 0, 5: 0}
+    latencies = []
+
+    for q in queries:
+        t0 = time.perf_counter()
+        query_vec = encode_text(interpreter, tokenizer, "query: " + q["query"], max_len=max_len)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+
+        top = np.argsort(-(vectors @ query_vec))[:5]
+        ids = [items[i]["id"] for i in top]
+        for k in hits:
+            hits[k] += int(q["expected_id"] in ids[:k])
+
+    total = len(queries)
+    return {
+        **{f"top_{k}_accuracy": (v / total if total else 0) for k, v in hits.items()},
+        "latency_ms_mean": float(np.mean(latencies)) if latencies else 0.0,
+        "latency_ms_p90": float(np.percentile(latencies, 90)) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--layers", type=int, nargs="+", default=[12, 8, 6])
+    parser.add_argument("--out-dir", default="assets/models_e5small_layers")
+    parser.add_argument("--index-dir", default="assets/embeddings_e5small")
+    parser.add_argument("--corpus-en", default="assets/corpus/en/*.json")
+    parser.add_argument("--corpus-sw", default="assets/corpus/sw/*.json")
+    parser.add_argument("--queries-en", default="tools/eval_queries_en.json")
+    parser.add_argument("--queries-sw", default="tools/eval_queries_sw.json")
+    parser.add_argument("--max-len", type=int, default=MAX_LEN)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    index_dir = Path(args.index_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"Loading tokenizer: {MODEL_ID}")
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+    tokenizer.save_pretrained(out_dir)
+
+    langs = {
+        "en": (load_items(args.corpus_en, "en"), json.loads(Path(args.queries_en).read_text(encoding="utf-8"))),
+        "sw": (load_items(args.corpus_sw, "sw"), json.loads(Path(args.queries_sw).read_text(encoding="utf-8"))),
+    }
+
+    results = []
+
+    for num_layers in args.layers:
+        print(f"\n=== {num_layers} layer(s) ===")
+        model = AutoModel.from_pretrained(MODEL_ID).eval()
+        truncate_layers(model, num_layers)
+
+        onnx_path = out_dir / f"encoder_e5small_L{num_layers}.onnx"
+        saved_model_dir = out_dir / f"tf_saved_model_L{num_layers}"
+        tflite_path = out_dir / f"encoder_e5small_L{num_layers}_dynamic_quant.tflite"
+
+        print(f"Exporting ONNX to: {onnx_path}")
+        export_onnx(E5Encoder(model).eval(), tokenizer, onnx_path, args.max_len)
+
+        print(f"Converting to TFLite: {tflite_path}")
+        convert_to_tflite(onnx_path, saved_model_dir, tflite_path)
+
+        interpreter = tf.lite.Interpreter(model_path=str(tflite_path))
+        interpreter.allocate_tensors()
+
+        for lang, (items, queries) in langs.items():
+            vectors = build_index(interpreter, tokenizer, items, args.max_len)
+
+            index_path = index_dir / f"index_{lang}_tflite_L{num_layers}.bin"
+            meta_path = index_dir / f"meta_{lang}_tflite_L{num_layers}.json"
+            write_index(index_path, vectors)
+            meta = [
+                {
+                    "id": item["id"],
+                    "title": item["title"],
+                    "titleSw": item.get("titleSw", ""),
+                    "aliasesSw": item.get("aliasesSw", []),
+                    "source_file": item["source_file"],
+                    "model": str(tflite_path),
+                    "vector_dim": int(vectors.shape[1]),
+                }
+                for item in items
+            ]
+            meta_path.write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+
+            metrics = evaluate(interpreter, tokenizer, queries, vectors, items, args.max_len)
+            results.append({
+                "layers": num_layers,
+                "lang": lang,
+                "onnx_bytes": onnx_path.stat().st_size,
+                "tflite_bytes": tflite_path.stat().st_size,
+                "index": str(index_path),
+                "meta": str(meta_path),
+                **metrics,
+            })
+            print(
+                f"[{lang}] top1={metrics['top_1_accuracy']:.2%} top5={metrics['top_5_accuracy']:.2%} "
+                f"latency={metrics['latency_ms_mean']:.1f}ms"
+            )
+
+    report = {
+        "model": MODEL_ID,
+        "max_len": args.max_len,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print("\nLayer truncation report")
+    print("-----------------------")
+    print(f"{'layers':>6} {'lang':<5}{'top1':>8}{'top3':>8}{'top5':>8}{'ms':>8}{'tflite MB':>11}")
+    for r in results:
+        print(
+            f"{r['layers']:>6} {r['lang']:<5}{r['top_1_accuracy']:>8.2%}{r['top_3_accuracy']:>8.2%}"
+            f"{r['top_5_accuracy']:>8.2%}{r['latency_ms_mean']:>8.1f}{r['tflite_bytes'] / 1e6:>11.1f}"
+        )
+    print(f"Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
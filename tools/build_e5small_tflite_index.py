@@ -1,5 +1,4 @@
 import argparse
-import glob
 import json
 import re
 import struct
@@ -9,6 +8,8 @@ import numpy as np
 import tensorflow as tf
 from transformers import AutoTokenizer
 
+from corpus import load_glob
+
 
 def clean_text(text):
     return re.sub(r"\s+", " ", text or "").strip()
@@ -22,46 +23,35 @@ def l2_normalize(x):
 def load_items(corpus_glob, lang):
     items = []
 
-    for path in sorted(glob.glob(corpus_glob)):
-        file_path = Path(path)
+    for item in load_glob(corpus_glob):
+        item_id = item["id"]
+        title = item["title"]
+        title_sw = item["titleSw"]
+        aliases_sw = item["aliasesSw"]
 
-        if file_path.name in {"synonyms.json", "sw_import.json"}:
-            continue
+        content_en = item["contentEn"]
+        content_sw = item["contentSw"]
 
-        data = json.loads(file_path.read_text(encoding="utf-8"))
+        if not item_id or not title:
+            continue
 
-        if not isinstance(data, list):
+        if "too_short" in item["missingFields"]:
             continue
 
-        for item in data:
-            item_id = item.get("id")
-            title = item.get("title", "")
-            title_sw = item.get("titleSw", "")
-            aliases_sw = item.get("aliasesSw", [])
-
-            content_en = item.get("contentEn") or item.get("content_en") or ""
-            content_sw = item.get("contentSw") or item.get("content_sw") or ""
-
-            if not item_id or not title:
-                continue
-
-            if "missingFields" in item and "too_short" in item["missingFields"]:
-                continue
-
-            if lang == "sw":
-                alias_text = " ".join(aliases_sw) if isinstance(aliases_sw, list) else ""
-                text = f"passage: {title_sw}. {title}. {alias_text}. {content_sw}. English reference: {content_en}"
-            else:
-                text = f"passage: {title}. {content_en}"
-
-            items.append({
-                "id": item_id,
-                "title": title,
-                "titleSw": title_sw,
-                "aliasesSw": aliases_sw,
-                "source_file": file_path.name,
-                "text": clean_text(text),
-            })
+        if lang == "sw":
+            alias_text = " ".join(aliases_sw)
+            text = f"passage: {title_sw}. {title}. {alias_text}. {content_sw}. English reference: {content_en}"
+        else:
+            text = f"passage: {title}. {content_en}"
+
+        items.append({
+            "id": item_id,
+            "title": title,
+            "titleSw": title_sw,
+            "aliasesSw": aliases_sw,
+            "source_file": item.file.name,
+            "text": clean_text(text),
+        })
 
     return items
 
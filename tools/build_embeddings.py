@@ -24,6 +24,8 @@ from typing import List, Dict
 
 import numpy as np
 
+from corpus import load_files
+
 def try_tqdm(total: int):
     """Return (update_fn, close_fn) with tqdm if present; else minimal fallback."""
     try:
@@ -46,28 +48,14 @@ def load_items(paths: List[str]) -> List[Dict]:
     Adapts to your JSON array shape: [{ id, title, contentEn, contentSw, ...}, ...].
     """
     items: List[Dict] = []
-    for p in paths:
-        try:
-            with open(p, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            print(f"!! Skipping {p}: {e}")
-            continue
-
-        if not isinstance(data, list):
-            print(f"!! Skipping {p}: not a JSON array")
+    for it in load_files(paths):   # JSON array or streamed .jsonl
+        cid = it["id"] or str(it.get("ID") or "")
+        title = it["title"] or it.get("name") or ""
+        # Prefer English for now; fall back to Swahili if missing
+        text = (it["contentEn"] or it["contentSw"]).strip()
+        if not cid or not title or not text:
             continue
-
-        for it in data:
-            if not isinstance(it, dict):
-                continue
-            cid = it.get("id") or it.get("ID") or ""
-            title = it.get("title") or it.get("name") or ""
-            # Prefer English for now; fall back to Swahili if missing
-            text = (it.get("contentEn") or it.get("contentSW") or it.get("contentSw") or "").strip()
-            if not cid or not title or not text:
-                continue
-            items.append({"id": cid, "title": title, "lang": "en", "text": text})
+        items.append({"id": cid, "title": title, "lang": "en", "text": text})
     return items
 
 def write_meta(meta_path: str, items: List[Dict]):
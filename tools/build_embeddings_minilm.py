@@ -1,12 +1,13 @@
 # tools/build_embeddings_minilm.py
-import os, json, glob, struct
-from pathlib import Path
+import os, json, struct
 
 import numpy as np
 from tqdm import tqdm
 import onnxruntime as ort
 from tokenizers import BertWordPieceTokenizer
 
+from corpus import load_glob
+
 # ----- CONFIG -----
 CORPUS_GLOBS = [
     "assets/corpus/en/*.json",
@@ -31,77 +32,34 @@ def _first_words(s: str, n=8):
     parts = s.split()
     return " ".join(parts[:n]) + ("…" if len(parts) > n else "")
 
-def _extract_text(obj) -> str:
-    if isinstance(obj, str):
-        return obj.strip()
-    if not isinstance(obj, dict):
-        return ""
-    for k in ["contentEn", "contentSW", "contentSw", "content", "content_en", "body", "text"]:
-        v = obj.get(k)
+def _extract_text(it) -> str:
+    # contentEn/contentSw already fall back to content_en, content and sections
+    for v in (it["contentEn"], it["contentSw"], it.get("body"), it.get("text")):
         if isinstance(v, str) and v.strip():
             return v.strip()
-    secs = obj.get("sections")
-    if isinstance(secs, list):
-        parts = []
-        for s in secs:
-            if isinstance(s, dict):
-                b = s.get("body") or s.get("text") or ""
-                if isinstance(b, str) and b.strip():
-                    parts.append(b.strip())
-            elif isinstance(s, str) and s.strip():
-                parts.append(s.strip())
-        if parts:
-            return "\n\n".join(parts)
     return ""
 
 def collect_items():
     items = []
-    bad_files = 0
-    for pat in CORPUS_GLOBS:
-        for path in glob.glob(pat):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except Exception as e:
-                print(f"[WARN] Failed to load {path}: {e}")
-                bad_files += 1
-                continue
-
-            if isinstance(data, dict):
-                for key in ["items", "data", "records", "list"]:
-                    if key in data and isinstance(data[key], list):
-                        data = data[key]
-                        break
-
-            if not isinstance(data, list):
-                print(f"[WARN] {path} did not contain a list; skipping.")
-                bad_files += 1
-                continue
-
-            stem = Path(path).stem
-            lang = "en" if "/en/" in path.replace("\\", "/") else "sw"
-
-            for i, it in enumerate(data):
-                if isinstance(it, dict):
-                    cid = (it.get("id") or it.get("cid") or "").strip()
-                    title = (it.get("title") or "").strip()
-                    text = _extract_text(it)
-                else:
-                    cid = ""
-                    title = ""
-                    text = _extract_text(it)
-
-                if not text:
-                    continue
-                if not cid:
-                    cid = f"auto-{stem}-{i}"
-                if not title:
-                    title = _first_words(text, 8)
-
-                items.append({"id": cid, "title": title, "lang": lang, "text": text})
-
-    if bad_files:
-        print(f"[INFO] Skipped {bad_files} files due to shape/errors.")
+    corpus = load_glob(*CORPUS_GLOBS)
+    index_in_file = {}
+    for it in corpus:
+        path = it.file
+        i = index_in_file[path] = index_in_file.get(path, -1) + 1
+        lang = "en" if path.parent.name == "en" else "sw"
+
+        cid = it["id"] or str(it.get("cid") or "").strip()
+        title = it["title"]
+        text = _extract_text(it)
+
+        if not text:
+            continue
+        if not cid:
+            cid = f"auto-{path.stem}-{i}"
+        if not title:
+            title = _first_words(text, 8)
+
+        items.append({"id": cid, "title": title, "lang": lang, "text": text})
     return items
 
 def pad_batch(tokenizer, texts):
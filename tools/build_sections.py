@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+build_sections.py
+
+Bakes structured sections into a build copy of the corpus so the app never
+has to split article text at render time. For every item the app loads from
+assets/corpus/{en,sw} (every *.json but synonyms.json, so sw/sw_import.json
+too):
+
+    sections   = split_sections(contentEn, "en")
+    sectionsSw = split_sections(contentSw, "sw")
+
+each a list of {"key", "title", "body"} in canonical order, with key one of
+overview / treatment / causes / symptoms / usage / habitat (see
+section_heuristics). An item with no content keeps the text of the sections it
+already has, re-split under canonical keys; an item with no text in either
+language (the one-line basic principles) gets its titles as the overview.
+Every item is then validated against tools/schemas/content_item.schema.json.
+
+sections is the English split and sectionsSw the Swahili one, so an item
+with text in one language only keeps the other list empty: the Swahili-only
+imports in sw/sw_import.json and sw/sample.json's ginger-basics have no
+sections, the English-only en/sample.json items no sectionsSw.
+
+The shipped assets are not touched: baked sections roughly double the JSON the
+app parses at startup, and ContentItem does not read them yet. The baked copy
+goes to build/corpus_sections/<lang>/ (synonyms.json copied along), which is
+what content_bundle.py compiles, where item bodies are only inflated when an
+article is opened:
+
+Recommended CMD:
+python tools\\build_sections.py
+python tools\\build_sections.py --check      (exit 1 if the build copy is stale or invalid)
+python tools\\content_bundle.py compile --root build\\corpus_sections --lang en --out assets\\corpus_bundle\\en.nrcb
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+
+from jsonschema import Draft202012Validator
+
+from corpus import CORPUS_ROOT, corpus_files, sections_text
+from section_heuristics import split_sections
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SCHEMA = ROOT / "tools" / "schemas" / "content_item.schema.json"
+OUT_ROOT = ROOT / "build" / "corpus_sections"
+
+# (sections field, content fields in fallback order, title field, heading language)
+# the app reads every corpus file except synonyms.json
+APP_SKIP_FILES = {"synonyms.json"}
+
+SECTION_FIELDS = (
+    ("sections", ("contentEn", "content_en", "content"), "title", "en"),
+    ("sectionsSw", ("contentSw", "content_sw"), "titleSw", "sw"),
+)
+
+
+def item_sections(item, field, content_keys, lang):
+    text = next((item[k] for k in content_keys if isinstance(item.get(k), str) and item[k].strip()), "")
+    return split_sections(text or sections_text(item.get(field)), lang)
+
+
+def bake_item(item):
+    baked = {field: item_sections(item, field, keys, lang) for field, keys, _, lang in SECTION_FIELDS}
+    if not any(baked.values()):
+        # no text in either language beyond headings: the titles are the whole entry
+        for field, _, title_key, lang in SECTION_FIELDS:
+            title = item.get(title_key)
+            baked[field] = split_sections(title if isinstance(title, str) else "", lang)
+    item.update(baked)
+
+
+def build_file(path, validator):
+    """Returns (items with baked sections, schema errors) for one corpus file."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return data, [f"{path.name}: not an array of items"]
+
+    errors = []
+    for idx, it in enumerate(items):
+        bake_item(it)
+        for e in sorted(validator.iter_errors(it), key=lambda e: list(e.path)):
+            errors.append(f"{path.name} item#{idx} id={it.get('id')}: {e.message}")
+    return data, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--langs", nargs="+", default=["en", "sw"])
+    parser.add_argument("--src", default=str(CORPUS_ROOT), help="corpus root with <lang>/*.json (read only)")
+    parser.add_argument("--out", default=str(OUT_ROOT), help="where the baked <lang>/*.json go")
+    parser.add_argument("--check", action="store_true", help="report only; exit 1 if the build copy would change")
+    args = parser.parse_args()
+
+    validator = Draft202012Validator(json.loads(SCHEMA.read_text(encoding="utf-8")))
+    src_root, out_root = Path(args.src), Path(args.out)
+
+    stale, bad = 0, 0
+    for path in corpus_files(args.langs, root=src_root, skip=APP_SKIP_FILES):
+        data, errors = build_file(path, validator)
+        for msg in errors:
+            print(f"[SCHEMA] {msg}")
+        bad += len(errors)
+
+        out = out_root / path.parent.name / path.name
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        if out.exists() and out.read_text(encoding="utf-8") == text:
+            continue
+        stale += 1
+        if args.check:
+            print(f"{path.parent.name}/{path.name}: {out} is missing or out of date")
+        else:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.write_text(text, encoding="utf-8")
+            print(f"{path.parent.name}/{path.name} -> {out}")
+
+    for lang in args.langs:   # content_bundle.py reads synonyms from the same root
+        synonyms, out = src_root / lang / "synonyms.json", out_root / lang / "synonyms.json"
+        if not synonyms.exists() or (out.exists() and out.read_bytes() == synonyms.read_bytes()):
+            continue
+        stale += 1
+        if args.check:
+            print(f"{lang}/synonyms.json: {out} is missing or out of date")
+        else:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(synonyms, out)
+
+    if bad:
+        print(f"\nFAILED: {bad} schema violation(s)")
+        sys.exit(1)
+    if args.check and stale:
+        print(f"\nFAILED: {stale} file(s) out of date; run tools/build_sections.py")
+        sys.exit(1)
+    print(f"OK: sections up to date in {out_root} and all items conform to schema")
+
+
+if __name__ == "__main__":
+    main()
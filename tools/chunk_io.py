@@ -0,0 +1,143 @@
+"""
+chunk_io.py
+
+Streaming reader/writer for chunk files (data-pipeline/extract_chunks.py --jsonl).
+
+One JSON object per line. While a writer is running, <path>.writing exists
+and holds its PID; iter_chunks(path, follow=True) keeps tailing the file until
+the marker is gone or that process has died (a killed writer leaves its marker
+behind), so translation or indexing can start while extraction is still running.
+A follower never trusts a file it finds without a live writer unless it was
+modified after the follower started (it may be a previous run's): it waits up to
+`wait` seconds for this run's writer first. A writer that starts over removes
+the old file before it puts its marker down, so a follower that sees the
+marker never reads the previous run's lines.
+Plain JSON arrays (en_chunks.json and the corpus files) are read too, so tools
+can take either format.
+
+    with ChunkWriter("en_chunks.jsonl") as w:
+        w.write({"id": "p12-000", ...})
+
+    for item in iter_chunks("en_chunks.jsonl", follow=True):
+        ...
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+
+def marker_path(path):
+    path = Path(path)
+    return path.with_name(path.name + ".writing")
+
+
+def pid_alive(pid):
+    if os.name == "nt":   # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)   # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        try:
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259   # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:   # alive, owned by someone else
+        return True
+    return True
+
+
+def writer_running(path):
+    """True while a ChunkWriter for path has its marker down and is still alive."""
+    try:
+        pid = int(marker_path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return False
+    except ValueError:   # marker created but PID not written yet
+        return True
+    return pid_alive(pid)
+
+
+class ChunkWriter:
+    def __init__(self, path, append=False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.marker = marker_path(self.path)
+        if not append:
+            self.path.unlink(missing_ok=True)   # before the marker: followers must not see the old lines
+        self.marker.write_text(str(os.getpid()), encoding="utf-8")
+        self.f = self.path.open("a" if append else "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, item):
+        self.f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self.f.flush()
+        self.count += 1
+
+    def close(self):
+        if not self.f.closed:
+            self.f.close()
+        self.marker.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_chunks(path, follow=False, poll=0.5, wait=30.0):
+    """Yield items from a .jsonl (streamed) or .json array file.
+
+    follow=True waits for lines still being written by a ChunkWriter. If no
+    writer is running and the file is missing or older than the call, it first
+    waits up to `wait` seconds for one to start, then reads whatever is there.
+    A torn last line (crashed writer) is skipped.
+    """
+    path = Path(path)
+    if path.suffix != ".jsonl":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        yield from (it for it in data if isinstance(it, dict)) if isinstance(data, list) else ()
+        return
+
+    if follow:
+        started, deadline = time.time(), time.monotonic() + wait
+        while not writer_running(path):
+            if path.exists() and path.stat().st_mtime >= started:
+                break   # written since we started: this run's writer, already done
+            if time.monotonic() >= deadline:
+                if not path.exists():
+                    return
+                break   # no writer came: the file on disk is all there is
+            time.sleep(poll)
+        while not path.exists():   # marker is down, file not created yet
+            if not writer_running(path):
+                return
+            time.sleep(poll)
+
+    with path.open("r", encoding="utf-8") as f:
+        buf = ""
+        while True:
+            line = f.readline()
+            if line:
+                buf += line
+                if buf.endswith("\n"):
+                    if buf.strip():
+                        yield json.loads(buf)
+                    buf = ""
+                continue
+            if follow:
+                if writer_running(path):
+                    time.sleep(poll)
+                else:
+                    follow = False   # writer closed or died: read what is left, then stop
+                continue
+            return   # anything left in buf is a torn last line
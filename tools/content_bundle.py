@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+content_bundle.py
+
+Compiles one language's corpus (assets/corpus/<lang>/*.json, as discovered by
+AssetsContentRepository) into a single compressed bundle, verifies it against
+the source JSON and benchmarks opening it.
+
+Only the small head section (ids, titles, search fields, synonyms) has to be
+inflated and parsed at startup; item bodies are minified JSON packed into zlib
+blocks and located through an offset table, so an item is decoded only when it
+is opened (or when a full-text search first needs it).
+
+Bundle layout (little-endian):
+    header   <4sHHIII20s  magic "NRCB", version, reserved, n_items, n_blocks,
+                          head_len, sha1 of the source files
+    items    uint32[n_items * 3]     block, start, length of each item's JSON
+                                     inside its inflated block
+    blocks   uint32[n_blocks + 1]    compressed block i = body[blocks[i]:blocks[i+1]]
+    raw_len  uint32[n_blocks]        inflated size of each block
+    head     zlib(minified JSON)     {"lang", "files", "synonyms",
+                                      "items": [[id, title, titleSw, aliasesSw, file], ...]}
+    body     zlib blocks
+
+Item i of the bundle is item i of getAll(): files in sorted name order,
+items in file order, synonyms.json held in the head instead of the item list.
+
+Recommended CMD:
+python tools\\content_bundle.py compile --lang en --out assets\\corpus_bundle\\en.nrcb
+python tools\\content_bundle.py verify --lang en --bundle assets\\corpus_bundle\\en.nrcb
+python tools\\content_bundle.py bench --lang sw --bundle assets\\corpus_bundle\\sw.nrcb
+"""
+
+import argparse
+import hashlib
+import json
+import struct
+import sys
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+
+MAGIC = b"NRCB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIII20s")
+
+CORPUS_ROOT = Path("assets/corpus")
+SYNONYMS_FILE = "synonyms.json"
+BLOCK_BYTES = 64 * 1024
+HEAD_FIELDS = ("id", "title", "titleSw", "aliasesSw")
+
+
+def _le_array(typecode, data):
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def _le_bytes(arr):
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _minify(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def source_files(lang, root=CORPUS_ROOT):
+    """Same files, in the same order, as AssetsContentRepository loads them."""
+    paths = sorted((Path(root) / lang).glob("*.json"))
+    return [p for p in paths if p.name != SYNONYMS_FILE], Path(root) / lang / SYNONYMS_FILE
+
+
+def read_items(path):
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, dict) and isinstance(data.get("items"), list):
+        data = data["items"]
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a JSON array or an object with an 'items' array")
+    return data
+
+
+def read_source(lang, root=CORPUS_ROOT):
+    """(files, items as (file index, item), synonyms, sha1 over the source bytes)."""
+    paths, syn_path = source_files(lang, root)
+    digest = hashlib.sha1()
+    files, items = [], []
+    for path in paths:
+        digest.update(path.name.encode("utf-8") + b"\0" + path.read_bytes())
+        try:
+            file_items = read_items(path)
+        except ValueError as e:   # the app skips these too
+            print(f"[SKIP] {e}")
+            continue
+        items += [(len(files), it) for it in file_items]
+        files.append(path.name)
+
+    synonyms = {}
+    if syn_path.exists():
+        digest.update(syn_path.name.encode("utf-8") + b"\0" + syn_path.read_bytes())
+        synonyms = json.loads(syn_path.read_text(encoding="utf-8"))
+    return files, items, synonyms, digest.digest()
+
+
+def head_row(item, file_idx):
+    return [item.get(k) for k in HEAD_FIELDS] + [file_idx]
+
+
+def compile_bundle(lang, files, items, synonyms, source_sha1, block_bytes=BLOCK_BYTES):
+    head = {
+        "lang": lang,
+        "files": files,
+        "synonyms": synonyms,
+        "items": [head_row(it, f) for f, it in items],
+    }
+    head_z = zlib.compress(_minify(head).encode("utf-8"), 9)
+
+    table = array("I")
+    blocks = array("I", [0])
+    raw_len = array("I")
+    body = bytearray()
+    block = bytearray()
+
+    def flush():
+        body.extend(zlib.compress(bytes(block), 9))
+        blocks.append(len(body))
+        raw_len.append(len(block))
+        block.clear()
+
+    for _, item in items:
+        raw = _minify(item).encode("utf-8")
+        if block and len(block) + len(raw) > block_bytes:
+            flush()
+        table.extend((len(raw_len), len(block), len(raw)))
+        block.extend(raw)
+    if block:
+        flush()
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, 0, len(items), len(raw_len), len(head_z), source_sha1))
+    out += _le_bytes(table)
+    out += _le_bytes(blocks)
+    out += _le_bytes(raw_len)
+    out += head_z
+    out += body
+    return bytes(out)
+
+
+class ContentBundle:
+    """Reference reader: parses the head eagerly, inflates a block on first access."""
+
+    def __init__(self, data):
+        magic, version, _, n, n_blocks, head_len, source_sha1 = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a content bundle (bad magic/version)")
+
+        pos = HEADER.size
+        self.table = _le_array("I", data[pos:pos + 12 * n])
+        pos += 12 * n
+        self.blocks = _le_array("I", data[pos:pos + 4 * (n_blocks + 1)])
+        pos += 4 * (n_blocks + 1)
+        self.raw_len = _le_array("I", data[pos:pos + 4 * n_blocks])
+        pos += 4 * n_blocks
+        head = json.loads(zlib.decompress(data[pos:pos + head_len]).decode("utf-8"))
+        pos += head_len
+        self.body = memoryview(data)[pos:]
+
+        self.size = n
+        self.source_sha1 = source_sha1
+        self.lang = head["lang"]
+        self.files = head["files"]
+        self.synonyms = head["synonyms"]
+        self.head = head["items"]
+        self._by_id = None
+        self._inflated = {}
+
+    @classmethod
+    def load(cls, path):
+        return cls(Path(path).read_bytes())
+
+    def __len__(self):
+        return self.size
+
+    def index_of(self, item_id):
+        if self._by_id is None:
+            self._by_id = {}
+            for i, row in enumerate(self.head):
+                self._by_id.setdefault(row[0], i)   # first occurrence wins, like a list scan
+        return self._by_id.get(item_id)
+
+    def raw(self, i):
+        b, start, length = self.table[3 * i:3 * i + 3]
+        block = self._inflated.get(b)
+        if block is None:
+            block = zlib.decompress(self.body[self.blocks[b]:self.blocks[b + 1]])
+            if len(block) != self.raw_len[b]:
+                raise ValueError(f"Block {b}: inflated {len(block)} bytes, expected {self.raw_len[b]}")
+            self._inflated[b] = block
+        return block[start:start + length]
+
+    def item(self, i):
+        return json.loads(self.raw(i).decode("utf-8"))
+
+    def get(self, item_id):
+        i = self.index_of(item_id)
+        return None if i is None else self.item(i)
+
+
+def cmd_compile(args):
+    files, items, synonyms, sha = read_source(args.lang, args.root)
+    data = compile_bundle(args.lang, files, items, synonyms, sha, args.block_kb * 1024)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_bytes(data)
+
+    bundle = ContentBundle(data)
+    paths, syn_path = source_files(args.lang, args.root)
+    src_bytes = sum(p.stat().st_size for p in paths + ([syn_path] if syn_path.exists() else []))
+    head_len = HEADER.unpack_from(data, 0)[5]
+    print(f"Files: {len(files)} (+ {SYNONYMS_FILE})")
+    print(f"Items: {len(items)} in {len(bundle.raw_len)} blocks")
+    print(f"Source: {src_bytes} bytes")
+    print(f"Bundle: {out} ({len(data)} bytes, head {head_len} bytes)")
+
+
+def cmd_verify(args):
+    bundle = ContentBundle.load(args.bundle)
+    files, items, synonyms, sha = read_source(args.lang, args.root)
+
+    problems = []
+    if bundle.source_sha1 != sha:
+        problems.append("source files changed since the bundle was compiled")
+    if bundle.files != files:
+        problems.append(f"file list differs: {bundle.files} vs {files}")
+    if bundle.synonyms != synonyms:
+        problems.append("synonyms differ")
+    if len(bundle) != len(items):
+        problems.append(f"item count differs: {len(bundle)} vs {len(items)}")
+
+    for i, (f, it) in enumerate(items[:len(bundle)]):
+        got = bundle.item(i)
+        if _minify(got) != _minify(it):   # equal values and key order
+            problems.append(f"item {i} ({it.get('id')!r}) differs")
+        if bundle.head[i] != head_row(it, f):
+            problems.append(f"head row {i} ({it.get('id')!r}) differs")
+        if len(problems) > 20:
+            break
+
+    print(f"Items checked: {min(len(bundle), len(items))}")
+    for p in problems[:20]:
+        print(f"  MISMATCH: {p}")
+    if problems:
+        sys.exit(1)
+    print("Bundle matches source JSON")
+
+
+def cmd_bench(args):
+    paths, syn_path = source_files(args.lang, args.root)
+
+    t0 = time.perf_counter()
+    for path in paths + ([syn_path] if syn_path.exists() else []):
+        json.loads(path.read_text(encoding="utf-8"))
+    json_ms = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    bundle = ContentBundle.load(args.bundle)
+    open_ms = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    bundle.get(bundle.head[len(bundle) // 2][0])
+    one_ms = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    for i in range(len(bundle)):
+        bundle.item(i)
+    all_ms = (time.perf_counter() - t0) * 1000.0
+
+    src_bytes = sum(p.stat().st_size for p in paths)
+    print(f"Items: {len(bundle)}")
+    rows = [
+        ("json.loads all files", f"{json_ms:.1f} ms ({src_bytes} bytes)"),
+        ("bundle open (head)", f"{open_ms:.1f} ms ({Path(args.bundle).stat().st_size} bytes)"),
+        ("  + one item", f"{one_ms:.2f} ms"),
+        ("  + all items", f"{all_ms:.1f} ms"),
+    ]
+    for name, value in rows:
+        print(f"{name:<22}{value}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, func in (("compile", cmd_compile), ("verify", cmd_verify), ("bench", cmd_bench)):
+        p = sub.add_parser(name)
+        p.add_argument("--lang", required=True)
+        p.add_argument("--root", default=str(CORPUS_ROOT))
+        if name == "compile":
+            p.add_argument("--out", required=True)
+            p.add_argument("--block-kb", type=int, default=BLOCK_BYTES // 1024)
+        else:
+            p.add_argument("--bundle", required=True)
+        p.set_defaults(func=func)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
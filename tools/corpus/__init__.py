@@ -0,0 +1,47 @@
+"""
+corpus
+
+One loader for assets/corpus/<lang>/*.json (and any other item files):
+
+    from corpus import load_corpus, load_glob
+
+    en = load_corpus("en")                       # or load_corpus(["en", "sw"])
+    en.get("disease-head-migraine")["contentEn"]
+    titles = en.column("title")                  # one field, without touching the others
+    for it in load_glob(args.corpus_glob):       # same files as glob.glob(), helpers skipped
+        it["id"], it["contentSw"], it.file
+
+Field variants are normalized once (contentEn <- content_en / content / sections,
+contentSw <- content_sw / sectionsSw, ...; see loader.FIELDS). Each source file is
+cached in tools/cache/corpus as a binary column file keyed by mtime, size and
+content hash, so repeated loads skip JSON parsing and only decode the fields
+that are used.
+"""
+
+from .loader import (
+    CORPUS_ROOT,
+    FIELDS,
+    SKIP_FILES,
+    Corpus,
+    Item,
+    corpus_files,
+    load_corpus,
+    load_files,
+    load_glob,
+    normalize_item,
+    sections_text,
+)
+
+__all__ = [
+    "CORPUS_ROOT",
+    "FIELDS",
+    "SKIP_FILES",
+    "Corpus",
+    "Item",
+    "corpus_files",
+    "load_corpus",
+    "load_files",
+    "load_glob",
+    "normalize_item",
+    "sections_text",
+]
@@ -0,0 +1,56 @@
+"""
+python tools\\corpus [--lang en sw] [--rebuild]
+
+Loads the corpus through the cache and compares with plain json.loads of the
+same files.
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from corpus import corpus_files, load_files  # noqa: E402
+from corpus.cache import CACHE_DIR  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Corpus loader cache stats")
+    ap.add_argument("--lang", nargs="+", default=["en", "sw"])
+    ap.add_argument("--rebuild", action="store_true", help="Drop the cache first")
+    args = ap.parse_args()
+
+    if args.rebuild and CACHE_DIR.exists():
+        shutil.rmtree(CACHE_DIR)
+    paths = corpus_files(args.lang)
+
+    t0 = time.perf_counter()
+    for p in paths:
+        json.loads(p.read_text(encoding="utf-8"))
+    t_json = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    corpus = load_files(paths)
+    n = len(corpus)
+    t_open = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    titles = corpus.column("title")
+    t_titles = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for name in ("contentEn", "contentSw"):
+        corpus.column(name)
+    t_content = time.perf_counter() - t0
+
+    print(f"{len(paths)} files, {n} items ({len(set(corpus.ids))} unique ids), {len(titles)} titles")
+    print(f"json.loads all files : {t_json * 1000:8.1f} ms")
+    print(f"open (cache)         : {t_open * 1000:8.1f} ms")
+    print(f"  + title column     : {t_titles * 1000:8.1f} ms")
+    print(f"  + content columns  : {t_content * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Binary per-file column cache for the corpus loader.
+
+Layout: MAGIC, u32 header length, marshal(header), then one marshal blob per
+field. The header records the source's mtime_ns, size and sha1; a cache whose
+mtime/size still match is used as is, and one whose content hash still matches
+(file touched but unchanged) only gets its header refreshed. Columns are
+unmarshalled on first access, so a tool that needs ids and titles never
+decodes the content fields.
+"""
+
+import hashlib
+import marshal
+import os
+import struct
+import sys
+from pathlib import Path
+
+
+TOOLS = Path(__file__).resolve().parents[1]
+CACHE_DIR = TOOLS / "cache" / "corpus"
+
+MAGIC = b"CRPC"
+CACHE_VERSION = 1
+PY_TAG = f"{sys.version_info[0]}.{sys.version_info[1]}"   # marshal is only stable within a version
+
+
+class ColumnFile:
+    def __init__(self, header, data):
+        self.header = header
+        self.data = data
+        self.n = header["n"]
+        self._columns = {}
+
+    @property
+    def fields(self):
+        return list(self.header["fields"])
+
+    def blob(self, name):
+        off, length = self.header["fields"][name]
+        return self.data[off:off + length]
+
+    def column(self, name):
+        col = self._columns.get(name)
+        if col is None:
+            if name not in self.header["fields"]:
+                col = [None] * self.n
+            else:
+                col = marshal.loads(self.blob(name))
+            self._columns[name] = col
+        return col
+
+
+def cache_path(src):
+    src = Path(src).resolve()
+    digest = hashlib.sha1(str(src).encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"{src.parent.name}__{src.stem}__{digest}.bin"
+
+
+def _pack(header, blobs):
+    offsets, pos = {}, 0
+    for name, blob in blobs.items():
+        offsets[name] = [pos, len(blob)]
+        pos += len(blob)
+    head = marshal.dumps({**header, "fields": offsets})
+    return MAGIC + struct.pack("<I", len(head)) + head + b"".join(blobs.values())
+
+
+def _write(path, raw):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(raw)
+        os.replace(tmp, path)
+    except OSError as e:   # read-only checkout: still works, just uncached
+        print(f"[corpus] cache not written ({e})")
+
+
+def _read(path):
+    try:
+        return _parse(path.read_bytes())
+    except OSError:
+        return None
+
+
+def _parse(raw):
+    if raw[:4] != MAGIC:
+        return None
+    try:
+        (hlen,) = struct.unpack_from("<I", raw, 4)
+        header = marshal.loads(raw[8:8 + hlen])
+    except (struct.error, ValueError, EOFError, TypeError):
+        return None
+    if header.get("version") != CACHE_VERSION or header.get("py") != PY_TAG:
+        return None
+    return ColumnFile(header, memoryview(raw)[8 + hlen:])
+
+
+def load_columns(src, build):
+    """Columns of `src`, from cache when valid; else build(raw_bytes) -> {field: list} and cache it."""
+    src = Path(src)
+    st = src.stat()
+    path = cache_path(src)
+    cached = _read(path)
+    if cached and cached.header["mtime_ns"] == st.st_mtime_ns and cached.header["size"] == st.st_size:
+        return cached
+
+    raw = src.read_bytes()
+    sha = hashlib.sha1(raw).hexdigest()
+    header = {"version": CACHE_VERSION, "py": PY_TAG, "src": str(src), "mtime_ns": st.st_mtime_ns,
+              "size": st.st_size, "sha1": sha}
+
+    if cached and cached.header["sha1"] == sha:
+        blobs = {name: bytes(cached.blob(name)) for name in cached.fields}
+        header["n"] = cached.n
+    else:
+        columns = build(raw)
+        header["n"] = len(columns["id"])
+        blobs = {name: marshal.dumps(col) for name, col in columns.items()}
+    raw = _pack(header, blobs)
+    _write(path, raw)
+    return _parse(raw)
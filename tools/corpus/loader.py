@@ -0,0 +1,227 @@
+"""
+Canonical corpus loader: file discovery, field normalization, Corpus/Item views.
+"""
+
+import glob
+import json
+from pathlib import Path
+
+from .cache import load_columns
+
+
+TOOLS = Path(__file__).resolve().parents[1]
+CORPUS_ROOT = TOOLS.parent / "assets" / "corpus"
+
+# helper/import files that live next to the item files
+SKIP_FILES = {"synonyms.json", "sw_import.json"}
+
+# canonical fields, in column order; "raw" keeps the item exactly as stored
+FIELDS = (
+    "id",
+    "title",
+    "titleSw",
+    "contentEn",
+    "contentSw",
+    "aliasesSw",
+    "sections",
+    "sectionsSw",
+    "image",
+    "imageMeta",
+    "parentId",
+    "missingFields",
+    "needsReview",
+    "raw",
+)
+
+
+def sections_text(sections):
+    """Section titles and bodies joined with newlines ("" if there are none)."""
+    if not isinstance(sections, list):
+        return ""
+    parts = []
+    for section in sections:
+        if isinstance(section, dict):
+            parts += [section.get(k) or "" for k in ("title", "body", "text")]
+        elif isinstance(section, str):
+            parts.append(section)
+    return "\n".join(p for p in parts if p)
+
+
+def _str(value):
+    return value if isinstance(value, str) else ""
+
+
+def normalize_item(item):
+    """One raw item -> canonical field dict (see FIELDS)."""
+    content_en = (
+        _str(item.get("contentEn"))
+        or _str(item.get("content_en"))
+        or _str(item.get("content"))
+        or sections_text(item.get("sections"))
+    )
+    content_sw = (
+        _str(item.get("contentSw"))
+        or _str(item.get("contentSW"))
+        or _str(item.get("content_sw"))
+        or sections_text(item.get("sectionsSw"))
+    )
+    aliases = item.get("aliasesSw")
+    return {
+        "id": str(item.get("id") or "").strip(),
+        "title": _str(item.get("title")).strip(),
+        "titleSw": _str(item.get("titleSw")).strip(),
+        "contentEn": content_en,
+        "contentSw": content_sw,
+        "aliasesSw": [str(a) for a in aliases] if isinstance(aliases, list) else [],
+        "sections": item.get("sections") if isinstance(item.get("sections"), list) else [],
+        "sectionsSw": item.get("sectionsSw") if isinstance(item.get("sectionsSw"), list) else [],
+        "image": _str(item.get("image")),
+        "imageMeta": item.get("imageMeta"),
+        "parentId": item.get("parentId"),
+        "missingFields": list(item.get("missingFields") or []),
+        "needsReview": bool(item.get("needsReview")),
+        "raw": item,
+    }
+
+
+def _raw_items(path, raw):
+    if path.suffix == ".jsonl":
+        lines = raw.decode("utf-8").splitlines()
+        return [json.loads(line) for line in lines if line.strip()]
+    data = json.loads(raw.decode("utf-8"))
+    if isinstance(data, dict):
+        data = data.get("items")
+    return data if isinstance(data, list) else []
+
+
+def _build(path):
+    def build(raw):
+        columns = {name: [] for name in FIELDS}
+        for item in _raw_items(path, raw):
+            if not isinstance(item, dict):
+                continue
+            for name, value in normalize_item(item).items():
+                columns[name].append(value)
+        return columns
+    return build
+
+
+class Item:
+    """Lazy view of one corpus item; fields are read from their column on access."""
+
+    __slots__ = ("corpus", "index")
+
+    def __init__(self, corpus, index):
+        self.corpus = corpus
+        self.index = index
+
+    def __getitem__(self, name):
+        if name not in FIELDS:
+            raise KeyError(name)
+        return self.corpus.column(name)[self.index]
+
+    def get(self, name, default=None):
+        if name in FIELDS:
+            return self[name]
+        return self["raw"].get(name, default)
+
+    @property
+    def file(self):
+        return self.corpus.file_of(self.index)
+
+    def to_dict(self, fields=FIELDS):
+        return {name: self[name] for name in fields}
+
+    def __repr__(self):
+        return f"Item({self['id']!r} from {self.file.name})"
+
+
+class Corpus:
+    def __init__(self, files):
+        self.files = []
+        self._parts = []
+        self._starts = []
+        n = 0
+        for path, cf in files:
+            self.files.append(path)
+            self._parts.append(cf)
+            self._starts.append(n)
+            n += cf.n
+        self._n = n
+        self._columns = {}
+        self._by_id = None
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return (Item(self, i) for i in range(self._n))
+
+    def column(self, name):
+        """All values of one field, in file then item order."""
+        col = self._columns.get(name)
+        if col is None:
+            if name not in FIELDS:
+                raise KeyError(name)
+            col = []
+            for cf in self._parts:
+                col.extend(cf.column(name))
+            self._columns[name] = col
+        return col
+
+    @property
+    def ids(self):
+        return self.column("id")
+
+    def file_of(self, index):
+        lo, hi = 0, len(self._starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._starts[mid] <= index:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.files[lo]
+
+    def get(self, item_id, default=None):
+        if self._by_id is None:
+            self._by_id = {}
+            for i, iid in enumerate(self.ids):
+                self._by_id.setdefault(iid, i)   # first occurrence wins
+        i = self._by_id.get(item_id)
+        return default if i is None else Item(self, i)
+
+    def __getitem__(self, item_id):
+        it = self.get(item_id)
+        if it is None:
+            raise KeyError(item_id)
+        return it
+
+    def __contains__(self, item_id):
+        return self.get(item_id) is not None
+
+
+def corpus_files(langs=("en",), root=CORPUS_ROOT, skip=SKIP_FILES):
+    if isinstance(langs, str):
+        langs = (langs,)
+    paths = []
+    for lang in langs:
+        paths += sorted(p for p in (Path(root) / lang).glob("*.json") if p.name not in skip)
+    return paths
+
+
+def load_files(paths):
+    paths = [Path(p) for p in paths]
+    return Corpus([(p, load_columns(p, _build(p))) for p in paths if p.name not in SKIP_FILES])
+
+
+def load_corpus(langs=("en",), root=CORPUS_ROOT):
+    return load_files(corpus_files(langs, root))
+
+
+def load_glob(*patterns):
+    """Same files as sorted(glob.glob(pattern)) for each pattern, helper files skipped."""
+    paths = []
+    for pattern in patterns:
+        paths += sorted(glob.glob(str(pattern)))
+    return load_files(paths)
@@ -0,0 +1,98 @@
+"""
+csv_stream.py
+
+Streaming, per-row durable CSV output for the *_translation.csv fillers
+(fill_translation_csvs_sw.py / resume_translation_sw.py --stream).
+
+Rows are read lazily, translated a window at a time and appended to the output
+as soon as they are done (flushed every row, fsync'd every N rows). On restart
+the output's ids are the only state that is read back; a torn last row from a
+crash is cut off first. A newline ends a record only outside quotes (after an
+even number of '"' bytes, since an escaped quote is doubled), which holds for
+LF files and for the \\r\\n records RowWriter writes alike.
+"""
+
+import csv
+import os
+from itertools import islice
+from pathlib import Path
+
+
+def repair_tail(path):
+    """Truncate a partially written last row. Returns the number of bytes dropped.
+
+    Raises ValueError, leaving the file alone, if it has no complete record."""
+    path = Path(path)
+    if not path.exists():
+        return 0
+    size = path.stat().st_size
+    if size == 0:
+        return 0
+    with path.open("rb+") as f:
+        keep = quotes = offset = 0   # keep: end of the last record that closed outside quotes
+        while block := f.read(1 << 16):
+            start = 0
+            while (i := block.find(b"\n", start)) >= 0:
+                quotes += block.count(b'"', start, i)
+                if quotes % 2 == 0:
+                    keep = offset + i + 1
+                start = i + 1
+            quotes += block.count(b'"', start)
+            offset += len(block)
+        if keep == size:
+            return 0
+        if keep == 0:
+            raise ValueError(f"{path}: no complete CSV record, refusing to truncate")
+        f.truncate(keep)
+        return size - keep
+
+
+def read_done_ids(path, key="id"):
+    """Ids already present in an output CSV (streamed, only the id column is kept)."""
+    path = Path(path)
+    if not path.exists() or path.stat().st_size == 0:
+        return set()
+    with path.open("r", encoding="utf-8", newline="") as f:
+        return {(r.get(key) or "").strip() for r in csv.DictReader(f)} - {""}
+
+
+def windows(iterable, n):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, max(1, n)))
+        if not chunk:
+            return
+        yield chunk
+
+
+class RowWriter:
+    def __init__(self, path, fieldnames, fsync_every=20):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        self.f = self.path.open("a", encoding="utf-8", newline="")
+        self.w = csv.DictWriter(self.f, fieldnames=fieldnames, lineterminator="\r\n")
+        self.fsync_every = max(1, fsync_every)
+        self.rows = 0
+        if new:
+            self.w.writeheader()
+            self.f.flush()
+
+    def writerow(self, row):
+        self.w.writerow(row)
+        self.f.flush()
+        self.rows += 1
+        if self.rows % self.fsync_every == 0:
+            os.fsync(self.f.fileno())
+
+    def close(self):
+        if not self.f.closed:
+            self.f.flush()
+            os.fsync(self.f.fileno())
+            self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+dedupe_segments.py
+
+Corpus-wide unique-segment pre-pass for EN->SW translation.
+
+The disease/herb/principle files repeat a lot of boilerplate (hydrotherapy,
+diet, charcoal poultices, ...). Every translator used to pay for each copy.
+This pass walks all translation inputs:
+
+  - assets/corpus/en/*.json
+  - assets/content_normalized/*.json
+  - content_json/cleaned/json/*_translation.csv
+
+counting one English text per item (contentEn, or its sections when it has
+none: sections[].title/body repeat contentEn and would inflate the savings).
+Texts are split the way the consumer picked with --for splits them, and each
+piece is keyed with translation_memory.normalize_segment():
+
+  lines     raw lines (paragraphs on blank lines, then lines; bare bullets and
+            numbering are structure and skipped): resume_translation_sw.py,
+            fill_missing_sw_deeptranslator.py            -> deep-translator/en-sw
+  glossary  the same lines after glossary protection ([[Tn]] placeholders):
+            fill_translation_csvs_sw.py                  -> deep-translator/en-sw
+  marian    marian_batching sentences (long ones are not cut, there is no
+            tokenizer here): mt_en_to_sw.py              -> marian/Helsinki-NLP/opus-mt-en-sw
+
+Outputs:
+
+  tools/out/segments/unique_segments.jsonl  {"seg", "text", "count"}  (most repeated first)
+  tools/out/segments/segment_map.jsonl      {"file", "id", "field", "paragraph", "line", "seg"}
+  tools/out/segments/report.json            totals, savings, top repeats, per source
+
+Filling the unique list with the consumer's backend (translators.py fill
+--backend deep-translator for lines/glossary, --backend marian for marian)
+stores every segment under the key that consumer looks up in the translation
+memory, so its next run is served from there. When the consumer runs with
+another --backend, pass that backend's --tm-backend/--tm-model here.
+
+Usage:
+    python tools\\dedupe_segments.py
+    python tools\\dedupe_segments.py --for glossary --pending-only --skip-known
+"""
+
+import argparse
+import csv
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+from corpus import sections_text
+from translation_memory import TranslationMemory, normalize_segment
+
+
+ROOT = Path(__file__).resolve().parents[1]
+JSON_GLOBS = ["assets/corpus/en/*.json", "assets/content_normalized/*.json"]
+CSV_GLOBS = ["content_json/cleaned/json/*_translation.csv"]
+OUT_DIR = ROOT / "tools" / "out" / "segments"
+
+STRUCTURE_ONLY_RE = re.compile(r"^\s*([#>\-\*\d\.\)]+)\s*$")
+
+
+def iter_lines(text):
+    """(paragraph, line, text) for every translatable line."""
+    for p_idx, para in enumerate((text or "").replace("\r\n", "\n").split("\n\n")):
+        for l_idx, line in enumerate(para.split("\n")):
+            if line.strip() and not STRUCTURE_ONLY_RE.match(line):
+                yield p_idx, l_idx, line
+
+
+def iter_glossary_lines(text):
+    """iter_lines() after per-paragraph glossary protection, like fill_translation_csvs_sw."""
+    from glossary import load_glossary
+
+    glossary = load_glossary()
+    for p_idx, para in enumerate((text or "").replace("\r\n", "\n").split("\n\n")):
+        for l_idx, line in enumerate(glossary.protect(para)[0].split("\n")):
+            if line.strip() and not STRUCTURE_ONLY_RE.match(line):
+                yield p_idx, l_idx, line
+
+
+def iter_sentences(text):
+    """(paragraph, sentence, text) for every marian_batching segment."""
+    from marian_batching import SegmentPlan
+
+    plan = SegmentPlan()
+    plan.add(None, text)
+    for p_idx, blocks in enumerate(plan.layout[None]):
+        ids = [i for _, seg_ids, translated in blocks if translated for i in seg_ids]
+        for s_idx, i in enumerate(ids):
+            yield p_idx, s_idx, plan.segments[i]
+
+
+# --for: (splitter, translation-memory backend, model)
+TARGETS = {
+    "lines": (iter_lines, "deep-translator", "en-sw"),
+    "glossary": (iter_glossary_lines, "deep-translator", "en-sw"),
+    "marian": (iter_sentences, "marian", "Helsinki-NLP/opus-mt-en-sw"),
+}
+
+
+def iter_json_fields(path, pending_only):
+    data = json.loads(path.read_text(encoding="utf-8"))
+    items = data.get("items") if isinstance(data, dict) else data
+    for it in items or []:
+        item_id = it.get("id") or ""
+        if pending_only and (it.get("contentSw") or "").strip():
+            continue
+        yield item_id, "title", it.get("title") or ""
+        content = it.get("contentEn") or ""
+        if content.strip():
+            yield item_id, "contentEn", content
+        else:   # one representation per item: sections only stand in for a missing contentEn
+            yield item_id, "sections", sections_text(it.get("sections"))
+
+
+def iter_csv_fields(path, pending_only):
+    with path.open("r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            if pending_only and (row.get("contentSw") or "").strip():
+                continue
+            item_id = row.get("id") or ""
+            yield item_id, "title", row.get("title") or ""
+            yield item_id, "contentEn", row.get("contentEn") or ""
+
+
+def collect_sources(json_globs, csv_globs):
+    sources = []
+    for pattern in json_globs:
+        sources += [(p, iter_json_fields) for p in sorted(ROOT.glob(pattern))]
+    for pattern in csv_globs:
+        sources += [(p, iter_csv_fields) for p in sorted(ROOT.glob(pattern))]
+    return sources
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build a de-duplicated EN segment work list for translation")
+    ap.add_argument("--json-glob", action="append", default=None, help=f"Repeatable; default {JSON_GLOBS}")
+    ap.add_argument("--csv-glob", action="append", default=None, help=f"Repeatable; default {CSV_GLOBS}")
+    ap.add_argument("--out-dir", default=str(OUT_DIR))
+    ap.add_argument("--pending-only", action="store_true", help="Only items whose contentSw is still empty")
+    ap.add_argument("--for", dest="target", choices=list(TARGETS), default="lines",
+                    help="Consumer whose splitting and memory keys to use (see module docstring)")
+    ap.add_argument("--skip-known", action="store_true", help="Drop segments already in the translation memory")
+    ap.add_argument("--tm-backend", default=None, help="Default: the --for consumer's backend")
+    ap.add_argument("--tm-model", default=None, help="Default: the --for consumer's model")
+    ap.add_argument("--top", type=int, default=25, help="Most repeated segments to list in the report")
+    args = ap.parse_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    split, tm_backend, tm_model = TARGETS[args.target]
+    tm_backend, tm_model = args.tm_backend or tm_backend, args.tm_model or tm_model
+
+    seg_ids = {}
+    texts = []
+    counts = Counter()
+    per_source = {}
+    total_chars = 0
+
+    with (out_dir / "segment_map.jsonl").open("w", encoding="utf-8") as f_map:
+        for path, reader in collect_sources(args.json_glob or JSON_GLOBS, args.csv_glob or CSV_GLOBS):
+            rel = path.relative_to(ROOT).as_posix()
+            occurrences = 0
+            for item_id, field, text in reader(path, args.pending_only):
+                for p_idx, l_idx, line in split(text):
+                    key = normalize_segment(line)
+                    seg = seg_ids.get(key)
+                    if seg is None:
+                        seg = seg_ids[key] = len(texts)
+                        texts.append(key)
+                    counts[seg] += 1
+                    occurrences += 1
+                    total_chars += len(key)
+                    f_map.write(json.dumps({
+                        "file": rel, "id": item_id, "field": field,
+                        "paragraph": p_idx, "line": l_idx, "seg": seg,
+                    }, ensure_ascii=False) + "\n")
+            per_source[rel] = occurrences
+            print(f"{rel}: {occurrences} segment(s)")
+
+    known = set()
+    if args.skip_known and texts:
+        with TranslationMemory() as tm:
+            known = {seg_ids[k] for k in tm.get_many(texts, tm_backend, tm_model)}
+
+    order = sorted(range(len(texts)), key=lambda i: (-counts[i], i))
+    with (out_dir / "unique_segments.jsonl").open("w", encoding="utf-8") as f_out:
+        for i in order:
+            if i not in known:
+                f_out.write(json.dumps({"seg": i, "text": texts[i], "count": counts[i]}, ensure_ascii=False) + "\n")
+
+    occurrences = sum(counts.values())
+    unique_chars = sum(len(t) for t in texts)
+    work_chars = sum(len(texts[i]) for i in range(len(texts)) if i not in known)
+    report = {
+        "target": args.target,
+        "tm_backend": tm_backend,
+        "tm_model": tm_model,
+        "sources": per_source,
+        "occurrences": occurrences,
+        "unique_segments": len(texts),
+        "already_in_memory": len(known),
+        "work_segments": len(texts) - len(known),
+        "chars_total": total_chars,
+        "chars_unique": unique_chars,
+        "chars_work": work_chars,
+        "segments_saved_pct": round(100.0 * (1 - (len(texts) - len(known)) / max(1, occurrences)), 2),
+        "chars_saved_pct": round(100.0 * (1 - work_chars / max(1, total_chars)), 2),
+        "top_repeated": [{"count": counts[i], "text": texts[i]} for i in order[:args.top] if counts[i] > 1],
+    }
+    (out_dir / "report.json").write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"\nSegments: {occurrences} occurrences -> {len(texts)} unique"
+          f" ({len(known)} already in memory) -> {report['work_segments']} to translate")
+    print(f"Characters: {total_chars} -> {work_chars}  (saved {report['chars_saved_pct']}%)")
+    print(f"Wrote {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import torch
 from pathlib import Path
 from transformers import AutoTokenizer, AutoModel
@@ -27,34 +28,33 @@ class E5Encoder(torch.nn.Module):
         return embeddings
 
 
-def main():
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
+def truncate_layers(model, num_layers):
+    # Keep the bottom `num_layers` transformer blocks; pooling is unchanged.
+    total = len(model.encoder.layer)
+    if not 0 < num_layers <= total:
+        raise ValueError(f"num_layers must be in 1..{total}, got {num_layers}")
 
-    print(f"Loading model: {MODEL_ID}")
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
-    model = AutoModel.from_pretrained(MODEL_ID)
-    model.eval()
+    model.encoder.layer = model.encoder.layer[:num_layers]
+    model.config.num_hidden_layers = num_layers
+    return model
 
-    encoder = E5Encoder(model)
-    encoder.eval()
 
+def export_onnx(encoder, tokenizer, onnx_out, max_len=MAX_LEN):
     sample = tokenizer(
         "query: natural remedy for cough",
         padding="max_length",
         truncation=True,
-        max_length=MAX_LEN,
+        max_length=max_len,
         return_tensors="pt",
     )
 
     input_ids = sample["input_ids"].to(torch.long)
     attention_mask = sample["attention_mask"].to(torch.long)
 
-    print(f"Exporting ONNX to: {ONNX_OUT}")
-
     torch.onnx.export(
         encoder,
         (input_ids, attention_mask),
-        str(ONNX_OUT),
+        str(onnx_out),
         input_names=["input_ids", "attention_mask"],
         output_names=["embeddings"],
         opset_version=18,
@@ -62,12 +62,39 @@ def main():
         
     )
 
-    tokenizer.save_pretrained(OUT_DIR)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-layers", type=int, default=None)
+    parser.add_argument("--onnx-out", default=str(ONNX_OUT))
+    args = parser.parse_args()
+
+    onnx_out = Path(args.onnx_out)
+    out_dir = onnx_out.parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"Loading model: {MODEL_ID}")
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+    model = AutoModel.from_pretrained(MODEL_ID)
+    model.eval()
+
+    if args.num_layers:
+        print(f"Truncating encoder to {args.num_layers} layer(s)")
+        truncate_layers(model, args.num_layers)
+
+    encoder = E5Encoder(model)
+    encoder.eval()
+
+    print(f"Exporting ONNX to: {onnx_out}")
+
+    export_onnx(encoder, tokenizer, onnx_out, MAX_LEN)
+
+    tokenizer.save_pretrained(out_dir)
 
     print("Done.")
-    print(f"ONNX model: {ONNX_OUT}")
-    print(f"Tokenizer files saved to: {OUT_DIR}")
+    print(f"ONNX model: {onnx_out}")
+    print(f"Tokenizer files saved to: {out_dir}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,132 +1,64 @@
-import json, re, time, random, argparse, os
+import json, re, time, argparse, os
 from pathlib import Path
 from typing import List, Dict, Any
 
-try:
-    from deep_translator import GoogleTranslator, MyMemoryTranslator
-except Exception:
-    raise SystemExit("Please install deep-translator: pip install deep-translator")
-
 try:
     from tqdm import tqdm
 except Exception:
     tqdm = lambda x, **kw: x  # no-op if tqdm not installed
 
+from glossary import load_glossary
+from translation_memory import TranslationMemory
+from translators import add_backend_arguments, translator_from_args
+from web_translate_client import add_rate_arguments
+
 # --------- config / paths ----------
 ROOT = Path(__file__).resolve().parents[1]
 SRC  = ROOT / "assets" / "content_normalized"   # input folder (your normalized files)
 OUT  = ROOT / "assets" / "content_sw_filled"    # output folder
 OUT.mkdir(parents=True, exist_ok=True)
 
-GLOSSARY_PATH = ROOT / "tools" / "sw_glossary.json"
-GLOSSARY = {}
-if GLOSSARY_PATH.exists():
-    try:
-        GLOSSARY = json.loads(GLOSSARY_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        print("[warn] glossary JSON invalid, ignoring:", GLOSSARY_PATH)
+GLOSSARY = load_glossary()  # tools/glossary_sw.csv + tools/sw_glossary.json, compiled once
 
 # --------- helpers ----------
 CACHE: Dict[str, str] = {}
+TM = TranslationMemory()
+TRANSLATOR = None  # translators.Translator, configured in main()
+
+STRUCTURE_ONLY_RE = re.compile(r"^\s*([#>\-\*\d\.\)]+)\s*$")
+
+def translatable_lines(text: str) -> List[str]:
+    """Lines of a block that go to the translator (bare bullets/numbering stay EN)."""
+    lines = []
+    for p in (text or "").split("\n\n"):
+        lines.extend(ln for ln in p.split("\n") if not STRUCTURE_ONLY_RE.match(ln or ""))
+    return lines
+
+def item_texts(item: Dict[str, Any]) -> List[str]:
+    """Every English text fill_item_sw() will translate for this item."""
+    texts = []
+    if not (item.get("contentSw") or "").strip():
+        texts.append(item.get("contentEn", ""))
+    secs = item.get("sections")
+    if isinstance(secs, list):
+        for s in secs:
+            texts.append((s.get("title") or "").strip())
+            texts.append((s.get("body") or "").strip())
+    return texts
 
-def gfix(sw: str) -> str:
-    """Apply glossary & quick cleanups."""
-    t = sw or ""
-    for en, sw_term in GLOSSARY.items():
-        t = re.sub(rf"\b{re.escape(en)}\b", sw_term, t, flags=re.IGNORECASE)
-    # normalize whitespace
-    t = re.sub(r"\s+\n", "\n", t)
-    return t.strip()
-
-def translate_batch(lines: List[str], sleep=0.15, batch_size=20) -> List[str]:
-    """Google batch -> Google single -> MyMemory single -> fallback."""
-    out = [None] * len(lines)
-    idxs = [i for i, s in enumerate(lines) if s and not s.isspace()]
-    if not idxs:
-        return lines[:]
-
-    # 1) Google batch
-    try:
-        gt = GoogleTranslator(source="en", target="sw")
-        # clamp length to stay safe
-        safe = [lines[i][:4500] for i in idxs]
-        res = gt.translate_batch(safe)
-        for i, r in zip(idxs, res):
-            out[i] = r
-    except Exception:
-        pass
-
-    # 2) Google single
-    for i in idxs:
-        if out[i] is not None:
-            continue
-        try:
-            out[i] = GoogleTranslator(source="en", target="sw").translate(lines[i])
-        except Exception:
-            pass
-
-    # 3) MyMemory single
-    for i in idxs:
-        if out[i] is not None:
-            continue
-        try:
-            out[i] = MyMemoryTranslator(source="en", target="sw").translate(lines[i])
-        except Exception:
-            pass
-
-    # 4) fallback to original
-    for i in idxs:
-        if out[i] is None:
-            out[i] = lines[i]
-
-    # fill blanks for empty inputs and cache
-    for i, s in enumerate(lines):
-        if out[i] is None:
-            out[i] = s
-        CACHE[s] = out[i]
-
-    time.sleep(sleep)
-    return out
-
-def translate_block(text: str, batch_size=20) -> str:
+def translate_block(text: str) -> str:
     """Paragraph-aware translation with caching and bullet preservation."""
     if not (text or "").strip():
         return text
-    paragraphs = (text or "").split("\n\n")
-    out_paras = []
 
-    for p in paragraphs:
-        lines = p.split("\n")
-        to_tx, idxs = [], []
-        for i, ln in enumerate(lines):
-            # skip bare bullets/numbering; keep in EN (structure only)
-            if re.match(r"^\s*([#>\-\*\d\.\)]+)\s*$", ln or ""):
-                continue
-            if ln in CACHE:
-                continue
-            to_tx.append(ln)
-            idxs.append(i)
-
-        # send in chunks with simple backoff
-        for k in range(0, len(to_tx), batch_size):
-            chunk = to_tx[k:k+batch_size]
-            if not chunk:
-                continue
-            backoff = 0
-            while True:
-                try:
-                    res = translate_batch(chunk, batch_size=batch_size)
-                    for j, tr in enumerate(res):
-                        CACHE[chunk[j]] = tr
-                    break
-                except Exception:
-                    backoff = max(0.5, min(8, backoff*2 if backoff else 0.5))
-                    time.sleep(backoff + random.uniform(0, 0.3))
-
-        # rebuild paragraph
+    # memory first, then the backend (usually a no-op after process_file's prefetch)
+    TRANSLATOR.fill_cache(translatable_lines(text), CACHE)
+
+    out_paras = []
+    for p in (text or "").split("\n\n"):
         out_lines = []
-        for ln in lines:
-            if re.match(r"^\s*([#>\-\*\d\.\)]+)\s*$", ln or ""):
+        for ln in p.split("\n"):
+            if STRUCTURE_ONLY_RE.match(ln or ""):
                 out_lines.append(ln)  # keep structure-only line
             else:
                 out_lines.append(CACHE.get(ln, ln))
@@ -142,12 +74,12 @@ def reconstruct_content_from_sections(sections: List[Dict[str, str]]) -> str:
         blocks.append(f"{t}\n\n{b}".strip() if t else b)
     return "\n\n".join([x for x in blocks if x])
 
-def fill_item_sw(item: Dict[str, Any], batch_size=20) -> Dict[str, Any]:
+def fill_item_sw(item: Dict[str, Any]) -> Dict[str, Any]:
     it = dict(item)
 
     # 1) translate contentSw if missing
     if not (it.get("contentSw") or "").strip():
-        it["contentSw"] = translate_block(it.get("contentEn",""), batch_size=batch_size)
+        it["contentSw"] = translate_block(it.get("contentEn",""))
 
     # 2) if there are sections, also build sectionsSw for cleaner headings
     secs = it.get("sections")
@@ -156,9 +88,9 @@ def fill_item_sw(item: Dict[str, Any], batch_size=20) -> Dict[str, Any]:
         for s in secs:
             title_en = (s.get("title") or "").strip()
             body_en  = (s.get("body")  or "").strip()
-            title_sw = translate_block(title_en, batch_size=batch_size) if title_en else ""
-            body_sw  = translate_block(body_en,  batch_size=batch_size) if body_en  else ""
-            new_sw.append({"title": gfix(title_sw), "body": gfix(body_sw)})
+            title_sw = translate_block(title_en) if title_en else ""
+            body_sw  = translate_block(body_en) if body_en  else ""
+            new_sw.append({**s, "title": GLOSSARY.fix(title_sw), "body": GLOSSARY.fix(body_sw)})   # keeps "key"
         it["sectionsSw"] = new_sw
         # rebuild contentSw from translated sections (better for the accordion splitter)
         rebuilt = reconstruct_content_from_sections(new_sw)
@@ -166,7 +98,7 @@ def fill_item_sw(item: Dict[str, Any], batch_size=20) -> Dict[str, Any]:
             it["contentSw"] = rebuilt
 
     # 3) glossary pass on contentSw
-    it["contentSw"] = gfix(it.get("contentSw",""))
+    it["contentSw"] = GLOSSARY.fix(it.get("contentSw",""))
 
     # 4) mark as reviewed if both sides exist
     if (it.get("contentEn","").strip() and it.get("contentSw","").strip()):
@@ -174,7 +106,7 @@ def fill_item_sw(item: Dict[str, Any], batch_size=20) -> Dict[str, Any]:
 
     return it
 
-def process_file(basename: str, batch_size=20):
+def process_file(basename: str):
     src = SRC / basename
     if not src.exists():
         print(f"[warn] missing {src}, skipping")
@@ -185,27 +117,45 @@ def process_file(basename: str, batch_size=20):
         print(f"[warn] unexpected JSON shape in {basename}, skipping")
         return
 
+    # all of the file's lines in one run (concurrent and rate-limited for the web providers)
+    lines = [ln for it in items for t in item_texts(it) for ln in translatable_lines(t)]
+    t0 = time.time()
+    n = TRANSLATOR.fill_cache(lines, CACHE)
+    if n:
+        print(f"[fill] {basename}: translated {n} unique line(s) in {time.time() - t0:.1f}s")
+
     out_items = []
     for it in tqdm(items, desc=f"Filling {basename}"):
-        out_items.append(fill_item_sw(it, batch_size=batch_size))
+        out_items.append(fill_item_sw(it))
 
     (OUT / basename).write_text(json.dumps(out_items, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"[done] wrote {OUT/basename} ({len(out_items)} items)")
 
 def main():
+    global TRANSLATOR
     ap = argparse.ArgumentParser()
+    add_backend_arguments(ap)
     ap.add_argument("--batch-size", type=int, default=20)
-    ap.add_argument("--sleep", type=float, default=0.15)  # kept for compatibility, used inside translate_batch
+    ap.add_argument("--concurrency", type=int, default=4, help="Provider requests in flight")
+    add_rate_arguments(ap)
     args = ap.parse_args()
 
-    # Prime a quick test to verify connectivity early (optional)
-    try:
-        GoogleTranslator(source="en", target="sw").translate("Test")
-    except Exception as e:
-        print("[warn] Google translator not reachable right now, will try fallbacks too:", e)
+    if args.backend == "deep-translator":
+        try:
+            import deep_translator  # noqa: F401  (providers are created by web_translate_client)
+        except Exception:
+            raise SystemExit("Please install deep-translator: pip install deep-translator")
+    TRANSLATOR = translator_from_args(args, TM)
+
+    if args.backend == "deep-translator":
+        # Prime a quick test to verify connectivity early (optional)
+        try:
+            TRANSLATOR.client.providers[0].translate_batch(["Test"])
+        except Exception as e:
+            print("[warn] Google translator not reachable right now, will try fallbacks too:", e)
 
-    process_file("herbs.json", batch_size=args.batch_size)
-    process_file("principles.json", batch_size=args.batch_size)
+    process_file("herbs.json")
+    process_file("principles.json")
     print("[fill] all done ✓")
 
 if __name__ == "__main__":
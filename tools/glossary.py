@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+glossary.py
+
+Compiled EN->SW glossary shared by the translators.
+
+Loads tools/glossary_sw.csv (en,sw,preserve) and tools/sw_glossary.json
+({"en term": "sw term"}) once and compiles every term into a single
+trie-shaped regex (common prefixes factored out), so each operation is one
+pass over the text and its cost stays flat as the glossary grows:
+
+    g = load_glossary()
+    text, ph = g.protect(en_line)     # preserved terms -> [[T0]], [[T1]], ...
+    sw = g.restore(translated, ph)    # placeholders -> original terms
+    sw = g.map(sw)                    # leftover English terms -> Swahili (whole words)
+    sw = g.fix(sw)                    # map + whitespace cleanup
+
+Micro-benchmark against the old per-term re.sub loops:
+
+    python tools\\glossary.py bench --sizes 20 500 2000 5000
+"""
+
+import argparse
+import csv
+import json
+import random
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+
+
+TOOLS = Path(__file__).resolve().parent
+GLOSSARY_CSV = TOOLS / "glossary_sw.csv"
+GLOSSARY_JSON = TOOLS / "sw_glossary.json"
+
+PLACEHOLDER_RE = re.compile(r"\[\[T(\d+)\]\]")
+WS_BEFORE_NL_RE = re.compile(r"\s+\n")
+
+
+def trie_pattern(terms):
+    """Regex source matching any of terms (compare lowercased); longer terms win."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+def _compile(terms, word_boundary):
+    if not terms:
+        return None
+    pattern = trie_pattern(terms)
+    if word_boundary:
+        pattern = rf"\b(?:{pattern})\b"
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class Glossary:
+    def __init__(self, preserve_terms=(), mapping=()):
+        self.preserve_terms = list(dict.fromkeys(t for t in preserve_terms if t))
+        self.mapping = {}
+        for en, sw in mapping:
+            if en and sw:
+                self.mapping.setdefault(en.lower(), sw)  # first entry wins
+        self._protect_re = _compile({t.lower() for t in self.preserve_terms}, word_boundary=False)
+        self._map_re = _compile(set(self.mapping), word_boundary=True)
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def protect(self, text):
+        """Replace preserved terms with [[Tn]] placeholders. Returns (text, {token: original})."""
+        placeholders = {}
+        if not self._protect_re or not text:
+            return text, placeholders
+
+        def repl(m):
+            token = f"[[T{len(placeholders)}]]"
+            placeholders[token] = m.group(0)
+            return token
+
+        return self._protect_re.sub(repl, text), placeholders
+
+    def restore(self, text, placeholders):
+        if not placeholders or not text:
+            return text
+        return PLACEHOLDER_RE.sub(lambda m: placeholders.get(m.group(0), m.group(0)), text)
+
+    def map(self, text):
+        if not self._map_re or not text:
+            return text
+        return self._map_re.sub(lambda m: self.mapping[m.group(0).lower()], text)
+
+    def fix(self, text):
+        """Glossary mapping plus the usual whitespace cleanup."""
+        t = self.map(text or "")
+        t = WS_BEFORE_NL_RE.sub("\n", t)
+        return t.strip()
+
+
+def read_csv_glossary(path):
+    preserve, mapping = [], []
+    path = Path(path)
+    if not path.exists():
+        return preserve, mapping
+    with path.open("r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            en = (row.get("en") or "").strip()
+            sw = (row.get("sw") or "").strip()
+            if not en:
+                continue
+            if (row.get("preserve") or "").strip().lower() in ("yes", "true", "1"):
+                preserve.append(en)
+            if sw:
+                mapping.append((en, sw))
+    return preserve, mapping
+
+
+def read_json_glossary(path):
+    path = Path(path)
+    if not path.exists():
+        return []
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        print("[warn] glossary JSON invalid, ignoring:", path)
+        return []
+    return [(en.strip(), (sw or "").strip()) for en, sw in data.items()]
+
+
+@lru_cache(maxsize=None)
+def load_glossary(csv_path=GLOSSARY_CSV, json_path=GLOSSARY_JSON):
+    """Load and compile once per (csv, json) pair; pass None to skip a source."""
+    preserve, mapping = read_csv_glossary(csv_path) if csv_path else ([], [])
+    if json_path:
+        mapping += read_json_glossary(json_path)
+    return Glossary(preserve, mapping)
+
+
+# --- micro-benchmark ---
+
+def _legacy(preserve, mapping, text):
+    """The previous per-term implementation (protect_terms + apply_map_terms + gfix)."""
+    placeholders = {}
+    i = 0
+    for term in preserve:
+        def _repl(m):
+            nonlocal i
+            token = f"[[T{i}]]"
+            placeholders[token] = m.group(0)
+            i += 1
+            return token
+        text = re.compile(re.escape(term), re.IGNORECASE).sub(_repl, text)
+    for en, sw in mapping:
+        text = re.sub(rf"\b{re.escape(en)}\b", sw, text, flags=re.IGNORECASE)
+    return text
+
+
+def _synthetic_terms(n, rng):
+    syllables = ["ka", "lo", "mi", "ther", "pa", "gas", "tro", "neu", "ri", "tis", "cardi", "os", "hepa", "derm"]
+    terms = set()
+    while len(terms) < n:
+        words = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(1, 3))]
+        terms.add(" ".join(words))
+    return sorted(terms)
+
+
+def bench(sizes, n_texts, repeat):
+    rng = random.Random(0)
+    corpus = TOOLS.parent / "assets" / "corpus" / "en"
+    texts = []
+    for path in sorted(corpus.glob("diseases_*.json")):
+        texts += [it.get("contentEn") or "" for it in json.loads(path.read_text(encoding="utf-8"))]
+    texts = [t for t in texts if t][:n_texts] or ["Apply a charcoal poultice to the liver area twice a day."] * n_texts
+    chars = sum(len(t) for t in texts)
+    base_preserve, base_mapping = read_csv_glossary(GLOSSARY_CSV)
+
+    print(f"{len(texts)} texts, {chars} chars, best of {repeat}")
+    print(f"{'terms':>7} {'legacy ms':>10} {'compiled ms':>12} {'compile ms':>11} {'speedup':>8}")
+    for size in sizes:
+        extra = _synthetic_terms(max(0, size - len(base_mapping)), rng)
+        mapping = base_mapping + [(t, t.upper()) for t in extra]
+        preserve = base_preserve + extra[: size // 10]
+
+        t0 = time.perf_counter()
+        g = Glossary(preserve, mapping)
+        compile_ms = (time.perf_counter() - t0) * 1000
+
+        def run_compiled():
+            for t in texts:
+                p, ph = g.protect(t)
+                g.fix(g.restore(p, ph))
+
+        def run_legacy():
+            for t in texts:
+                _legacy(preserve, mapping, t)
+
+        timings = []
+        for fn in (run_legacy, run_compiled):
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - t0)
+            timings.append(best * 1000)
+        print(f"{len(mapping):>7} {timings[0]:>10.1f} {timings[1]:>12.1f} {compile_ms:>11.1f} {timings[0] / timings[1]:>7.1f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("show", help="Print glossary sizes")
+    p.add_argument("--csv", default=str(GLOSSARY_CSV))
+    p.add_argument("--json", default=str(GLOSSARY_JSON))
+
+    p = sub.add_parser("bench", help="Compiled vs per-term regex timing")
+    p.add_argument("--sizes", type=int, nargs="+", default=[20, 500, 2000, 5000])
+    p.add_argument("--texts", type=int, default=200)
+    p.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.command == "show":
+        g = load_glossary(args.csv, args.json)
+        print(f"Glossary: preserve={len(g.preserve_terms)}; mapped={len(g.mapping)}")
+    else:
+        bench(args.sizes, args.texts, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
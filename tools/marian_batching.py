@@ -0,0 +1,235 @@
+"""
+marian_batching.py
+
+Global sentence-level batching engine for Marian EN->SW translation, shared by
+tools/mt_en_to_sw.py and data-pipeline/translate_sw_hf_resumable.py.
+
+1. SegmentPlan splits every pending text into paragraphs, lines (bullets keep
+   their marker) and sentences up front, and de-duplicates the sentences.
+2. translate_segments() consults the translation memory, sorts the misses by
+   token length and runs model.generate() on token-budgeted batches, with
+   num_beams chosen per length bucket. A batch that fails leaves its segments
+   None and out of the memory.
+3. SegmentPlan.stitch() puts the translations back per key and paragraph;
+   keys with a failed segment are left out, so callers keep them pending and a
+   re-run retries them.
+
+Batches are dense (similar lengths, no tiny per-row calls), which is where the
+throughput comes from.
+"""
+
+import re
+import time
+
+
+# (max source tokens, num_beams): short segments can afford wider beams.
+DEFAULT_BEAMS = ((24, 4), (64, 3), (10_000, 2))
+
+SENT_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9•])")
+BULLET_RE = re.compile(r"^\s*((?:[•\-\*]|\d+[.)])\s+)")
+STRUCTURE_ONLY_RE = re.compile(r"^\s*([#>\-\*\d\.\)]+)\s*$")
+
+
+def parse_beams(spec):
+    """'24:4,64:3,10000:2' -> ((24, 4), (64, 3), (10000, 2))"""
+    pairs = []
+    for part in (spec or "").split(","):
+        if part.strip():
+            max_tokens, beams = part.split(":")
+            pairs.append((int(max_tokens), int(beams)))
+    return tuple(sorted(pairs)) or DEFAULT_BEAMS
+
+
+def beams_for(length, beams):
+    for max_tokens, num_beams in beams:
+        if length <= max_tokens:
+            return num_beams
+    return beams[-1][1]
+
+
+def split_blocks(paragraph):
+    """Split a paragraph into (prefix, text) blocks: one per bullet/numbered line,
+    with hard-wrapped continuation lines joined back into their block."""
+    blocks = []
+    for line in paragraph.split("\n"):
+        if not line.strip():
+            continue
+        m = BULLET_RE.match(line)
+        if m or not blocks or STRUCTURE_ONLY_RE.match(line):
+            prefix = m.group(1) if m else ""
+            blocks.append([prefix, line[m.end():].strip() if m else line.strip()])
+        else:
+            blocks[-1][1] = f"{blocks[-1][1]} {line.strip()}".strip()
+    return [(prefix, text) for prefix, text in blocks]
+
+
+class SegmentPlan:
+    def __init__(self, tokenizer=None, src_max=480):
+        self.tokenizer = tokenizer
+        self.src_max = src_max
+        self.segments = []
+        self._index = {}
+        self.layout = {}
+
+    def _segment_id(self, text):
+        idx = self._index.get(text)
+        if idx is None:
+            idx = self._index[text] = len(self.segments)
+            self.segments.append(text)
+        return idx
+
+    def _split_long(self, sentence):
+        if self.tokenizer is None:
+            return [sentence]
+        if len(self.tokenizer.encode(sentence, add_special_tokens=False)) <= self.src_max:
+            return [sentence]
+        # cut on word boundaries, never mid-word
+        words, parts, cur = sentence.split(), [], []
+        for w in words:
+            cand = " ".join(cur + [w])
+            if cur and len(self.tokenizer.encode(cand, add_special_tokens=False)) > self.src_max:
+                parts.append(" ".join(cur))
+                cur = [w]
+            else:
+                cur.append(w)
+        if cur:
+            parts.append(" ".join(cur))
+        return parts
+
+    def add(self, key, text):
+        paragraphs = []
+        for para in (text or "").replace("\r\n", "\n").split("\n\n"):
+            blocks = []
+            for prefix, block in split_blocks(para):
+                if STRUCTURE_ONLY_RE.match(block):
+                    blocks.append((prefix, [block], False))
+                    continue
+                ids = []
+                for sent in SENT_RE.split(block):
+                    for part in self._split_long(sent.strip()):
+                        if part:
+                            ids.append(self._segment_id(part))
+                blocks.append((prefix, ids, True))
+            if blocks:
+                paragraphs.append(blocks)
+        self.layout[key] = paragraphs
+
+    def stitch(self, translations):
+        """{key: text} for every key whose segments all have a translation."""
+        out = {}
+        for key, paragraphs in self.layout.items():
+            segment_ids = [i for blocks in paragraphs for _, ids, translated in blocks if translated for i in ids]
+            if any(translations[i] is None for i in segment_ids):
+                continue
+            paras = []
+            for blocks in paragraphs:
+                lines = []
+                for prefix, ids, translated in blocks:
+                    body = " ".join(translations[i] for i in ids) if translated else ids[0]
+                    lines.append(prefix + body)
+                paras.append("\n".join(lines))
+            out[key] = "\n\n".join(paras)
+        return out
+
+
+def make_batches(lengths, order, token_budget, max_batch, beams):
+    """Group length-sorted segment indices into batches whose padded cost
+    (rows x longest x beams) stays under token_budget, never mixing buckets."""
+    batches, cur, cur_beams = [], [], None
+    for idx in order:
+        length = lengths[idx]
+        b = beams_for(length, beams)
+        cost = (len(cur) + 1) * length * b  # sorted ascending: `length` is the batch max
+        if cur and (b != cur_beams or cost > token_budget or len(cur) >= max_batch):
+            batches.append((cur, cur_beams))
+            cur = []
+        cur.append(idx)
+        cur_beams = b
+    if cur:
+        batches.append((cur, cur_beams))
+    return batches
+
+
+def generate(model, tokenizer, texts, num_beams, max_new, src_max):
+    """model.generate() on one batch; PyTorch Marian or marian_onnx.OnnxMarian."""
+    if getattr(model, "is_onnx", False):
+        enc = tokenizer(texts, return_tensors="np", padding=True, truncation=True, max_length=src_max)
+        return model.generate(**enc, num_beams=num_beams, max_new_tokens=max_new)
+
+    import torch
+
+    enc = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=src_max)
+    with torch.inference_mode():
+        return model.generate(**enc, num_beams=num_beams, max_new_tokens=max_new)
+
+
+def translate_segments(
+    segments,
+    tokenizer,
+    model,
+    token_budget=6000,
+    max_batch=64,
+    beams=DEFAULT_BEAMS,
+    max_new=256,
+    src_max=480,
+    tm=None,
+    tm_backend="marian",
+    tm_model="",
+    log=print,
+):
+    out = [None] * len(segments)
+
+    known = tm.get_many(segments, tm_backend, tm_model) if tm else {}
+    pending = []
+    for i, seg in enumerate(segments):
+        if seg in known:
+            out[i] = known[seg]
+        else:
+            pending.append(i)
+
+    if not pending:
+        return out
+
+    lengths = {
+        i: len(ids)
+        for i, ids in zip(pending, tokenizer([segments[i] for i in pending], truncation=True, max_length=src_max)["input_ids"])
+    }
+    order = sorted(pending, key=lambda i: lengths[i])
+    batches = make_batches(lengths, order, token_budget, max_batch, beams)
+
+    log(f"Segments: {len(segments)} | memory hits: {len(segments) - len(pending)} | "
+        f"to translate: {len(pending)} in {len(batches)} batch(es)")
+
+    t0 = time.time()
+    done = failed = 0
+    for batch_idx, num_beams in batches:
+        texts = [segments[i] for i in batch_idx]
+        try:
+            generated = generate(model, tokenizer, texts, num_beams, max_new, src_max)
+            decoded = tokenizer.batch_decode(generated, skip_special_tokens=True)
+        except Exception as e:   # e.g. OOM on an outlier batch: leave it untranslated, never cache it
+            log(f"  ⚠️ batch of {len(texts)} segment(s) failed, left untranslated: {e}")
+            failed += len(batch_idx)
+        else:
+            for i, sw in zip(batch_idx, decoded):
+                out[i] = sw.strip()
+            if tm:
+                tm.put_many([(src, sw, "marian") for src, sw in zip(texts, decoded)], tm_backend, tm_model)
+
+        done += len(batch_idx)
+        rate = done / max(0.001, time.time() - t0)
+        log(f"  {done}/{len(pending)} segments | beams={num_beams} | ~{rate:.1f} seg/sec"
+            + (f" | {failed} failed" if failed else ""))
+
+    return out
+
+
+def translate_texts(items, tokenizer, model, tm=None, src_max=480, **kwargs):
+    """items: iterable of (key, english text) -> {key: swahili text}, without
+    the keys that had a segment in a failed batch."""
+    plan = SegmentPlan(tokenizer, src_max=src_max)
+    for key, text in items:
+        plan.add(key, text)
+    translations = translate_segments(plan.segments, tokenizer, model, tm=tm, src_max=src_max, **kwargs)
+    return plan.stitch(translations)
+
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+marian_onnx.py
+
+Marian EN->SW (Helsinki-NLP/opus-mt-en-sw, data-pipeline/models/Rogendo/en-sw)
+on ONNX Runtime, int8.
+
+export   writes three graphs and their dynamic int8 versions:
+           encoder.onnx            input_ids, attention_mask -> last_hidden_state
+           decoder.onnx            first step: logits + self/cross present key-values
+           decoder_with_past.onnx  later steps: logits + self present key-values
+         plus the tokenizer files and marian_onnx.json (special ids, layers).
+check    translates a fixed corpus sample with PyTorch generate() and with
+         OnnxMarian and reports chrF (and BLEU when sacrebleu is installed)
+         of ONNX against PyTorch, exact-match rate and speedup.
+
+OnnxMarian.generate() runs greedy or beam search in numpy and reuses the
+past key-value cache, so every step feeds a single token per beam. It has
+the same call shape as model.generate() so marian_batching/marian_pool can use
+it as a drop-in model (--onnx-dir on the translation scripts).
+
+Usage:
+    python tools\\marian_onnx.py export --model Helsinki-NLP/opus-mt-en-sw
+    python tools\\marian_onnx.py check --model Helsinki-NLP/opus-mt-en-sw --onnx-dir build/marian_onnx/opus-mt-en-sw
+"""
+
+import argparse
+import json
+import shutil
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MODEL = "Helsinki-NLP/opus-mt-en-sw"
+OUT_ROOT = ROOT / "build" / "marian_onnx"
+OPSET = 17
+GRAPHS = ("encoder", "decoder", "decoder_with_past")
+KV = ("decoder.key", "decoder.value", "encoder.key", "encoder.value")
+
+
+# --- export ---
+
+def _legacy_cache(past):
+    return past.to_legacy_cache() if hasattr(past, "to_legacy_cache") else past
+
+
+def _as_cache(past):
+    try:
+        from transformers.cache_utils import EncoderDecoderCache
+    except ImportError:
+        return past
+    return EncoderDecoderCache.from_legacy_cache(past)
+
+
+def _wrappers(model):
+    import torch
+
+    class Encoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.encoder = model.get_encoder()
+
+        def forward(self, input_ids, attention_mask):
+            return self.encoder(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+    class Decoder(torch.nn.Module):
+        def __init__(self, with_past):
+            super().__init__()
+            self.decoder = model.get_decoder()
+            self.lm_head = model.lm_head
+            self.register_buffer("final_logits_bias", model.final_logits_bias)
+            self.with_past = with_past
+            self.layers = model.config.decoder_layers
+
+        def forward(self, input_ids, encoder_hidden_states, encoder_attention_mask, *past_flat):
+            past = None
+            if self.with_past:
+                past = _as_cache(tuple(tuple(past_flat[4 * i:4 * i + 4]) for i in range(self.layers)))
+            out = self.decoder(
+                input_ids=input_ids,
+                encoder_hidden_states=encoder_hidden_states,
+                encoder_attention_mask=encoder_attention_mask,
+                past_key_values=past,
+                use_cache=True,
+                return_dict=True,
+            )
+            logits = self.lm_head(out.last_hidden_state) + self.final_logits_bias
+            flat = []
+            for layer in _legacy_cache(out.past_key_values):
+                flat += list(layer[:2] if self.with_past else layer[:4])
+            return (logits, *flat)
+
+    return Encoder().eval(), Decoder(False).eval(), Decoder(True).eval()
+
+
+def export(model_name, out_dir, quantize=True, local_files_only=False):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tok = AutoTokenizer.from_pretrained(model_name, local_files_only=local_files_only)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, local_files_only=local_files_only).eval()
+    cfg = model.config
+    layers = cfg.decoder_layers
+    encoder, decoder, decoder_past = _wrappers(model)
+
+    B, S = 2, 7
+    input_ids = torch.randint(1, 100, (B, S), dtype=torch.long)
+    attention_mask = torch.ones((B, S), dtype=torch.long)
+    step_ids = torch.full((B, 1), cfg.decoder_start_token_id, dtype=torch.long)
+
+    with torch.no_grad():
+        enc = encoder(input_ids, attention_mask)
+        first = decoder(step_ids, enc, attention_mask)
+        past = list(first[1:])  # one step of self key-values + the cross key-values
+
+        torch.onnx.export(
+            encoder, (input_ids, attention_mask), str(out_dir / "encoder.onnx"),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "src_len"},
+                "attention_mask": {0: "batch", 1: "src_len"},
+                "last_hidden_state": {0: "batch", 1: "src_len"},
+            },
+            do_constant_folding=True, opset_version=OPSET,
+        )
+
+        present_all = [f"present.{i}.{kv}" for i in range(layers) for kv in KV]
+        axes = {
+            "input_ids": {0: "batch"},
+            "encoder_hidden_states": {0: "batch", 1: "src_len"},
+            "encoder_attention_mask": {0: "batch", 1: "src_len"},
+            "logits": {0: "batch"},
+        }
+        for i in range(layers):
+            axes[f"present.{i}.decoder.key"] = axes[f"present.{i}.decoder.value"] = {0: "batch", 2: "past_len+1"}
+            axes[f"present.{i}.encoder.key"] = axes[f"present.{i}.encoder.value"] = {0: "batch", 2: "src_len"}
+        torch.onnx.export(
+            decoder, (step_ids, enc, attention_mask), str(out_dir / "decoder.onnx"),
+            input_names=["input_ids", "encoder_hidden_states", "encoder_attention_mask"],
+            output_names=["logits", *present_all],
+            dynamic_axes=axes,
+            do_constant_folding=True, opset_version=OPSET,
+        )
+
+        past_names = [f"past_key_values.{i}.{kv}" for i in range(layers) for kv in KV]
+        present_self = [f"present.{i}.{kv}" for i in range(layers) for kv in KV[:2]]
+        axes_past = {k: v for k, v in axes.items() if not k.startswith("present.")}
+        for i in range(layers):
+            axes_past[f"past_key_values.{i}.decoder.key"] = axes_past[f"past_key_values.{i}.decoder.value"] = {0: "batch", 2: "past_len"}
+            axes_past[f"past_key_values.{i}.encoder.key"] = axes_past[f"past_key_values.{i}.encoder.value"] = {0: "batch", 2: "src_len"}
+            axes_past[f"present.{i}.decoder.key"] = axes_past[f"present.{i}.decoder.value"] = {0: "batch", 2: "past_len+1"}
+        torch.onnx.export(
+            decoder_past, (step_ids, enc, attention_mask, *past), str(out_dir / "decoder_with_past.onnx"),
+            input_names=["input_ids", "encoder_hidden_states", "encoder_attention_mask", *past_names],
+            output_names=["logits", *present_self],
+            dynamic_axes=axes_past,
+            do_constant_folding=True, opset_version=OPSET,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        for name in GRAPHS:
+            quantize_dynamic(str(out_dir / f"{name}.onnx"), str(out_dir / f"{name}_int8.onnx"), weight_type=QuantType.QInt8)
+
+    tok.save_pretrained(out_dir)
+    bad = [ids[0] for ids in (cfg.bad_words_ids or []) if len(ids) == 1]
+    meta = {
+        "source_model": str(model_name),
+        "layers": layers,
+        "decoder_start_token_id": cfg.decoder_start_token_id,
+        "eos_token_id": cfg.eos_token_id,
+        "pad_token_id": cfg.pad_token_id,
+        "bad_token_ids": sorted(set(bad + [cfg.pad_token_id])),
+        "max_length": cfg.max_length,
+        "quantized": quantize,
+    }
+    (out_dir / "marian_onnx.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    for f in sorted(out_dir.glob("*.onnx")):
+        print(f"  {f.name:<28} {f.stat().st_size / 1e6:8.1f} MB")
+    print(f"Exported → {out_dir}")
+
+
+# --- runtime ---
+
+def read_meta(model_dir):
+    return json.loads((Path(model_dir) / "marian_onnx.json").read_text(encoding="utf-8"))
+
+
+def tm_suffix(model_dir):
+    """Suffix for translation-memory model tags: int8 and fp32 exports translate differently."""
+    return "+onnx-int8" if read_meta(model_dir).get("quantized") else "+onnx-fp32"
+
+
+def _log_softmax(x):
+    m = x.max(axis=-1, keepdims=True)
+    y = x - m
+    return y - np.log(np.exp(y).sum(axis=-1, keepdims=True))
+
+
+class OnnxMarian:
+    """Drop-in for AutoModelForSeq2SeqLM.generate() on ONNX Runtime."""
+
+    is_onnx = True
+
+    def __init__(self, model_dir, threads=None, int8=True, load_tokenizer=True):
+        import onnxruntime as ort
+
+        self.model_dir = Path(model_dir)
+        self.meta = read_meta(self.model_dir)
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+            opts.inter_op_num_threads = 1
+        suffix = "_int8" if int8 and self.meta.get("quantized") else ""
+        self.sessions = {
+            name: ort.InferenceSession(str(self.model_dir / f"{name}{suffix}.onnx"), opts, providers=["CPUExecutionProvider"])
+            for name in GRAPHS
+        }
+        self.inputs = {name: {i.name for i in s.get_inputs()} for name, s in self.sessions.items()}
+        self.layers = self.meta["layers"]
+        self.start_id = self.meta["decoder_start_token_id"]
+        self.eos_id = self.meta["eos_token_id"]
+        self.pad_id = self.meta["pad_token_id"]
+        self.bad_ids = self.meta["bad_token_ids"]
+        self.tokenizer = None
+        if load_tokenizer:
+            from transformers import AutoTokenizer
+
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir, local_files_only=True)
+
+    def _run(self, name, feeds):
+        wanted = self.inputs[name]
+        return self.sessions[name].run(None, {k: v for k, v in feeds.items() if k in wanted})
+
+    def _first_step(self, ids, enc, mask):
+        out = self._run("decoder", {"input_ids": ids, "encoder_hidden_states": enc, "encoder_attention_mask": mask})
+        logits, kv = out[0][:, -1], out[1:]
+        self_kv = [kv[4 * i + j] for i in range(self.layers) for j in (0, 1)]
+        cross_kv = [kv[4 * i + j] for i in range(self.layers) for j in (2, 3)]
+        return logits, self_kv, cross_kv
+
+    def _step(self, ids, enc, mask, self_kv, cross_kv):
+        feeds = {"input_ids": ids, "encoder_hidden_states": enc, "encoder_attention_mask": mask}
+        for i in range(self.layers):
+            feeds[f"past_key_values.{i}.decoder.key"] = self_kv[2 * i]
+            feeds[f"past_key_values.{i}.decoder.value"] = self_kv[2 * i + 1]
+            feeds[f"past_key_values.{i}.encoder.key"] = cross_kv[2 * i]
+            feeds[f"past_key_values.{i}.encoder.value"] = cross_kv[2 * i + 1]
+        out = self._run("decoder_with_past", feeds)
+        return out[0][:, -1], out[1:]
+
+    def _scores(self, logits):
+        logp = _log_softmax(logits.astype(np.float32))
+        logp[:, self.bad_ids] = -np.inf
+        return logp
+
+    def generate(self, input_ids, attention_mask=None, num_beams=1, max_new_tokens=256, length_penalty=1.0, **_):
+        input_ids = np.asarray(input_ids, dtype=np.int64)
+        mask = np.ones_like(input_ids) if attention_mask is None else np.asarray(attention_mask, dtype=np.int64)
+        enc = self._run("encoder", {"input_ids": input_ids, "attention_mask": mask})[0]
+        if num_beams <= 1:
+            return self._greedy(enc, mask, max_new_tokens)
+        return self._beam(enc, mask, num_beams, max_new_tokens, length_penalty)
+
+    def _greedy(self, enc, mask, max_new):
+        B = enc.shape[0]
+        ids = np.full((B, 1), self.start_id, dtype=np.int64)
+        seqs = [[] for _ in range(B)]
+        done = np.zeros(B, dtype=bool)
+        logits, self_kv, cross_kv = self._first_step(ids, enc, mask)
+        for _ in range(max_new):
+            nxt = self._scores(logits).argmax(axis=-1)
+            nxt[done] = self.pad_id
+            for b in np.flatnonzero(~done):
+                seqs[b].append(int(nxt[b]))
+            done |= nxt == self.eos_id
+            if done.all():
+                break
+            logits, self_kv = self._step(nxt[:, None], enc, mask, self_kv, cross_kv)
+        return seqs
+
+    def _beam(self, enc, mask, K, max_new, lp):
+        B = enc.shape[0]
+        enc = np.repeat(enc, K, axis=0)
+        mask = np.repeat(mask, K, axis=0)
+        ids = np.full((B * K, 1), self.start_id, dtype=np.int64)
+        logits, self_kv, cross_kv = self._first_step(ids, enc, mask)
+
+        seqs = [[] for _ in range(B * K)]
+        beam_scores = np.zeros((B, K), dtype=np.float32)
+        beam_scores[:, 1:] = -1e9  # all beams start identical: expand from the first only
+        finished = [[] for _ in range(B)]  # (normalized score, tokens)
+        done = np.zeros(B, dtype=bool)
+
+        for cur_len in range(1, max_new + 1):
+            logp = self._scores(logits)
+            V = logp.shape[-1]
+            cand = (beam_scores.reshape(-1, 1) + logp).reshape(B, K * V)
+            top = np.argpartition(-cand, 2 * K, axis=1)[:, :2 * K]
+            top = np.take_along_axis(top, np.argsort(-np.take_along_axis(cand, top, axis=1), axis=1), axis=1)
+
+            src = np.repeat(np.arange(B, dtype=np.int64) * K, K).reshape(B, K)
+            nxt = np.full((B, K), self.pad_id, dtype=np.int64)
+            new_scores = np.full((B, K), -1e9, dtype=np.float32)
+            for b in range(B):
+                if done[b]:
+                    continue
+                j = 0
+                for rank, flat in enumerate(top[b]):
+                    beam, token = divmod(int(flat), V)
+                    score = float(cand[b, flat])
+                    if token == self.eos_id:
+                        if rank < K:
+                            hyp = seqs[b * K + beam] + [token]
+                            finished[b].append((score / (len(hyp) ** lp), hyp))
+                            finished[b] = sorted(finished[b], key=lambda h: -h[0])[:K]
+                        continue
+                    src[b, j], nxt[b, j], new_scores[b, j] = b * K + beam, token, score
+                    j += 1
+                    if j == K:
+                        break
+                if len(finished[b]) >= K and new_scores[b].max() / (cur_len ** lp) <= finished[b][-1][0]:
+                    done[b] = True
+            if done.all():
+                break
+
+            flat_src = src.reshape(-1)
+            seqs = [seqs[s] + [int(t)] for s, t in zip(flat_src, nxt.reshape(-1))]
+            beam_scores = new_scores
+            self_kv = [kv[flat_src] for kv in self_kv]  # cross kv is identical across a batch item's beams
+            logits, self_kv = self._step(nxt.reshape(-1, 1), enc, mask, self_kv, cross_kv)
+
+        out = []
+        for b in range(B):
+            if not done[b]:
+                for k in range(K):
+                    hyp = seqs[b * K + k]
+                    finished[b].append((float(beam_scores[b, k]) / (max(1, len(hyp)) ** lp), hyp))
+            out.append(max(finished[b], key=lambda h: h[0])[1] if finished[b] else [])
+        return out
+
+
+# --- agreement check ---
+
+def chrf(hyps, refs, order=6, beta=2.0):
+    """Corpus chrF (character n-grams, whitespace removed, as in sacrebleu)."""
+    match = [0] * order
+    hyp_total = [0] * order
+    ref_total = [0] * order
+    for h, r in zip(hyps, refs):
+        h, r = h.replace(" ", ""), r.replace(" ", "")
+        for n in range(1, order + 1):
+            hc = Counter(h[i:i + n] for i in range(len(h) - n + 1))
+            rc = Counter(r[i:i + n] for i in range(len(r) - n + 1))
+            match[n - 1] += sum((hc & rc).values())
+            hyp_total[n - 1] += sum(hc.values())
+            ref_total[n - 1] += sum(rc.values())
+    p = sum(m / t for m, t in zip(match, hyp_total) if t) / order
+    r = sum(m / t for m, t in zip(match, ref_total) if t) / order
+    if p + r == 0:
+        return 0.0
+    return 100 * (1 + beta ** 2) * p * r / (beta ** 2 * p + r)
+
+
+def check(model_name, onnx_dir, sample, num_beams, max_new, batch, threads, local_files_only):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+    from translators import fixed_sample
+
+    if threads:
+        torch.set_num_threads(threads)
+    segments = fixed_sample(sample)
+    tok = AutoTokenizer.from_pretrained(model_name, local_files_only=local_files_only)
+    pt = AutoModelForSeq2SeqLM.from_pretrained(model_name, local_files_only=local_files_only).eval()
+    ox = OnnxMarian(onnx_dir, threads=threads, load_tokenizer=False)
+
+    def run(fn):
+        out = []
+        t0 = time.perf_counter()
+        for k in range(0, len(segments), batch):
+            enc = tok(segments[k:k + batch], return_tensors="np", padding=True, truncation=True, max_length=480)
+            out += tok.batch_decode(fn(enc), skip_special_tokens=True)
+        return out, time.perf_counter() - t0
+
+    def run_torch(enc):
+        with torch.inference_mode():
+            return pt.generate(
+                input_ids=torch.from_numpy(enc["input_ids"]),
+                attention_mask=torch.from_numpy(enc["attention_mask"]),
+                num_beams=num_beams, max_new_tokens=max_new,
+            )
+
+    ref, t_pt = run(run_torch)
+    hyp, t_ox = run(lambda enc: ox.generate(**enc, num_beams=num_beams, max_new_tokens=max_new))
+
+    report = {
+        "segments": len(segments),
+        "num_beams": num_beams,
+        "torch_s": round(t_pt, 2),
+        "onnx_s": round(t_ox, 2),
+        "speedup": round(t_pt / max(t_ox, 1e-9), 2),
+        "chrf_vs_torch": round(chrf(hyp, ref), 2),
+        "exact_match": round(sum(h.strip() == r.strip() for h, r in zip(hyp, ref)) / max(1, len(ref)), 3),
+    }
+    try:
+        import sacrebleu
+
+        report["bleu_vs_torch"] = round(sacrebleu.corpus_bleu(hyp, [ref]).score, 2)
+    except ImportError:
+        pass
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Marian EN->SW on ONNX Runtime (int8)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export")
+    p.add_argument("--model", default=DEFAULT_MODEL, help="HF id or local dir (e.g. data-pipeline/models/Rogendo/en-sw)")
+    p.add_argument("--out", default=None, help="Default: build/marian_onnx/<model dir name>")
+    p.add_argument("--no-quantize", action="store_true")
+    p.add_argument("--local-files-only", action="store_true")
+
+    p = sub.add_parser("check")
+    p.add_argument("--model", default=DEFAULT_MODEL)
+    p.add_argument("--onnx-dir", default=None)
+    p.add_argument("--sample", type=int, default=100)
+    p.add_argument("--beams", type=int, default=4)
+    p.add_argument("--max-new", type=int, default=256)
+    p.add_argument("--batch", type=int, default=16)
+    p.add_argument("--threads", type=int, default=None)
+    p.add_argument("--local-files-only", action="store_true")
+    args = ap.parse_args()
+
+    out_dir = Path(getattr(args, "out", None) or getattr(args, "onnx_dir", None) or OUT_ROOT / Path(args.model).name)
+    if args.command == "export":
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        export(args.model, out_dir, quantize=not args.no_quantize, local_files_only=args.local_files_only)
+    else:
+        check(args.model, out_dir, args.sample, args.beams, args.max_new, args.batch, args.threads, args.local_files_only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+marian_pool.py
+
+Multi-process Marian translation on top of marian_batching.
+
+translate_groups() shards the pending work (a list of groups of (key, text))
+across N worker processes. Each worker loads the tokenizer and model once,
+pins itself to M torch threads and opens its own connection to the shared
+translation memory (WAL mode handles the concurrent writers). Finished groups
+stream back to the caller as they complete, so the caller stays the single
+writer of the output file and keeps its resume semantics.
+
+With workers=1 everything runs in-process, exactly like before. With onnx_dir
+(an export from marian_onnx.py) workers run the int8 ONNX Runtime model
+instead of PyTorch.
+"""
+
+import multiprocessing as mp
+import os
+
+from marian_batching import translate_texts
+
+
+_WORKER = {}
+
+
+def _log(msg):
+    print(f"[worker {os.getpid()}] {msg}", flush=True)
+
+
+def _init_worker(model_name, threads, local_files_only, tm_path, opts, onnx_dir=None):
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+
+    from translation_memory import DEFAULT_TM_PATH, TranslationMemory
+
+    if onnx_dir:
+        from marian_onnx import OnnxMarian
+
+        mdl = OnnxMarian(onnx_dir, threads=threads)
+        tok = mdl.tokenizer
+    else:
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+        torch.set_num_threads(threads)
+        tok = AutoTokenizer.from_pretrained(model_name, local_files_only=local_files_only)
+        mdl = AutoModelForSeq2SeqLM.from_pretrained(model_name, local_files_only=local_files_only)
+        mdl.eval()
+
+    _WORKER.update(
+        tok=tok,
+        mdl=mdl,
+        tm=TranslationMemory(tm_path or DEFAULT_TM_PATH),
+        opts=opts,
+    )
+
+
+def _translate_group(job):
+    group_no, items = job
+    out = translate_texts(
+        items,
+        _WORKER["tok"],
+        _WORKER["mdl"],
+        tm=_WORKER["tm"],
+        log=_log,
+        **_WORKER["opts"],
+    )
+    return group_no, out
+
+
+def translate_groups(
+    groups,
+    model_name,
+    workers=1,
+    threads_per_worker=None,
+    local_files_only=False,
+    tm_path=None,
+    onnx_dir=None,
+    **opts,
+):
+    """groups: list of lists of (key, english text).
+    Yields (group index, {key: swahili text}) as each group completes;
+    with workers > 1 the order is completion order, not input order."""
+    workers = max(1, workers)
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    init_args = (str(model_name), threads, local_files_only, tm_path, opts, str(onnx_dir) if onnx_dir else None)
+    jobs = list(enumerate(groups))
+
+    if workers == 1:
+        _init_worker(*init_args)
+        for job in jobs:
+            yield _translate_group(job)
+        return
+
+    print(f"Starting {workers} worker(s) x {threads} thread(s) for {len(jobs)} group(s)")
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(workers, initializer=_init_worker, initargs=init_args, maxtasksperchild=None) as pool:
+        for result in pool.imap_unordered(_translate_group, jobs):
+            yield result
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+model_pipeline.py
+
+One cached, resumable pipeline for the encoder conversions that used to be
+spread over export_e5small_onnx.py, convert_e5small_onnx_to_tf.py,
+convert_e5small_savedmodel_to_tflite*.py and onnx_to_tflite.py.
+
+Every stage is fingerprinted from its options, a per-stage version and the
+content hash of its input artifacts. Results live in
+<cache-dir>/<stage>/<fingerprint>/ and are reused whenever the fingerprint is
+unchanged, so iterating on --quant does not re-run the ONNX and TF exports.
+A stage directory is built under a .tmp name and renamed only when complete,
+so an interrupted run simply resumes at the first unfinished stage.
+
+Each run writes a summary with per-stage cache hit/miss, wall time and
+artifact size.
+
+Pipelines:
+- e5small: HF export -> ONNX -> SavedModel -> TFLite
+- minilm:  existing ONNX -> SavedModel -> int32 wrapper -> TFLite
+
+Recommended CMD:
+python tools\\model_pipeline.py e5small --quant dynamic
+python tools\\model_pipeline.py e5small --quant none --num-layers 8
+python tools\\model_pipeline.py minilm --onnx assets\\models\\minilm_l6_v2.onnx
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+
+CACHE_DIR = Path("build/model_cache")
+
+STAGE_VERSIONS = {
+    "onnx": 1,
+    "savedmodel": 1,
+    "wrap_int32": 1,
+    "tflite": 1,
+}
+
+
+def hash_path(path):
+    h = hashlib.sha256()
+    path = Path(path)
+    files = [path] if path.is_file() else sorted(p for p in path.rglob("*") if p.is_file())
+    for f in files:
+        h.update(str(f.relative_to(path) if f != path else f.name).encode("utf-8"))
+        with f.open("rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def path_size(path):
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+class Pipeline:
+    def __init__(self, cache_dir, force=()):
+        self.cache_dir = Path(cache_dir)
+        self.force = set(force)
+        self.summary = []
+
+    def run(self, stage, fn, options, inputs=None):
+        inputs = inputs or {}
+        fingerprint_src = {
+            "stage": stage,
+            "version": STAGE_VERSIONS[stage],
+            "options": options,
+            "inputs": {name: hash_path(p) for name, p in sorted(inputs.items())},
+        }
+        fingerprint = hashlib.sha256(
+            json.dumps(fingerprint_src, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+
+        stage_dir = self.cache_dir / stage / fingerprint
+        record_path = stage_dir / "stage.json"
+
+        if record_path.exists() and stage not in self.force:
+            record = json.loads(record_path.read_text(encoding="utf-8"))
+            print(f"[{stage}] cache hit {fingerprint}")
+            self.summary.append({**record, "cached": True, "wall_s": 0.0})
+            return stage_dir / record["artifact"]
+
+        tmp_dir = stage_dir.with_name(fingerprint + ".tmp")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        print(f"[{stage}] running {fingerprint}")
+        t0 = time.perf_counter()
+        artifact = fn(tmp_dir, options, **inputs)
+        wall = time.perf_counter() - t0
+
+        record = {
+            "stage": stage,
+            "fingerprint": fingerprint,
+            "options": options,
+            "artifact": Path(artifact).relative_to(tmp_dir).as_posix(),
+            "artifact_bytes": path_size(artifact),
+            "build_wall_s": wall,
+        }
+        (tmp_dir / "stage.json").write_text(json.dumps(record, indent=2), encoding="utf-8")
+
+        if stage_dir.exists():
+            shutil.rmtree(stage_dir)
+        os.replace(tmp_dir, stage_dir)
+
+        print(f"[{stage}] done in {wall:.1f}s ({record['artifact_bytes'] / 1e6:.1f} MB)")
+        self.summary.append({**record, "cached": False, "wall_s": wall})
+        return stage_dir / record["artifact"]
+
+
+def stage_onnx(out_dir, options):
+    from transformers import AutoTokenizer, AutoModel
+    from export_e5small_onnx import E5Encoder, export_onnx, truncate_layers
+
+    tokenizer = AutoTokenizer.from_pretrained(options["model_id"])
+    model = AutoModel.from_pretrained(options["model_id"]).eval()
+    if options["num_layers"]:
+        truncate_layers(model, options["num_layers"])
+
+    onnx_path = out_dir / "encoder.onnx"
+    export_onnx(E5Encoder(model).eval(), tokenizer, onnx_path, options["max_len"])
+    tokenizer.save_pretrained(out_dir / "tokenizer")
+    return onnx_path
+
+
+def stage_savedmodel(out_dir, options, onnx):
+    import onnx as onnx_lib
+    from onnx_tf.backend import prepare
+
+    saved_model_dir = out_dir / "saved_model"
+    prepare(onnx_lib.load(str(onnx))).export_graph(str(saved_model_dir))
+    return saved_model_dir
+
+
+def stage_wrap_int32(out_dir, options, saved_model):
+    import tensorflow as tf
+
+    raw = tf.saved_model.load(str(saved_model))
+    if "serving_default" not in raw.signatures:
+        print("Available signatures:", list(raw.signatures.keys()))
+        raise RuntimeError("Could not find 'serving_default' in SavedModel signatures.")
+    f = raw.signatures["serving_default"]
+
+    class Wrapper(tf.Module):
+        def __init__(self, fn):
+            super().__init__()
+            self.fn = fn
+
+        @tf.function(input_signature=[
+            tf.TensorSpec([None, None], tf.int32, name="input_ids"),
+            tf.TensorSpec([None, None], tf.int32, name="attention_mask"),
+        ])
+        def __call__(self, input_ids, attention_mask):
+            outs = self.fn(
+                input_ids=tf.cast(input_ids, tf.int64),
+                attention_mask=tf.cast(attention_mask, tf.int64),
+            )
+            if isinstance(outs, dict):
+                outs = outs[next(iter(outs.keys()))]
+            return {"embeddings": tf.cast(outs, tf.float32)}
+
+    wrapped_dir = out_dir / "saved_model"
+    tf.saved_model.save(Wrapper(f), str(wrapped_dir))
+    return wrapped_dir
+
+
+def stage_tflite(out_dir, options, saved_model):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(str(saved_model))
+    if options["quant"] == "dynamic":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif options["quant"] == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS,
+        tf.lite.OpsSet.SELECT_TF_OPS,
+    ]
+    converter.experimental_enable_resource_variables = True
+
+    tflite_path = out_dir / "encoder.tflite"
+    tflite_path.write_bytes(converter.convert())
+    return tflite_path
+
+
+def publish(src, dst):
+    dst = Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if Path(src).is_dir():
+        if dst.exists():
+            shutil.rmtree(dst)
+        shutil.copytree(src, dst)
+    else:
+        shutil.copy2(src, dst)
+    print(f"Published: {dst}")
+
+
+def run_e5small(pipeline, args):
+    from export_e5small_onnx import MODEL_ID, MAX_LEN
+
+    onnx = pipeline.run("onnx", stage_onnx, {
+        "model_id": MODEL_ID,
+        "num_layers": args.num_layers,
+        "max_len": args.max_len or MAX_LEN,
+        "opset": 18,
+    })
+    saved_model = pipeline.run("savedmodel", stage_savedmodel, {}, {"onnx": onnx})
+    tflite = pipeline.run("tflite", stage_tflite, {"quant": args.quant}, {"saved_model": saved_model})
+
+    out_dir = Path(args.out_dir or "assets/models_e5small")
+    suffix = f"_L{args.num_layers}" if args.num_layers else ""
+    quant_suffix = {"none": "", "dynamic": "_dynamic_quant", "float16": "_float16"}[args.quant]
+
+    publish(onnx, out_dir / f"encoder_e5small{suffix}.onnx")
+    publish(tflite, out_dir / f"encoder_e5small{suffix}{quant_suffix}.tflite")
+    for f in (onnx.parent / "tokenizer").iterdir():
+        publish(f, out_dir / f.name)
+
+
+def run_minilm(pipeline, args):
+    onnx = Path(args.onnx or "assets/models/minilm_l6_v2.onnx")
+    if not onnx.exists():
+        raise FileNotFoundError(f"Missing ONNX model: {onnx}")
+
+    saved_model = pipeline.run("savedmodel", stage_savedmodel, {}, {"onnx": onnx})
+    wrapped = pipeline.run("wrap_int32", stage_wrap_int32, {}, {"saved_model": saved_model})
+    tflite = pipeline.run("tflite", stage_tflite, {"quant": args.quant}, {"saved_model": wrapped})
+
+    publish(tflite, Path(args.out_dir or "assets/models") / "encoder.tflite")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", choices=["e5small", "minilm"])
+    parser.add_argument("--quant", choices=["none", "dynamic", "float16"], default="dynamic")
+    parser.add_argument("--num-layers", type=int, default=None)
+    parser.add_argument("--max-len", type=int, default=None)
+    parser.add_argument("--onnx", default=None, help="Input ONNX for the minilm pipeline")
+    parser.add_argument("--out-dir", default=None)
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR))
+    parser.add_argument("--force", nargs="*", default=[], choices=sorted(STAGE_VERSIONS))
+    parser.add_argument("--summary-out", default=None)
+    args = parser.parse_args()
+
+    pipeline = Pipeline(args.cache_dir, force=args.force)
+
+    t0 = time.perf_counter()
+    if args.model == "e5small":
+        run_e5small(pipeline, args)
+    else:
+        run_minilm(pipeline, args)
+    total = time.perf_counter() - t0
+
+    summary = {
+        "model": args.model,
+        "quant": args.quant,
+        "total_wall_s": total,
+        "stages": pipeline.summary,
+    }
+    summary_out = Path(args.summary_out) if args.summary_out else Path(args.cache_dir) / f"last_run_{args.model}.json"
+    summary_out.parent.mkdir(parents=True, exist_ok=True)
+    summary_out.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    print("\nStage summary")
+    print("-------------")
+    for s in pipeline.summary:
+        state = "cached" if s["cached"] else "built"
+        print(f"{s['stage']:<11}{state:<8}{s['wall_s']:>8.1f}s{s['artifact_bytes'] / 1e6:>10.1f} MB  {s['fingerprint']}")
+    print(f"Total: {total:.1f}s")
+    print(f"Summary: {summary_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,27 @@
 # tools/mt_en_to_sw.py
-import csv, sys, os, re, time
+import csv, sys, time, argparse
 from pathlib import Path
-from transformers import MarianMTModel, MarianTokenizer, pipeline
-import torch
+
+from marian_batching import DEFAULT_BEAMS, parse_beams
+from marian_pool import translate_groups
 
 # ------------- CONFIGURATION -------------
 IN_CSV  = Path("tools/out/en_corpus.csv")       # from export_corpus.dart
 OUT_CSV = Path("tools/in/sw_translations.csv")  # output (resumable)
 MODEL_NAME = "Helsinki-NLP/opus-mt-en-sw"       # EN→SW model
 MAX_LEN = 512
-BATCH_SIZE = 6
+SRC_MAX = 480            # max source tokens per segment (long sentences are cut on word boundaries)
+TOKEN_BUDGET = 6000      # padded tokens x beams per generate() call
+MAX_BATCH = 64           # max segments per generate() call
+ROWS_PER_FLUSH = 200     # rows planned/translated together, then appended to OUT_CSV
 CPU_THREADS = 2
+TM_BACKEND = "marian"
 # -----------------------------------------
 
-torch.set_num_threads(CPU_THREADS)
-
 def chunks(lst, n):
     for i in range(0, len(lst), n):
         yield lst[i:i+n]
 
-def split_paragraphs(text):
-    paras = [p.strip() for p in text.replace('\r\n', '\n').split('\n\n') if p.strip()]
-    out = []
-    for p in paras:
-        sents = re.split(r'(?<=[.!?])\s+', p)
-        buf, cur = [], ""
-        for s in sents:
-            s = s.strip()
-            if not s:
-                continue
-            if len(cur) + len(s) < 300:
-                cur = (cur + " " + s).strip()
-            else:
-                if cur:
-                    buf.append(cur)
-                cur = s
-        if cur:
-            buf.append(cur)
-        out.append(buf)
-    return out  # list[list[str]]
-
-def join_paragraphs(paras_translated):
-    joined = []
-    for sent_list in paras_translated:
-        joined.append(" ".join(sent_list))
-    return "\n\n".join(joined)
-
 def load_input_rows():
     if not IN_CSV.exists():
         print(f"❌ Input CSV not found: {IN_CSV}", file=sys.stderr)
@@ -62,21 +38,24 @@ def load_input_rows():
     return rows
 
 def main():
-    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    ap = argparse.ArgumentParser(description="EN→SW Marian translation of tools/out/en_corpus.csv (resumable)")
+    ap.add_argument("--token-budget", type=int, default=TOKEN_BUDGET)
+    ap.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    ap.add_argument("--beams", default=None, help="Beams per length bucket, e.g. 24:4,64:3,10000:2")
+    ap.add_argument("--rows-per-flush", type=int, default=ROWS_PER_FLUSH)
+    ap.add_argument("--workers", type=int, default=1, help="Translation processes (each loads the model once)")
+    ap.add_argument("--threads-per-worker", type=int, default=CPU_THREADS)
+    ap.add_argument("--onnx-dir", default=None, help="Use an ONNX export (tools/marian_onnx.py export; int8 unless --no-quantize) instead of PyTorch")
+    args = ap.parse_args()
+
+    beams = parse_beams(args.beams) if args.beams else DEFAULT_BEAMS
+    tm_model = MODEL_NAME
+    if args.onnx_dir:
+        from marian_onnx import tm_suffix
+
+        tm_model += tm_suffix(args.onnx_dir)
 
-    # Load model
-    print(f"🧠 Loading model: {MODEL_NAME}")
-    tok = MarianTokenizer.from_pretrained(MODEL_NAME)
-    mdl = MarianMTModel.from_pretrained(MODEL_NAME)
-    translator = pipeline(
-        "translation",
-        model=mdl,
-        tokenizer=tok,
-        src_lang="en",
-        tgt_lang="sw",
-        max_length=MAX_LEN,
-        batch_size=4
-    )
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
 
     rows = load_input_rows()
     total = len(rows)
@@ -91,42 +70,59 @@ def main():
                 done_ids.add(r["id"])
         print(f"⏩ Skipping {len(done_ids)} rows already done")
 
+    pending = [r for r in rows if r[0] not in done_ids]
+
     f_out = open(OUT_CSV, "a", newline="", encoding="utf-8")
     w = csv.writer(f_out)
     if write_header:
         w.writerow(["id", "contentSw", "titleSw"])
 
     start_time = time.time()
+    written = 0
+
+    # Sentences of many rows are translated together in dense, length-sorted batches;
+    # groups are sharded across workers and appended here as they complete
+    row_groups = list(chunks(pending, args.rows_per_flush))
+    text_groups = []
+    for group in row_groups:
+        texts = []
+        for _id, title, body in group:
+            if title:
+                texts.append(((_id, "title"), title))
+            texts.append(((_id, "body"), body))
+        text_groups.append(texts)
+
+    runtime = f"onnx ({args.onnx_dir})" if args.onnx_dir else "pytorch"
+    print(f"🧠 Model: {MODEL_NAME} | {runtime} | workers={args.workers} | threads/worker={args.threads_per_worker}")
+    results = translate_groups(
+        text_groups,
+        MODEL_NAME,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        src_max=SRC_MAX,
+        token_budget=args.token_budget,
+        max_batch=args.max_batch,
+        beams=beams,
+        max_new=MAX_LEN,
+        tm_backend=TM_BACKEND,
+        tm_model=tm_model,
+        onnx_dir=args.onnx_dir,
+    )
 
-    for i, (_id, title, body) in enumerate(rows, 1):
-        if _id in done_ids:
-            continue
-        print(f"[{i}/{total}] {_id}")
-
-        try:
-            title_sw = translator(title)[0]["translation_text"] if title else _id
-        except Exception as e:
-            print(f"⚠️ Title translation failed for {_id}: {e}")
-            title_sw = title
-
-        paras = split_paragraphs(body)
-        paras_sw = []
-        for sent_list in paras:
-            batch_sw = []
-            for batch in chunks(sent_list, BATCH_SIZE):
-                try:
-                    res = translator(batch)
-                    batch_sw.extend([o["translation_text"] for o in res])
-                except Exception as e:
-                    print(f"⚠️ Body translation batch failed for {_id}: {e}")
-                    batch_sw.extend(batch)  # fallback to original
-            paras_sw.append(batch_sw)
-
-        body_sw = join_paragraphs(paras_sw)
-
-        w.writerow([_id, body_sw, title_sw])
+    failed = 0
+    for group_no, out in results:
+        group = row_groups[group_no]
+        for _id, title, body in group:
+            if (_id, "body") not in out or (title and (_id, "title") not in out):
+                failed += 1   # a batch failed: not written, so the next run retries the row
+                continue
+            title_sw = out.get((_id, "title")) or _id
+            w.writerow([_id, out[(_id, "body")], title_sw])
+            written += 1
         f_out.flush()
 
+        print(f"[{written}/{len(pending)}] rows written" + (f" | {failed} failed" if failed else ""))
+
     f_out.close()
     mins = (time.time() - start_time) / 60
     print(f"✅ Done. Wrote {OUT_CSV}  ({mins:.1f} min total)")
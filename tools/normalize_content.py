@@ -2,6 +2,8 @@ import argparse
 import sys
 import json, re, pathlib, hashlib
 
+from corpus import load_files
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]  # repo root
 
 def parse_args():
@@ -136,13 +138,9 @@ def main():
     if not principles_path.exists():
         sys.exit(f"ERROR: principles.json not found at {principles_path}")
 
-    # Load (supports array or {"items":[...]})
-    def load_items(p: pathlib.Path):
-        raw = json.loads(p.read_text(encoding="utf-8"))
-        return raw.get("items") if isinstance(raw, dict) else raw
-
-    herbs = load_items(herbs_path)
-    principles = load_items(principles_path)
+    # Items as stored (array or {"items":[...]}); the transforms below read the raw fields
+    herbs = load_files([herbs_path]).column("raw")
+    principles = load_files([principles_path]).column("raw")
 
     herbs2 = normalize_herbs(herbs)
     principles2 = split_principles(principles)
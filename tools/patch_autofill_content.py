@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from section_heuristics import find_blocks
+from section_heuristics import split_sections
 
 ROOT = Path(__file__).resolve().parents[1]
 IN_DIR  = ROOT / "content_json" / "cleaned" / "json_sw_with_images"
@@ -18,25 +18,15 @@ def family_of(id_):
 
 def ensure_sections(text: str) -> str:
     """If text has no recognizable headings, try to inject basic ones around detected blocks."""
-    blocks = find_blocks(text)
+    sections = split_sections(text, "en")
     # if blocks only contain overview -> leave as is
-    if set(blocks.keys()) <= {"overview"}:
+    if {sec["key"] for sec in sections} <= {"overview"}:
         return text
     # rebuild in canonical order
-    order = ["overview","treatment","causes","symptoms","usage","habitat"]
     parts = []
-    for k in order:
-      if k in blocks:
-        title = {
-          "overview": "Overview",
-          "treatment": "Treatment",
-          "causes": "Causes",
-          "symptoms": "Symptoms",
-          "usage": "How to use",
-          "habitat": "Where found / Habitat"
-        }[k]
-        parts.append(title)
-        parts.append("\n\n".join(blocks[k]))
+    for sec in sections:
+        parts.append(sec["title"])
+        parts.append(sec["body"])
     return "\n\n".join(parts).strip()
 
 def main():
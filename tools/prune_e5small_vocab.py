@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+prune_e5small_vocab.py
+
+Prunes the ~250k SentencePiece vocabulary of multilingual-e5-small down to the
+tokens our corpus actually uses, then rebuilds the embedding matrix, tokenizer,
+ONNX and TFLite models with remapped ids.
+
+Covered text:
+1. Every item in assets/corpus/en/*.json and assets/corpus/sw/*.json
+   (titles, titleSw, aliasesSw, content fields and sections), as passages.
+2. Keys and values of synonyms.json, as queries.
+3. The en and sw eval queries, as queries.
+
+Safety margin:
+- the first --keep-top ids (SentencePiece pieces are ordered by score, so these
+  are the most common pieces across all languages)
+- every single-character Latin piece, so unseen words still fall back to
+  characters instead of <unk>
+
+Ids are kept in ascending order, so <s>/<pad>/</s>/<unk> stay at 0..3 and the
+XLM-R position ids (which depend on pad id 1) are unchanged. For covered text the
+pruned tokenizer produces the same pieces, so the embeddings are identical; the
+tool proves this before writing the exported models.
+
+Recommended CMD:
+python tools\\prune_e5small_vocab.py --out-dir assets\\models_e5small_pruned
+"""
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModel, XLMRobertaTokenizerFast
+
+from corpus import load_glob
+from export_e5small_onnx import E5Encoder, export_onnx
+
+
+MODEL_ID = "intfloat/multilingual-e5-small"
+SPECIAL_TOKENS = ["<s>", "<pad>", "</s>", "<unk>", "<mask>"]
+
+
+def clean_text(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def collect_texts(corpus_dirs, query_files):
+    texts = []
+
+    for corpus_dir in corpus_dirs:
+        synonyms_path = Path(corpus_dir) / "synonyms.json"
+        if synonyms_path.exists():
+            data = json.loads(synonyms_path.read_text(encoding="utf-8"))
+            for key, values in data.items() if isinstance(data, dict) else ():
+                texts.append(clean_text(f"query: {key}"))
+                for value in values if isinstance(values, list) else [values]:
+                    texts.append(clean_text(f"query: {value}"))
+
+        for item in load_glob(Path(corpus_dir) / "*.json"):
+            title = item["title"]
+            title_sw = item["titleSw"]
+            texts.append(clean_text(f"passage: {title}. {item['contentEn']}"))
+            texts.append(clean_text(f"passage: {title_sw}. {title}. {item['contentSw']}"))
+            for alias in item["aliasesSw"]:
+                texts.append(clean_text(f"query: {alias}"))
+
+    for query_file in query_files:
+        for q in json.loads(Path(query_file).read_text(encoding="utf-8")):
+            texts.append(clean_text("query: " + q["query"]))
+
+    return sorted({t for t in texts if t})
+
+
+def select_kept_ids(tokenizer, texts, keep_top):
+    vocab = json.loads(tokenizer.backend_tokenizer.to_str())["model"]["vocab"]
+
+    kept = set(range(min(keep_top, len(vocab))))
+    kept.update(tokenizer.convert_tokens_to_ids(SPECIAL_TOKENS))
+
+    for i, (piece, _score) in enumerate(vocab):
+        ch = piece[1:] if piece.startswith("▁") else piece
+        if len(ch) == 1 and ord(ch) < 0x0250:
+            kept.add(i)
+
+    used = set()
+    for ids in tokenizer(texts, add_special_tokens=True)["input_ids"]:
+        used.update(ids)
+    kept.update(used)
+
+    return sorted(kept), len(used)
+
+
+def remap_special(node, old_to_new):
+    if isinstance(node, dict):
+        out = {}
+        for key, value in node.items():
+            if key in ("sep", "cls") and isinstance(value, list) and len(value) == 2:
+                out[key] = [value[0], old_to_new[value[1]]]
+            elif key == "ids" and isinstance(value, list):
+                out[key] = [old_to_new[i] for i in value]
+            elif key == "id" and isinstance(value, int):
+                out[key] = old_to_new[value]
+            else:
+                out[key] = remap_special(value, old_to_new)
+        return out
+    if isinstance(node, list):
+        return [remap_special(v, old_to_new) for v in node]
+    return node
+
+
+def build_pruned_tokenizer(tokenizer, kept_ids, out_dir):
+    spec = json.loads(tokenizer.backend_tokenizer.to_str())
+    old_to_new = {old: new for new, old in enumerate(kept_ids)}
+
+    model = spec["model"]
+    model["vocab"] = [model["vocab"][i] for i in kept_ids]
+    model["unk_id"] = old_to_new[model["unk_id"]]
+
+    spec["added_tokens"] = remap_special(spec.get("added_tokens") or [], old_to_new)
+    spec["post_processor"] = remap_special(spec.get("post_processor"), old_to_new)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer_json = out_dir / "tokenizer.json"
+    tokenizer_json.write_text(json.dumps(spec, ensure_ascii=False), encoding="utf-8")
+
+    pruned = XLMRobertaTokenizerFast(
+        tokenizer_file=str(tokenizer_json),
+        model_max_length=tokenizer.model_max_length,
+    )
+    pruned.save_pretrained(out_dir)
+
+    return pruned
+
+
+def build_pruned_model(model, kept_ids):
+    old_weight = model.get_input_embeddings().weight.detach()
+    index = torch.tensor(kept_ids, dtype=torch.long)
+
+    embeddings = torch.nn.Embedding.from_pretrained(
+        old_weight.index_select(0, index).clone(),
+        freeze=False,
+        padding_idx=model.config.pad_token_id,
+    )
+    model.set_input_embeddings(embeddings)
+    model.config.vocab_size = len(kept_ids)
+
+    return model
+
+
+@torch.no_grad()
+def encode(tokenizer, model, texts, batch_size, max_len):
+    encoder = E5Encoder(model).eval()
+    out = []
+    for i in range(0, len(texts), batch_size):
+        batch = tokenizer(
+            texts[i:i + batch_size],
+            max_length=max_len,
+            padding=True,
+            truncation=True,
+            return_tensors="pt",
+        )
+        out.append(encoder(batch["input_ids"], batch["attention_mask"]).numpy())
+    return np.vstack(out)
+
+
+def verify(texts, tokenizer, model, pruned_tokenizer, pruned_model, kept_ids, args):
+    old_to_new = {old: new for new, old in enumerate(kept_ids)}
+
+    old_ids = tokenizer(texts, max_length=args.max_len, truncation=True)["input_ids"]
+    new_ids = pruned_tokenizer(texts, max_length=args.max_len, truncation=True)["input_ids"]
+
+    token_mismatches = []
+    for text, old, new in zip(texts, old_ids, new_ids):
+        if [old_to_new.get(i, -1) for i in old] != new:
+            token_mismatches.append(text[:120])
+
+    if token_mismatches:
+        raise RuntimeError(
+            f"Pruned tokenizer diverges on {len(token_mismatches)} covered text(s), e.g. {token_mismatches[:3]}"
+        )
+
+    print(f"Token ids identical on {len(texts)} covered texts. Comparing embeddings...")
+
+    a = encode(tokenizer, model, texts, args.batch_size, args.max_len)
+    b = encode(pruned_tokenizer, pruned_model, texts, args.batch_size, args.max_len)
+    max_abs_diff = float(np.max(np.abs(a - b))) if len(texts) else 0.0
+
+    if max_abs_diff > args.atol:
+        raise RuntimeError(f"Embeddings differ: max_abs_diff={max_abs_diff:.3e} > atol={args.atol:.1e}")
+
+    return {
+        "covered_texts": len(texts),
+        "token_mismatches": 0,
+        "max_abs_diff": max_abs_diff,
+    }
+
+
+def export_tflite(onnx_path, saved_model_dir, tflite_path):
+    import onnx
+    import tensorflow as tf
+    from onnx_tf.backend import prepare
+
+    tf_rep = prepare(onnx.load(str(onnx_path)))
+    saved_model_dir.mkdir(parents=True, exist_ok=True)
+    tf_rep.export_graph(str(saved_model_dir))
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(str(saved_model_dir))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS,
+        tf.lite.OpsSet.SELECT_TF_OPS,
+    ]
+    converter.experimental_enable_resource_variables = True
+
+    tflite_path.write_bytes(converter.convert())
+
+
+def file_size(path):
+    return path.stat().st_size if path.exists() else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus-dirs", nargs="+", default=["assets/corpus/en", "assets/corpus/sw"])
+    parser.add_argument("--queries", nargs="+", default=["tools/eval_queries_en.json", "tools/eval_queries_sw.json"])
+    parser.add_argument("--out-dir", default="assets/models_e5small_pruned")
+    parser.add_argument("--keep-top", type=int, default=8000)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-len", type=int, default=128)
+    parser.add_argument("--atol", type=float, default=1e-5)
+    parser.add_argument("--skip-onnx", action="store_true")
+    parser.add_argument("--skip-tflite", action="store_true")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    onnx_path = out_dir / "encoder_e5small.onnx"
+    saved_model_dir = out_dir / "tf_saved_model"
+    tflite_path = out_dir / "encoder_e5small_dynamic_quant.tflite"
+
+    print(f"Loading model: {MODEL_ID}")
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+    model = AutoModel.from_pretrained(MODEL_ID).eval()
+    original_vocab = model.config.vocab_size
+    hidden = model.config.hidden_size
+
+    texts = collect_texts(args.corpus_dirs, args.queries)
+    print(f"Covered texts: {len(texts)}")
+
+    kept_ids, used_count = select_kept_ids(tokenizer, texts, args.keep_top)
+    print(f"Used tokens: {used_count}")
+    print(f"Kept tokens (with margin): {len(kept_ids)} / {original_vocab}")
+
+    if kept_ids[:4] != [0, 1, 2, 3]:
+        raise RuntimeError("Special tokens <s>/<pad>/</s>/<unk> must keep ids 0..3")
+
+    pruned_tokenizer = build_pruned_tokenizer(tokenizer, kept_ids, out_dir)
+    pruned_model = build_pruned_model(AutoModel.from_pretrained(MODEL_ID).eval(), kept_ids)
+
+    verification = verify(texts, tokenizer, model, pruned_tokenizer, pruned_model, kept_ids, args)
+    print(f"Embeddings identical (max_abs_diff={verification['max_abs_diff']:.3e})")
+
+    pruned_model.save_pretrained(out_dir)
+    (out_dir / "id_map.json").write_text(json.dumps(kept_ids), encoding="utf-8")
+
+    timings = {}
+    if not args.skip_onnx:
+        t0 = time.perf_counter()
+        print(f"Exporting ONNX to: {onnx_path}")
+        export_onnx(E5Encoder(pruned_model).eval(), pruned_tokenizer, onnx_path, args.max_len)
+        timings["onnx_s"] = time.perf_counter() - t0
+
+        if not args.skip_tflite:
+            t0 = time.perf_counter()
+            print(f"Converting to TFLite: {tflite_path}")
+            export_tflite(onnx_path, saved_model_dir, tflite_path)
+            timings["tflite_s"] = time.perf_counter() - t0
+
+    report = {
+        "model": MODEL_ID,
+        "original_vocab": original_vocab,
+        "used_tokens": used_count,
+        "kept_tokens": len(kept_ids),
+        "keep_top": args.keep_top,
+        "embedding_bytes_before": original_vocab * hidden * 4,
+        "embedding_bytes_after": len(kept_ids) * hidden * 4,
+        "verification": verification,
+        "artifacts": {
+            "tokenizer_json": file_size(out_dir / "tokenizer.json"),
+            "onnx": file_size(onnx_path),
+            "tflite": file_size(tflite_path),
+        },
+        "timings": timings,
+    }
+
+    (out_dir / "prune_report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print("\nDone.")
+    print(f"Embedding table: {report['embedding_bytes_before'] / 1e6:.1f} MB -> {report['embedding_bytes_after'] / 1e6:.1f} MB")
+    print(f"Report: {out_dir / 'prune_report.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,6 @@ Optional:
 """
 
 import argparse
-import glob
 import json
 import re
 import struct
@@ -27,6 +26,8 @@ from pathlib import Path
 import numpy as np
 from tokenizers import BertWordPieceTokenizer
 
+from corpus import load_glob
+
 
 TOKEN_RE = re.compile(r"\s+")
 
@@ -48,52 +49,25 @@ def clean_text(text):
 def load_items(corpus_glob):
     items = []
 
-    for path in sorted(glob.glob(corpus_glob)):
-        file_path = Path(path)
-        data = json.loads(file_path.read_text(encoding="utf-8"))
+    # contentEn / content_en / content, then the section bodies (see tools/corpus)
+    for item in load_glob(corpus_glob):
+        item_id = item["id"]
+        title = item["title"]
+        content = item["contentEn"]
 
-        if not isinstance(data, list):
-            print(f"[SKIP] {file_path}: expected JSON array")
+        if not item_id or not title:
             continue
 
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-
-            item_id = item.get("id")
-            title = item.get("title") or ""
-
-            # Support both naming styles
-            content = (
-                item.get("contentEn")
-                or item.get("content_en")
-                or item.get("content")
-                or ""
-            )
-
-            # If content is stored in sections, merge section bodies
-            if not content and isinstance(item.get("sections"), list):
-                parts = []
-                for section in item["sections"]:
-                    if isinstance(section, dict):
-                        parts.append(section.get("title", ""))
-                        parts.append(section.get("body", ""))
-                        parts.append(section.get("text", ""))
-                content = "\n".join(parts)
-
-            if not item_id or not title:
-                continue
-
-            # Important: use the same searchable text consistently.
-            # Title is repeated to give it stronger representation in the embedding.
-            embedding_text = clean_text(f"{title}. {title}. {content}")
-
-            items.append({
-                "id": item_id,
-                "title": title,
-                "source_file": file_path.name,
-                "text": embedding_text
-            })
+        # Important: use the same searchable text consistently.
+        # Title is repeated to give it stronger representation in the embedding.
+        embedding_text = clean_text(f"{title}. {title}. {content}")
+
+        items.append({
+            "id": item_id,
+            "title": title,
+            "source_file": item.file.name,
+            "text": embedding_text
+        })
 
     return items
 
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+reduce_e5small_index_dim.py
+
+Fits a PCA projection on E5 passage embeddings and writes reduced-dimension
+indexes plus a top-k accuracy report, so we can see where the quality cliff is.
+
+For every target dimension d the tool writes, next to each input index:
+- index_<lang>_d<d>.bin   (same <I n><H d><float32...> layout, L2-normalized)
+- meta is unchanged, so the existing meta_<lang>.json is reused
+- projection_d<d>.bin     (<H in_dim><H out_dim><float32 mean[in_dim]><float32 W[in_dim*out_dim]>)
+
+At query time the app computes normalize((q - mean) @ W) and scores it against
+the reduced index exactly like the full one.
+
+Recommended CMD:
+python tools\\reduce_e5small_index_dim.py --index-en assets\\embeddings_e5small\\index_en.bin --meta-en assets\\embeddings_e5small\\meta_en.json --index-sw assets\\embeddings_e5small\\index_sw.bin --meta-sw assets\\embeddings_e5small\\meta_sw.json --output tools\\eval_report_e5small_pca.json
+"""
+
+import argparse
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModel
+
+
+MODEL_ID = "intfloat/multilingual-e5-small"
+
+
+def average_pool(last_hidden_states, attention_mask):
+    last_hidden = last_hidden_states.masked_fill(~attention_mask[..., None].bool(), 0.0)
+    return last_hidden.sum(dim=1) / attention_mask.sum(dim=1)[..., None]
+
+
+def l2_normalize_rows(x):
+    return (x / (np.linalg.norm(x, axis=1, keepdims=True) + 1e-9)).astype(np.float32)
+
+
+def load_index(index_path):
+    with open(index_path, "rb") as f:
+        n = struct.unpack("<I", f.read(4))[0]
+        d = struct.unpack("<H", f.read(2))[0]
+        vectors = np.frombuffer(f.read(), dtype=np.float32)
+    return vectors.reshape(n, d)
+
+
+def write_index(path, vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    n, d = vectors.shape
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(struct.pack("<I", n))
+        f.write(struct.pack("<H", d))
+        f.write(vectors.tobytes(order="C"))
+
+
+def write_projection(path, mean, components):
+    in_dim, out_dim = components.shape
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(struct.pack("<H", in_dim))
+        f.write(struct.pack("<H", out_dim))
+        f.write(mean.astype(np.float32).tobytes(order="C"))
+        f.write(components.astype(np.float32).tobytes(order="C"))
+
+
+def fit_pca(vectors, center=True):
+    vectors = vectors.astype(np.float64)
+    mean = vectors.mean(axis=0) if center else np.zeros(vectors.shape[1])
+    # Right singular vectors are the principal axes, sorted by explained variance.
+    _, s, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+    explained = (s ** 2) / np.sum(s ** 2)
+    return mean.astype(np.float32), vt.T.astype(np.float32), explained
+
+
+def project(vectors, mean, components, dim):
+    return l2_normalize_rows((vectors - mean) @ components[:, :dim])
+
+
+@torch.no_grad()
+def encode_queries(queries, tokenizer, model, device, batch_size=32, max_len=512):
+    out = []
+    for i in range(0, len(queries), batch_size):
+        batch = ["query: " + q["query"] for q in queries[i:i + batch_size]]
+        inputs = tokenizer(
+            batch,
+            max_length=max_len,
+            padding=True,
+            truncation=True,
+            return_tensors="pt",
+        ).to(device)
+        outputs = model(**inputs)
+        embeddings = average_pool(outputs.last_hidden_state, inputs["attention_mask"])
+        embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        out.append(embeddings.cpu().numpy().astype(np.float32))
+    return np.vstack(out)
+
+
+def evaluate(query_vecs, queries, index_vectors, meta):
+    scores = query_vecs @ index_vectors.T
+    top = np.argsort(-scores, axis=1)[:, :5]
+
+    hits = {1: 0, 3: 0, 5: 0}
+    for q, row in zip(queries, top):
+        ids = [meta[i]["id"] for i in row]
+        for k in hits:
+            hits[k] += int(q["expected_id"] in ids[:k])
+
+    total = len(queries)
+    return {f"top_{k}_accuracy": (v / total if total else 0) for k, v in hits.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--index-en", required=True)
+    parser.add_argument("--meta-en", required=True)
+    parser.add_argument("--queries-en", default="tools/eval_queries_en.json")
+    parser.add_argument("--index-sw", required=True)
+    parser.add_argument("--meta-sw", required=True)
+    parser.add_argument("--queries-sw", default="tools/eval_queries_sw.json")
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--no-center", action="store_true")
+    parser.add_argument("--out-dir", default=None)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--max-len", type=int, default=512)
+    args = parser.parse_args()
+
+    langs = {
+        "en": (Path(args.index_en), Path(args.meta_en), Path(args.queries_en)),
+        "sw": (Path(args.index_sw), Path(args.meta_sw), Path(args.queries_sw)),
+    }
+
+    data = {}
+    for lang, (index_path, meta_path, queries_path) in langs.items():
+        vectors = load_index(index_path)
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if len(meta) != vectors.shape[0]:
+            raise RuntimeError(
+                f"[{lang}] Meta/index count mismatch: meta={len(meta)}, index={vectors.shape[0]}"
+            )
+        queries = json.loads(queries_path.read_text(encoding="utf-8"))
+        data[lang] = {"index": index_path, "vectors": vectors, "meta": meta, "queries": queries}
+
+    full_dim = data["en"]["vectors"].shape[1]
+    for dim in args.dims:
+        if not 0 < dim < full_dim:
+            raise ValueError(f"Target dim {dim} must be in 1..{full_dim - 1}")
+
+    # One projection for both languages, fitted on all passage vectors.
+    mean, components, explained = fit_pca(
+        np.vstack([d["vectors"] for d in data.values()]),
+        center=not args.no_center,
+    )
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"Loading model: {MODEL_ID}")
+    print(f"Device: {device}")
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+    model = AutoModel.from_pretrained(MODEL_ID)
+    model.eval().to(device)
+
+    for lang, d in data.items():
+        d["query_vecs"] = encode_queries(d["queries"], tokenizer, model, device, max_len=args.max_len)
+        print(f"[{lang}] Encoded {len(d['queries'])} queries")
+
+    out_dir = Path(args.out_dir) if args.out_dir else data["en"]["index"].parent
+    results = []
+
+    for lang, d in data.items():
+        metrics = evaluate(d["query_vecs"], d["queries"], d["vectors"], d["meta"])
+        results.append({
+            "lang": lang,
+            "dim": full_dim,
+            "index_bytes": d["index"].stat().st_size,
+            "explained_variance": 1.0,
+            **metrics,
+        })
+
+    for dim in args.dims:
+        projection_path = out_dir / f"projection_d{dim}.bin"
+        write_projection(projection_path, mean, components[:, :dim])
+
+        for lang, d in data.items():
+            reduced = project(d["vectors"], mean, components, dim)
+            reduced_path = out_dir / f"{d['index'].stem}_d{dim}.bin"
+            write_index(reduced_path, reduced)
+
+            query_vecs = project(d["query_vecs"], mean, components, dim)
+            metrics = evaluate(query_vecs, d["queries"], reduced, d["meta"])
+
+            results.append({
+                "lang": lang,
+                "dim": dim,
+                "index": str(reduced_path),
+                "projection": str(projection_path),
+                "index_bytes": reduced_path.stat().st_size,
+                "explained_variance": float(np.sum(explained[:dim])),
+                **metrics,
+            })
+
+    report = {
+        "model": MODEL_ID,
+        "centered": not args.no_center,
+        "full_dim": full_dim,
+        "results": results,
+    }
+
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print("\nDimension reduction report")
+    print("--------------------------")
+    print(f"{'lang':<5}{'dim':>5}{'var':>8}{'top1':>8}{'top3':>8}{'top5':>8}{'bytes':>10}")
+    for r in sorted(results, key=lambda r: (r["lang"], -r["dim"])):
+        print(
+            f"{r['lang']:<5}{r['dim']:>5}{r['explained_variance']:>8.3f}"
+            f"{r['top_1_accuracy']:>8.2%}{r['top_3_accuracy']:>8.2%}{r['top_5_accuracy']:>8.2%}"
+            f"{r['index_bytes']:>10}"
+        )
+    print(f"Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,30 @@
-import csv, time, re, sys, argparse, random
+import csv, time, re, sys, argparse
 from pathlib import Path
 
-try:
-    from deep_translator import GoogleTranslator, MyMemoryTranslator
-except Exception:
-    print("Please install deep-translator: py -m pip install --upgrade deep-translator")
-    sys.exit(1)
+from csv_stream import RowWriter, read_done_ids, repair_tail, windows
+from translation_memory import TranslationMemory
+from translators import add_backend_arguments, translator_from_args
+from web_translate_client import add_rate_arguments
 
 p = argparse.ArgumentParser(description="Resume Swahili translations by filling only blank contentSw cells.")
 p.add_argument("--src", default="content_json/cleaned", help="Folder with *_translation.csv (originals)")
 p.add_argument("--work", default=None, help="Folder with partial results (default: <src>/auto_translated if exists)")
-p.add_argument("--sleep", type=float, default=0.15, help="Pause between batches")
+add_backend_arguments(p)
 p.add_argument("--batch-size", type=int, default=20, help="Batch size for provider")
+p.add_argument("--concurrency", type=int, default=4, help="Provider requests in flight")
+add_rate_arguments(p)
+p.add_argument("--stream", action="store_true", help="Fill <work>/<name> row by row through <name>.part (resumable, bounded memory)")
+p.add_argument("--window", type=int, default=50, help="--stream: rows translated together per concurrent run")
+p.add_argument("--fsync-every", type=int, default=20, help="--stream: fsync the output every N rows")
 args = p.parse_args()
 
+if args.backend == "deep-translator":
+    try:
+        import deep_translator  # noqa: F401  (providers are created by web_translate_client)
+    except Exception:
+        print("Please install deep-translator: py -m pip install --upgrade deep-translator")
+        sys.exit(1)
+
 SRC = Path(args.src)
 WORK = Path(args.work) if args.work else (SRC / "auto_translated")
 WORK.mkdir(parents=True, exist_ok=True)
@@ -27,81 +38,28 @@ if not src_csvs:
     sys.exit(0)
 
 CACHE = {}
+TM = TranslationMemory()
+TRANSLATOR = translator_from_args(args, TM)
 
-def translate_batch(lines):
-    # Try Google batch → Google single → MyMemory single → fallback to English
-    out = [None]*len(lines)
-    idxs = [i for i, t in enumerate(lines) if t and not t.isspace()]
-    if not idxs:
-        return lines[:]
-    # 1) Google batch
-    try:
-        gt = GoogleTranslator(source="en", target="sw")
-        safe = [lines[i][:4500] for i in idxs]
-        res = gt.translate_batch(safe)
-        for i, r in zip(idxs, res):
-            out[i] = r
-    except Exception:
-        pass
-    # 2) Google single
-    for i in idxs:
-        if out[i] is not None: continue
-        try:
-            out[i] = GoogleTranslator(source="en", target="sw").translate(lines[i])
-        except Exception:
-            pass
-    # 3) MyMemory
-    for i in idxs:
-        if out[i] is not None: continue
-        try:
-            out[i] = MyMemoryTranslator(source="en", target="sw").translate(lines[i])
-        except Exception:
-            pass
-    # 4) fallback
-    for i in idxs:
-        if out[i] is None:
-            out[i] = lines[i]
-    # fill blanks for empty inputs
-    for i, t in enumerate(lines):
-        if out[i] is None:
-            out[i] = t
-    return out
+STRUCTURE_ONLY_RE = re.compile(r'^\s*([#>\-\*\d\.\)]+)\s*$')
+
+def translatable_lines(s: str):
+    lines = []
+    if s.strip():
+        for p in s.split("\n\n"):
+            lines.extend(ln for ln in p.split("\n") if not STRUCTURE_ONLY_RE.match(ln or ""))
+    return lines
 
 def translate_block(s: str) -> str:
     if not s.strip():
         return s
-    paragraphs = s.split("\n\n")
+    # shared translation memory first, then the backend (no-op after prefetch)
+    TRANSLATOR.fill_cache(translatable_lines(s), CACHE)
     out_paras = []
-    for p in paragraphs:
-        lines = p.split("\n")
-        to_translate, idxs = [], []
-        for i, ln in enumerate(lines):
-            if re.match(r'^\s*([#>\-\*\d\.\)]+)\s*$', ln or ""):
-                continue
-            if ln in CACHE: 
-                continue
-            to_translate.append(ln)
-            idxs.append(i)
-        # chunked batches
-        for k in range(0, len(to_translate), args.batch_size):
-            chunk = to_translate[k:k+args.batch_size]
-            if not chunk: 
-                continue
-            backoff = 0
-            while True:
-                try:
-                    res = translate_batch(chunk)
-                    for j, tr in enumerate(res):
-                        CACHE[chunk[j]] = tr
-                    break
-                except Exception:
-                    backoff = max(0.5, min(8, backoff*2 if backoff else 0.5))
-                    time.sleep(backoff + random.uniform(0, 0.3))
-            time.sleep(args.sleep)
-        # rebuild
+    for p in s.split("\n\n"):
         out_lines = []
-        for ln in lines:
-            if re.match(r'^\s*([#>\-\*\d\.\)]+)\s*$', ln or ""):
+        for ln in p.split("\n"):
+            if STRUCTURE_ONLY_RE.match(ln or ""):
                 out_lines.append(ln)
             else:
                 out_lines.append(CACHE.get(ln, ln))
@@ -123,9 +81,59 @@ def safe_write(path: Path, fieldnames, rows):
             w.writerow(r)
     tmp.replace(path)
 
+def stream_csv(src: Path, out: Path):
+    """Per-row durable: rows are read lazily from the work file (then any source
+    rows it lacks), blank contentSw cells are filled and every finished row is
+    appended to <out>.part, which replaces the work file once complete. Only ids
+    are kept in memory; an interrupted run resumes after the ids in the part file."""
+    part = out.with_name(out.name + ".part")
+    dropped = repair_tail(part)
+    if dropped:
+        print(f"{src.name}: dropped a torn last row ({dropped} bytes)")
+    done_ids = read_done_ids(part)
+    seen = set(done_ids)
+
+    def rows(path):
+        with path.open("r", encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+
+    def pending():
+        for source in ([out] if out.exists() else []) + [src]:
+            for r in rows(source):
+                k = (r.get("id") or "").strip()
+                if k in seen and (source == src or k in done_ids):
+                    continue
+                if k:
+                    seen.add(k)
+                yield r
+
+    with src.open("r", encoding="utf-8", newline="") as f:
+        fieldnames = csv.DictReader(f).fieldnames   # source schema is authoritative
+
+    written = translated_cells = 0
+    start = time.time()
+    with RowWriter(part, fieldnames, fsync_every=args.fsync_every) as w:
+        for window in windows(pending(), args.window):
+            todo = [r.get("contentEn", "") or "" for r in window if not (r.get("contentSw") or "").strip()]
+            TRANSLATOR.fill_cache([ln for en in todo for ln in translatable_lines(en)], CACHE)
+            for r in window:
+                en = r.get("contentEn","") or ""
+                if not (r.get("contentSw") or "").strip() and en.strip():
+                    r["contentSw"] = translate_block(en)
+                    translated_cells += 1
+                w.writerow({k: r.get(k, "") for k in fieldnames})
+            written += len(window)
+            rate = written / max(0.001, time.time() - start)
+            print(f"{src.name}: +{written} rows (~{rate:.1f} rows/sec, {len(done_ids)} already done)")
+    part.replace(out)
+    print(f"✔ {src.name} → {out} | newly translated: {translated_cells}")
+
 for src in src_csvs:
     # Decide output file path in WORK
     out = WORK / src.name
+    if args.stream:
+        stream_csv(src, out)
+        continue
     # Load rows from SRC (authoritative schema/order)
     fieldnames, src_rows = read_csv(src)
 
@@ -138,6 +146,11 @@ for src in src_csvs:
             if k and (r.get("contentSw") or "").strip():
                 existing[k] = r["contentSw"]
 
+    # every blank cell's lines in one concurrent run; the loop below reads the cache
+    todo = [r.get("contentEn", "") or "" for r in src_rows
+            if not (r.get("contentSw") or "").strip() and (r.get("id") or "").strip() not in existing]
+    TRANSLATOR.fill_cache([ln for en in todo for ln in translatable_lines(en)], CACHE)
+
     total = len(src_rows)
     done_rows = 0
     translated_cells = 0
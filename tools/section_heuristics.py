@@ -1,47 +1,119 @@
 import re
 
 SECTION_KEYS = {
+    "overview":  ["overview","introduction","muhtasari","utangulizi"],
     "treatment": ["treatment","treatments","management","therapy","care","remedy","remedies","matibabu","tiba","huduma","utunzaji"],
     "causes":    ["cause","causes","etiology","risk factor","risk factors","visababishi","kisababishi","sababu","vyanzo"],
     "symptoms":  ["symptom","symptoms","sign","signs","presentation","dalili","viashiria","ishara"],
     "usage":     ["how to use","usage","matumizi","jinsi ya kutumia"],
-    "habitat":   ["where found","habitat","inapatikana","hukua"]
+    "habitat":   ["where found / habitat","where found","habitat","mahali inapopatikana","inapatikana","hukua"]
 }
 
+SECTION_ORDER = ["overview","treatment","causes","symptoms","usage","habitat"]
+
+# headings written back into content / structured sections, per language;
+# each one is a heading find_blocks recognises, so rebuilt text splits the same way
+SECTION_TITLES = {
+    "en": {"overview": "Overview", "treatment": "Treatment", "causes": "Causes",
+           "symptoms": "Symptoms", "usage": "How to use", "habitat": "Where found / Habitat"},
+    "sw": {"overview": "Muhtasari", "treatment": "Matibabu", "causes": "Sababu",
+           "symptoms": "Dalili", "usage": "Matumizi", "habitat": "Mahali inapopatikana"},
+}
+
+class HeadingClassifier:
+    """Maps a line to its section key, or None, with one precompiled pattern.
+
+    All synonyms are folded into one alternation with a named group per key,
+    tried in key order then synonym order, so the first key with a matching
+    synonym wins. Lines are stripped and lowercased before matching.
+
+    markers: a leading list marker ("1.", "2)", "-", "•") may precede the heading.
+    inline:  text may follow the heading after ":", "-", "–" or "—"
+             ("Treatment: rest and fluids"); otherwise only trailing
+             punctuation and whitespace are allowed.
+    """
+
+    def __init__(self, sections, markers=True, inline=True):
+        self.keys = list(sections)
+        groups = []
+        for i, key in enumerate(self.keys):
+            syns = dict.fromkeys(s.lower() for s in sections[key])
+            groups.append(f"(?P<k{i}>{'|'.join(map(re.escape, syns))})")
+        prefix = r"(?:\d+[\).\s-]+|[-–—•]\s*)?" if markers else ""
+        tail = r"\s*(?:[:\-–—].*)?" if inline else r"\s*[:\-–—]?\s*"
+        self.pattern = re.compile(f"{prefix}(?:{'|'.join(groups)}){tail}", re.S)
+
+    def classify(self, line: str):
+        m = self.pattern.fullmatch(line.strip().lower())
+        return self.keys[int(m.lastgroup[1:])] if m else None
+
+
+HEADINGS = HeadingClassifier(SECTION_KEYS)
+INLINE_RE = re.compile(r'[:\-–—]\s*(.+)$')
+
 def find_blocks(text: str):
     """Return dict(section -> list[str]) by scanning headings present in the text."""
     text = (text or "").replace("\r\n","\n")
     lines = text.split("\n")
-    def _is_heading(line, syns):
-        l = line.strip().lower()
-        stripped = re.sub(r'^(?:\d+[\).\s-]+|[-–—•]\s*)','', l)
-        for s in syns:
-            if re.fullmatch(fr"{re.escape(s)}\s*[:\-–—]?", stripped): return True
-            if re.match(fr"{re.escape(s)}\s*[:\-–—]", stripped): return True
-        return False
 
     cur = "overview"
-    out = {k:[] for k in ["overview","treatment","causes","symptoms","usage","habitat"]}
+    out = {k:[] for k in SECTION_ORDER}
     buf = []
     def flush():
         t = "\n".join(buf).strip()
         if t: out[cur].append(t)
         buf.clear()
 
+    classify = HEADINGS.classify
     for ln in lines:
-        maybe = None
-        for key, syns in SECTION_KEYS.items():
-            if _is_heading(ln, syns):
-                maybe = key
-                break
+        maybe = classify(ln)
         if maybe:
             flush()
             cur = maybe
             # keep inline text after colon
-            m = re.search(r'[:\-–—]\s*(.+)$', ln.strip())
+            m = INLINE_RE.search(ln.strip())
             if m: buf.append(m.group(1))
         else:
             buf.append(ln)
     flush()
     # drop empty lists
     return {k:v for k,v in out.items() if v}
+
+def split_sections(text: str, lang: str = "en"):
+    """Structured sections in canonical order: [{"key", "title", "body"}] ([] for empty text)."""
+    blocks = find_blocks(text)
+    titles = SECTION_TITLES[lang]
+    return [{"key": k, "title": titles[k], "body": "\n\n".join(blocks[k])} for k in SECTION_ORDER if k in blocks]
+
+if __name__ == "__main__":
+    # benchmark: python tools/section_heuristics.py [--langs en sw sw_eval] [--repeat 3]
+    import argparse, time
+    from corpus import load_corpus
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--langs", nargs="+", default=["en", "sw", "sw_eval"])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    corpus = load_corpus(args.langs)
+    texts = [t for name in ("contentEn", "contentSw") for t in corpus.column(name) if t]
+    lines = [ln for t in texts for ln in t.split("\n")]
+
+    def best_ms(fn):
+        runs = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            fn()
+            runs.append((time.perf_counter() - t0) * 1000.0)
+        return min(runs)
+
+    classify = HEADINGS.classify
+    blocks_ms = best_ms(lambda: [find_blocks(t) for t in texts])
+    split_ms = best_ms(lambda: [split_sections(t) for t in texts])
+    lines_ms = best_ms(lambda: [classify(ln) for ln in lines])
+    headings = sum(1 for ln in lines if classify(ln))
+
+    print(f"{len(corpus.files)} files, {len(texts)} texts, {len(lines)} lines, {headings} headings")
+    print(f"find_blocks (all texts)  : {blocks_ms:8.1f} ms  ({blocks_ms * 1000 / len(texts):.1f} us/text)")
+    print(f"split_sections (all)     : {split_ms:8.1f} ms")
+    print(f"classify (all lines)     : {lines_ms:8.1f} ms  ({len(lines) / lines_ms * 1000:,.0f} lines/s)")
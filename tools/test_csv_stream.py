@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from csv_stream import RowWriter, read_done_ids, repair_tail
+
+
+ROOT = Path(__file__).resolve().parents[1]
+HERBS_CSV = ROOT / "content_json" / "cleaned" / "auto_translated" / "herbs_translation.csv"
+
+FIELDS = ["id", "contentEn", "contentSw"]
+ROWS = [
+    {"id": "a", "contentEn": "one", "contentSw": "moja"},
+    {"id": "b", "contentEn": 'two "quoted"\nlines', "contentSw": "mbili"},
+    {"id": "c", "contentEn": "three", "contentSw": "tatu"},
+]
+
+
+def _write(tmp, name, data):
+    path = Path(tmp) / name
+    path.write_bytes(data)
+    return path
+
+
+def _csv_bytes(newline):
+    lines = ['id,contentEn,contentSw', 'a,one,moja', 'b,"two ""quoted""\nlines",mbili', 'c,three,tatu']
+    return (newline.join(lines) + newline).encode("utf-8")
+
+
+def test_complete_files_are_left_alone():
+    with tempfile.TemporaryDirectory() as tmp:
+        for newline in ("\n", "\r\n"):
+            data = _csv_bytes(newline)
+            path = _write(tmp, "ok.csv", data)
+            assert repair_tail(path) == 0
+            assert path.read_bytes() == data
+        if HERBS_CSV.exists():
+            path = Path(tmp) / HERBS_CSV.name
+            shutil.copyfile(HERBS_CSV, path)
+            assert repair_tail(path) == 0
+            assert path.read_bytes() == HERBS_CSV.read_bytes()
+
+
+def test_torn_last_row_is_cut_back_to_the_last_record():
+    with tempfile.TemporaryDirectory() as tmp:
+        for newline in ("\n", "\r\n"):
+            data = _csv_bytes(newline)
+            path = _write(tmp, "torn.csv", data + b"d,fo")
+            assert repair_tail(path) == 4
+            assert path.read_bytes() == data
+
+            # torn inside a quoted field, right after one of its own newlines
+            path = _write(tmp, "torn.csv", data + b'd,"four\n')
+            assert repair_tail(path) == len(b'd,"four\n')
+            assert path.read_bytes() == data
+            assert read_done_ids(path) == {"a", "b", "c"}
+
+
+def test_never_truncates_the_whole_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write(tmp, "header.csv", b"id,contentEn,cont")
+        try:
+            repair_tail(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
+        assert path.read_bytes() == b"id,contentEn,cont"
+
+
+def test_row_writer_appends_after_repair():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "out.csv"
+        with RowWriter(path, FIELDS) as w:
+            for r in ROWS[:2]:
+                w.writerow(r)
+        with path.open("ab") as f:
+            f.write(b"c,thr")   # crash mid-row
+        repair_tail(path)
+        with RowWriter(path, FIELDS) as w:
+            w.writerow(ROWS[2])
+        assert read_done_ids(path) == {"a", "b", "c"}
+
+
+def main():
+    for test in (
+        test_complete_files_are_left_alone,
+        test_torn_last_row_is_cut_back_to_the_last_record,
+        test_never_truncates_the_whole_file,
+        test_row_writer_appends_after_repair,
+    ):
+        test()
+        print(f"OK {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import time
+
+from web_translate_client import AsyncTranslateClient, CircuitBreaker, DeepTranslatorProvider, Provider
+
+
+class RacyTranslator:
+    """Keeps the query on the instance between building the request and
+    reading the response, like deep_translator's GoogleTranslator."""
+
+    def __init__(self):
+        self._url_params = {}
+
+    def translate(self, text):
+        self._url_params["q"] = text
+        time.sleep(0.001)
+        return f"[sw] {self._url_params['q']}"
+
+
+class FakeProvider(DeepTranslatorProvider):
+    name = "fake"
+
+    def __init__(self):
+        super().__init__(RacyTranslator)
+
+
+class FakeBatchProvider(Provider):
+    name = "fake-batch"
+
+    def translate_batch(self, lines):
+        return [f"[sw] {line}" for line in lines]
+
+
+class BlankLineProvider(Provider):
+    """Answers every batch but always returns one line blank."""
+
+    name = "blank"
+
+    def __init__(self, bad):
+        self.bad = bad
+
+    def translate_batch(self, lines):
+        return ["" if line == self.bad else f"[sw] {line}" for line in lines]
+
+
+def test_concurrent_lines_keep_their_own_translation():
+    lines = [f"Line {i}: drink plenty of water and rest." for i in range(200)]
+    client = AsyncTranslateClient(providers=[FakeProvider()], concurrency=4, rate=10000.0, batch_size=5)
+
+    out = client.translate_many(lines)
+
+    wrong = [(ln, t) for ln, (t, _) in zip(lines, out) if t != f"[sw] {ln}"]
+    assert not wrong, f"{len(wrong)}/{len(lines)} lines got another line's translation, e.g. {wrong[0]}"
+    assert all(provider == "fake" for _, provider in out)
+
+
+def test_rate_limit_charges_per_request():
+    lines = [f"Line {i}" for i in range(40)]
+
+    per_line = AsyncTranslateClient(providers=[FakeProvider()], rate=10000.0, batch_size=10)
+    per_line.translate_many(lines)
+    assert per_line.stats["fake"]["requests"] == 40
+
+    batched = AsyncTranslateClient(providers=[FakeBatchProvider()], rate=10000.0, batch_size=10)
+    batched.translate_many(lines)
+    assert batched.stats["fake-batch"]["requests"] == 4
+
+
+def test_blank_line_is_a_per_line_miss():
+    lines = [f"Line {i}" for i in range(40)]
+    client = AsyncTranslateClient(providers=[BlankLineProvider("Line 7"), FakeBatchProvider()],
+                                  rate=10000.0, batch_size=10, failure_threshold=1)
+
+    out = client.translate_many(lines)
+
+    assert out[7] == ("[sw] Line 7", "fake-batch")
+    assert all(out[i] == (f"[sw] {ln}", "blank") for i, ln in enumerate(lines) if i != 7)
+    assert client.stats["blank"]["failures"] == 0
+    assert not client.breakers["blank"].is_open
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_after=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()   # the probe is still out
+
+    breaker.record_failure()     # probe failed: open for another cool-down
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def main():
+    for test in (
+        test_concurrent_lines_keep_their_own_translation,
+        test_rate_limit_charges_per_request,
+        test_blank_line_is_a_per_line_miss,
+        test_half_open_breaker_lets_one_probe_through,
+    ):
+        test()
+        print(f"OK {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+tokenizer_artifact.py
+
+Compiles tokenizer vocabularies into a compact binary lookup artifact, with a
+reference encoder that uses only the artifact, golden tests against the HF
+tokenizers and a throughput benchmark.
+
+Supported vocabularies:
+- wordpiece: MiniLM assets/models/vocab.txt (BERT uncased, '##' continuation)
+- unigram:   E5 assets/models_e5small/tokenizer.json (SentencePiece Unigram)
+
+Artifact layout (little-endian):
+    header   <4sHBBIIfiIH  magic "NRTK", version, kind, flags, n_pieces,
+                           n_slots, unk_score, unk_id, blob_len, max_chars
+    lengths  uint8[n_pieces]        byte length of piece i (uint16 with FLAG_LEN16);
+                                    piece offsets are their running sum
+    scores   float32[n_pieces]      unigram only
+    slots    uint16[n_slots]        0 = empty, else piece id + 1 (uint32 with FLAG_SLOT32)
+    blob     utf-8 piece bytes, in id order
+
+The hash table holds the pieces only, addressed by crc32(piece) % n_slots
+with linear probing. max_chars (the longest piece, in characters) bounds the
+walks: WordPiece tries substrings longest-first from at most max_chars, and
+the Viterbi lattice tries at most max_chars ends per position, so encoding
+needs no prefix entries and the artifact stays close to the source vocab
+size, without parsing vocab.txt or tokenizer.json at startup.
+
+Recommended CMD:
+python tools\\tokenizer_artifact.py compile --kind wordpiece --vocab assets\\models\\vocab.txt --out assets\\models\\vocab.nrtk
+python tools\\tokenizer_artifact.py compile --kind unigram --vocab assets\\models_e5small\\tokenizer.json --out assets\\models_e5small\\tokenizer.nrtk
+python tools\\tokenizer_artifact.py verify --artifact assets\\models\\vocab.nrtk --hf assets\\models\\vocab.txt
+python tools\\tokenizer_artifact.py bench --artifact assets\\models_e5small\\tokenizer.nrtk --hf assets\\models_e5small
+"""
+
+import argparse
+import glob
+import json
+import re
+import struct
+import sys
+import time
+import unicodedata
+import zlib
+from array import array
+from itertools import accumulate
+from pathlib import Path
+
+
+MAGIC = b"NRTK"
+VERSION = 2
+KIND_WORDPIECE = 0
+KIND_UNIGRAM = 1
+HEADER = struct.Struct("<4sHBBIIfiIH")
+
+FLAG_LEN16 = 1
+FLAG_SLOT32 = 2
+
+MAX_LOAD_FACTOR = 0.8
+UNK_PENALTY = 10.0
+MAX_INPUT_CHARS_PER_WORD = 100
+
+
+def _le_array(typecode, data):
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def _le_bytes(arr):
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def read_wordpiece_vocab(path):
+    pieces = Path(path).read_text(encoding="utf-8").split("\n")
+    if pieces and pieces[-1] == "":
+        pieces.pop()
+    pieces = [p.strip() for p in pieces]
+    return pieces, None, pieces.index("[UNK]")
+
+
+def read_unigram_vocab(path):
+    model = json.loads(Path(path).read_text(encoding="utf-8"))["model"]
+    if model.get("type") != "Unigram":
+        raise ValueError(f"Expected Unigram tokenizer, found {model.get('type')}")
+    pieces = [row[0] for row in model["vocab"]]
+    scores = [float(row[1]) for row in model["vocab"]]
+    return pieces, scores, int(model["unk_id"])
+
+
+def compile_artifact(pieces, scores, unk_id, kind):
+    encoded = [piece.encode("utf-8") for piece in pieces]
+    blob = b"".join(encoded)
+    max_bytes = max(len(b) for b in encoded)
+    max_chars = max(len(piece) for piece in pieces)
+    if max_bytes > 0xFFFF or max_chars > 0xFFFF:
+        raise ValueError(f"Piece too long: {max(pieces, key=len)[:40]}...")
+
+    n_slots = int(len(pieces) / MAX_LOAD_FACTOR) + 1
+    flags = (FLAG_LEN16 if max_bytes > 0xFF else 0) | (FLAG_SLOT32 if len(pieces) >= 0xFFFF else 0)
+    lengths = array("H" if flags & FLAG_LEN16 else "B", map(len, encoded))
+    slots = array("I" if flags & FLAG_SLOT32 else "H", [0]) * n_slots
+
+    # later duplicates win, like the HF vocab maps
+    for pid, key in enumerate(encoded):
+        slot = zlib.crc32(key) % n_slots
+        while slots[slot] and encoded[slots[slot] - 1] != key:
+            slot = (slot + 1) % n_slots
+        slots[slot] = pid + 1
+
+    unk_score = (min(scores) - UNK_PENALTY) if scores else 0.0
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, kind, flags, len(pieces), n_slots, unk_score, unk_id,
+                                len(blob), max_chars))
+    out += _le_bytes(lengths)
+    if kind == KIND_UNIGRAM:
+        out += _le_bytes(array("f", scores))
+    out += _le_bytes(slots)
+    out += blob
+    return bytes(out)
+
+
+class CompiledVocab:
+    def __init__(self, data):
+        magic, version, kind, flags, n, n_slots, unk_score, unk_id, blob_len, max_chars = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a tokenizer artifact (bad magic/version)")
+
+        pos = HEADER.size
+        len_size = 2 if flags & FLAG_LEN16 else 1
+        lengths = _le_array("H" if len_size == 2 else "B", data[pos:pos + len_size * n])
+        pos += len_size * n
+        self.offsets = array("I", accumulate(lengths, initial=0))
+        self.scores = None
+        if kind == KIND_UNIGRAM:
+            self.scores = _le_array("f", data[pos:pos + 4 * n])
+            pos += 4 * n
+        slot_size = 4 if flags & FLAG_SLOT32 else 2
+        self.slots = _le_array("I" if slot_size == 4 else "H", data[pos:pos + slot_size * n_slots])
+        pos += slot_size * n_slots
+        self.blob = bytes(data[pos:pos + blob_len])
+
+        self.kind = kind
+        self.size = n
+        self.n_slots = n_slots
+        self.unk_id = unk_id
+        self.unk_score = unk_score
+        self.max_chars = max_chars
+
+    @classmethod
+    def load(cls, path):
+        return cls(Path(path).read_bytes())
+
+    def lookup(self, key_bytes):
+        """Return the piece id of key_bytes, or None when it is not a piece."""
+        slots, offsets, n_slots = self.slots, self.offsets, self.n_slots
+        slot = zlib.crc32(key_bytes) % n_slots
+        n = len(key_bytes)
+        while True:
+            ref = slots[slot]
+            if not ref:
+                return None
+            start = offsets[ref - 1]
+            if offsets[ref] - start == n and self.blob[start:start + n] == key_bytes:
+                return ref - 1
+            slot = (slot + 1) % n_slots
+
+    def piece_id(self, piece):
+        return self.lookup(piece.encode("utf-8"))
+
+    def piece(self, pid):
+        return self.blob[self.offsets[pid]:self.offsets[pid + 1]].decode("utf-8")
+
+
+def _is_whitespace(ch):
+    return ch in " \t\n\r" or unicodedata.category(ch) == "Zs"
+
+
+def _is_control(ch):
+    if ch in "\t\n\r":
+        return False
+    return unicodedata.category(ch).startswith("C")
+
+
+def _is_punctuation(ch):
+    cp = ord(ch)
+    if 33 <= cp <= 47 or 58 <= cp <= 64 or 91 <= cp <= 96 or 123 <= cp <= 126:
+        return True
+    return unicodedata.category(ch).startswith("P")
+
+
+def _is_chinese_char(cp):
+    return (
+        0x4E00 <= cp <= 0x9FFF or 0x3400 <= cp <= 0x4DBF or 0x20000 <= cp <= 0x2A6DF
+        or 0x2A700 <= cp <= 0x2B73F or 0x2B740 <= cp <= 0x2B81F or 0x2B820 <= cp <= 0x2CEAF
+        or 0xF900 <= cp <= 0xFAFF or 0x2F800 <= cp <= 0x2FA1F
+    )
+
+
+class WordPieceEncoder:
+    """BERT uncased tokenization (BertNormalizer + BertPreTokenizer + WordPiece)."""
+
+    def __init__(self, vocab):
+        self.vocab = vocab
+        self.cls_id = vocab.piece_id("[CLS]")
+        self.sep_id = vocab.piece_id("[SEP]")
+
+    def basic_tokenize(self, text):
+        out = []
+        for ch in text:
+            cp = ord(ch)
+            if cp == 0 or cp == 0xFFFD or _is_control(ch):
+                continue
+            if _is_whitespace(ch):
+                out.append(" ")
+            elif _is_chinese_char(cp):
+                out.append(f" {ch} ")
+            else:
+                out.append(ch)
+        text = unicodedata.normalize("NFD", "".join(out))
+        text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn").lower()
+
+        words = []
+        for token in text.split():
+            current = []
+            for ch in token:
+                if _is_punctuation(ch):
+                    if current:
+                        words.append("".join(current))
+                        current = []
+                    words.append(ch)
+                else:
+                    current.append(ch)
+            if current:
+                words.append("".join(current))
+        return words
+
+    def wordpiece(self, word):
+        if len(word) > MAX_INPUT_CHARS_PER_WORD:
+            return [self.vocab.unk_id]
+
+        ids = []
+        start = 0
+        while start < len(word):
+            prefix = "##" if start > 0 else ""
+            # longest match first; nothing longer than max_chars can be a piece
+            end = min(len(word), start + self.vocab.max_chars - len(prefix))
+            while end > start:
+                pid = self.vocab.lookup((prefix + word[start:end]).encode("utf-8"))
+                if pid is not None:
+                    break
+                end -= 1
+            if end == start:
+                return [self.vocab.unk_id]
+            ids.append(pid)
+            start = end
+        return ids
+
+    def encode(self, text, add_special_tokens=True):
+        ids = []
+        for word in self.basic_tokenize(text):
+            ids.extend(self.wordpiece(word))
+        if add_special_tokens:
+            ids = [self.cls_id] + ids + [self.sep_id]
+        return ids
+
+
+class UnigramEncoder:
+    """XLM-R style SentencePiece Unigram (NFKC + Metaspace + Viterbi)."""
+
+    SPACE_RE = re.compile(r" {2,}")
+
+    def __init__(self, vocab):
+        self.vocab = vocab
+        self.bos_id = vocab.piece_id("<s>")
+        self.eos_id = vocab.piece_id("</s>")
+
+    def pre_tokenize(self, text):
+        text = unicodedata.normalize("NFKC", text)
+        text = "".join(" " if _is_whitespace(ch) else ch for ch in text)
+        text = self.SPACE_RE.sub(" ", text).replace(" ", "▁")
+        if not text.startswith("▁"):
+            text = "▁" + text
+        return re.findall(r"▁[^▁]*", text)
+
+    def viterbi(self, word):
+        n = len(word)
+        scores = self.vocab.scores
+        best = [float("-inf")] * (n + 1)
+        back = [None] * (n + 1)
+        best[0] = 0.0
+
+        for i in range(n):
+            if best[i] == float("-inf"):
+                continue
+            has_single = False
+            for end in range(i + 1, min(n, i + self.vocab.max_chars) + 1):
+                pid = self.vocab.lookup(word[i:end].encode("utf-8"))
+                if pid is None:
+                    continue
+                score = best[i] + scores[pid]
+                if score > best[end]:
+                    best[end] = score
+                    back[end] = (i, pid)
+                if end == i + 1:
+                    has_single = True
+            if not has_single:
+                score = best[i] + self.vocab.unk_score
+                if score > best[i + 1]:
+                    best[i + 1] = score
+                    back[i + 1] = (i, self.vocab.unk_id)
+
+        ids = []
+        pos = n
+        while pos > 0:
+            start, pid = back[pos]
+            # Consecutive unknown characters fuse into one <unk>.
+            if not (pid == self.vocab.unk_id and ids and ids[-1] == self.vocab.unk_id):
+                ids.append(pid)
+            pos = start
+        ids.reverse()
+        return ids
+
+    def encode(self, text, add_special_tokens=True):
+        ids = []
+        for word in self.pre_tokenize(text):
+            ids.extend(self.viterbi(word))
+        if add_special_tokens:
+            ids = [self.bos_id] + ids + [self.eos_id]
+        return ids
+
+
+def make_encoder(vocab):
+    return WordPieceEncoder(vocab) if vocab.kind == KIND_WORDPIECE else UnigramEncoder(vocab)
+
+
+def clean_text(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def collect_texts(corpus_globs, query_files):
+    texts = []
+    for pattern in corpus_globs:
+        for path in sorted(glob.glob(pattern)):
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            if not isinstance(data, list):
+                continue
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                for key in ("title", "titleSw", "contentEn", "content_en", "contentSw", "content_sw", "content"):
+                    value = item.get(key)
+                    if isinstance(value, str) and value.strip():
+                        texts.append(clean_text(value))
+                for alias in item.get("aliasesSw") or []:
+                    texts.append(clean_text(str(alias)))
+    for query_file in query_files:
+        for q in json.loads(Path(query_file).read_text(encoding="utf-8")):
+            texts.append(clean_text(q["query"]))
+    return [t for t in texts if t]
+
+
+def load_hf_encoder(vocab, hf_path):
+    if vocab.kind == KIND_WORDPIECE:
+        from tokenizers import BertWordPieceTokenizer
+
+        tok = BertWordPieceTokenizer(str(hf_path), lowercase=True)
+        return lambda batch: [e.ids for e in tok.encode_batch(batch)]
+
+    from transformers import AutoTokenizer
+
+    tok = AutoTokenizer.from_pretrained(str(hf_path))
+    return lambda batch: tok(batch, add_special_tokens=True)["input_ids"]
+
+
+def cmd_compile(args):
+    if args.kind == "wordpiece":
+        pieces, scores, unk_id = read_wordpiece_vocab(args.vocab)
+        kind = KIND_WORDPIECE
+    else:
+        pieces, scores, unk_id = read_unigram_vocab(args.vocab)
+        kind = KIND_UNIGRAM
+
+    data = compile_artifact(pieces, scores, unk_id, kind)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_bytes(data)
+
+    print(f"Pieces: {len(pieces)}")
+    print(f"Source: {args.vocab} ({Path(args.vocab).stat().st_size} bytes)")
+    print(f"Artifact: {out} ({len(data)} bytes)")
+
+
+def cmd_verify(args):
+    vocab = CompiledVocab.load(args.artifact)
+    encoder = make_encoder(vocab)
+    hf_encode = load_hf_encoder(vocab, args.hf)
+    texts = collect_texts(args.corpus_globs, args.queries)
+
+    mismatches = []
+    for i in range(0, len(texts), 256):
+        batch = texts[i:i + 256]
+        for text, expected in zip(batch, hf_encode(batch)):
+            got = encoder.encode(text)
+            if got != list(expected):
+                mismatches.append({"text": text[:200], "expected": list(expected)[:64], "got": got[:64]})
+
+    total = len(texts)
+    print(f"Golden texts: {total}")
+    print(f"Exact matches: {total - len(mismatches)}/{total}")
+
+    if args.report:
+        Path(args.report).write_text(
+            json.dumps({"total": total, "mismatches": mismatches}, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        print(f"Report: {args.report}")
+
+    for m in mismatches[:5]:
+        print(f"  MISMATCH: {m['text'][:80]!r}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+def cmd_bench(args):
+    texts = collect_texts(args.corpus_globs, args.queries)
+    n_chars = sum(len(t) for t in texts)
+
+    t0 = time.perf_counter()
+    vocab = CompiledVocab.load(args.artifact)
+    artifact_load_ms = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    if vocab.kind == KIND_WORDPIECE:
+        src = Path(args.hf)
+        {line.strip(): i for i, line in enumerate(src.read_text(encoding="utf-8").splitlines())}
+    else:
+        src = Path(args.hf) / "tokenizer.json"
+        vocab_list = json.loads(src.read_text(encoding="utf-8"))["model"]["vocab"]
+        {row[0]: i for i, row in enumerate(vocab_list)}
+    text_load_ms = (time.perf_counter() - t0) * 1000.0
+
+    encoder = make_encoder(vocab)
+    t0 = time.perf_counter()
+    n_tokens = sum(len(encoder.encode(t)) for t in texts)
+    ref_s = time.perf_counter() - t0
+
+    rows = [
+        ("artifact load", f"{artifact_load_ms:.1f} ms ({Path(args.artifact).stat().st_size} bytes)"),
+        (f"{src.name} parse", f"{text_load_ms:.1f} ms ({src.stat().st_size} bytes)"),
+        ("reference encode", f"{len(texts) / ref_s:.0f} texts/s, {n_tokens / ref_s:.0f} tokens/s, {n_chars / ref_s / 1e6:.2f} MB/s"),
+    ]
+
+    try:
+        hf_encode = load_hf_encoder(vocab, args.hf)
+    except ImportError as e:
+        print(f"[WARN] HF tokenizer unavailable, skipping: {e}")
+    else:
+        t0 = time.perf_counter()
+        hf_tokens = sum(len(ids) for ids in hf_encode(texts))
+        hf_s = time.perf_counter() - t0
+        rows.append(("HF encode (batched)", f"{len(texts) / hf_s:.0f} texts/s, {hf_tokens / hf_s:.0f} tokens/s"))
+
+    print(f"Texts: {len(texts)} ({n_chars} chars)")
+    for name, value in rows:
+        print(f"{name:<22}{value}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("compile")
+    p.add_argument("--kind", choices=["wordpiece", "unigram"], required=True)
+    p.add_argument("--vocab", required=True, help="vocab.txt (wordpiece) or tokenizer.json (unigram)")
+    p.add_argument("--out", required=True)
+    p.set_defaults(func=cmd_compile)
+
+    for name, func in (("verify", cmd_verify), ("bench", cmd_bench)):
+        p = sub.add_parser(name)
+        p.add_argument("--artifact", required=True)
+        p.add_argument("--hf", required=True, help="vocab.txt (wordpiece) or tokenizer dir (unigram)")
+        p.add_argument("--corpus-globs", nargs="+", default=["assets/corpus/en/*.json", "assets/corpus/sw/*.json"])
+        p.add_argument("--queries", nargs="+", default=["tools/eval_queries_en.json", "tools/eval_queries_sw.json"])
+        if name == "verify":
+            p.add_argument("--report", default=None)
+        p.set_defaults(func=func)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
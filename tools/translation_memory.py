@@ -0,0 +1,130 @@
+"""
+translation_memory.py
+
+Persistent EN->SW translation memory shared by every translation tool.
+
+Segments are keyed by (normalized source, backend, model) and stored in one
+SQLite file in WAL mode, so several translators can read and write it at the
+same time. Each row records which provider actually produced the text
+(google, mymemory, marian, argos, ...). Untranslated fallbacks (the English
+line echoed back) must never be stored.
+
+Usage:
+    tm = TranslationMemory()
+    hits = tm.get_many(lines, "deep-translator", "en-sw")   # {line: sw}
+    tm.put_many([(line, sw, "google"), ...], "deep-translator", "en-sw")
+"""
+
+import re
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+
+
+DEFAULT_TM_PATH = Path(__file__).resolve().parent / "cache" / "translation_memory.sqlite3"
+
+_WS_RE = re.compile(r"\s+")
+_MAX_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    src        TEXT NOT NULL,
+    backend    TEXT NOT NULL,
+    model      TEXT NOT NULL,
+    tgt        TEXT NOT NULL,
+    provider   TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (src, backend, model)
+) WITHOUT ROWID;
+"""
+
+
+def normalize_segment(text):
+    return _WS_RE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+class TranslationMemory:
+    def __init__(self, path=DEFAULT_TM_PATH, timeout=30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=timeout)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, segment, backend, model):
+        return self.get_many([segment], backend, model).get(segment)
+
+    def get_many(self, segments, backend, model):
+        """Bulk lookup. Returns {original segment: translation} for the hits only."""
+        by_key = {}
+        for seg in segments:
+            key = normalize_segment(seg)
+            if key:
+                by_key.setdefault(key, []).append(seg)
+
+        keys = list(by_key)
+        out = {}
+        for i in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[i:i + _MAX_PARAMS]
+            rows = self.conn.execute(
+                f"SELECT src, tgt FROM segments WHERE backend = ? AND model = ? "
+                f"AND src IN ({','.join('?' * len(chunk))})",
+                [backend, model, *chunk],
+            ).fetchall()
+            for src, tgt in rows:
+                for seg in by_key[src]:
+                    out[seg] = tgt
+        return out
+
+    def put(self, segment, translation, backend, model, provider):
+        self.put_many([(segment, translation, provider)], backend, model)
+
+    def put_many(self, records, backend, model):
+        """records: iterable of (source, translation, provider)."""
+        now = time.time()
+        rows = [
+            (normalize_segment(src), backend, model, tgt, provider, now)
+            for src, tgt, provider in records
+            if normalize_segment(src) and (tgt or "").strip()
+        ]
+        if not rows:
+            return 0
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO segments (src, backend, model, tgt, provider, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (src, backend, model) DO UPDATE SET "
+                "tgt = excluded.tgt, provider = excluded.provider, created_at = excluded.created_at",
+                rows,
+            )
+        return len(rows)
+
+    def stats(self):
+        rows = self.conn.execute(
+            "SELECT backend, model, provider, COUNT(*) FROM segments GROUP BY backend, model, provider"
+        ).fetchall()
+        return [
+            {"backend": b, "model": m, "provider": p, "segments": n}
+            for b, m, p, n in rows
+        ]
+
+
+if __name__ == "__main__":
+    import json
+
+    with TranslationMemory() as tm:
+        print(f"Translation memory: {tm.path}")
+        print(json.dumps(tm.stats(), indent=2))
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+translators.py
+
+One EN->SW translator interface for every backend:
+
+    tr = get_translator("argos")           # or "marian", "deep-translator"
+    sw_list = tr.translate_many(segments)  # aligned with segments
+
+Backends:
+  marian           transformers MarianMT (Helsinki-NLP/opus-mt-en-sw by default),
+                   batched through marian_batching
+  marian-onnx      the same model exported by marian_onnx.py (int8, ONNX Runtime)
+  argos            Argos Translate (offline CTranslate2 package; install it with
+                   tools/install_argos_en_sw.py), all sentences of a call in
+                   one CTranslate2 batch
+  deep-translator  Google -> MyMemory web providers through web_translate_client
+
+translate_many() de-duplicates its input and goes through the shared
+translation memory first (keyed per backend/model); only real translations are
+stored. fill_cache() is the same for the line caches of the CSV/JSON fillers.
+
+Scripts pick a backend per run with --backend (add_backend_arguments /
+translator_from_args; default deep-translator):
+    fill_missing_sw_deeptranslator.py, fill_translation_csvs_sw.py,
+    resume_translation_sw.py
+mt_en_to_sw.py and data-pipeline/translate_sw_hf_resumable.py stay on
+marian_pool: they shard sentence batches over worker processes, which
+translate_many() does not do; their engine is the marian backend's.
+
+Commands:
+    # fill the de-duplicated work list from dedupe_segments.py with one backend
+    python tools\\translators.py fill --backend argos
+
+    # segments/sec and peak memory per backend on a fixed sample (one process each)
+    python tools\\translators.py bench --backends argos marian --sample 200
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import random
+import time
+from importlib import metadata
+from pathlib import Path
+
+from translation_memory import TranslationMemory
+
+
+TOOLS = Path(__file__).resolve().parent
+SEGMENTS_DIR = TOOLS / "out" / "segments"
+MARIAN_MODEL = "Helsinki-NLP/opus-mt-en-sw"
+# Argos releases whose PackageTranslation internals ArgosTranslator batches through
+ARGOS_BATCHED_VERSIONS = ("1.10", "1.11")
+
+
+class Translator:
+    name = "translator"
+    model = ""
+
+    def __init__(self, tm=None):
+        self.tm = tm
+
+    def _translate(self, segments):
+        """Translate unique, non-empty segments. Returns [(sw, provider or None)]."""
+        raise NotImplementedError
+
+    def translate_many(self, segments):
+        segments = list(segments)
+        known = {}
+        self.fill_cache(segments, known)
+        return [known.get(s, s) for s in segments]
+
+    def fill_cache(self, lines, cache):
+        """Make sure every line is in cache: translation memory first, then the
+        misses through the backend. Lines it could not translate are cached
+        as-is and not stored. Returns the number of lines sent to the backend."""
+        todo = [s for s in dict.fromkeys(lines) if s and not s.isspace() and s not in cache]
+        if self.tm and todo:
+            cache.update(self.tm.get_many(todo, self.name, self.model))
+            todo = [s for s in todo if s not in cache]
+        if not todo:
+            return 0
+        results = self._translate(todo)
+        if self.tm:
+            self.tm.put_many([(s, t, p) for s, (t, p) in zip(todo, results) if p], self.name, self.model)
+        cache.update((s, t) for s, (t, _) in zip(todo, results))
+        return len(todo)
+
+
+class MarianTranslator(Translator):
+    name = "marian"
+
+    def __init__(self, model=MARIAN_MODEL, local_files_only=False, threads=None, tm=None, **opts):
+        super().__init__(tm)
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = str(model)
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model, local_files_only=local_files_only)
+        self.mt = AutoModelForSeq2SeqLM.from_pretrained(self.model, local_files_only=local_files_only)
+        self.mt.eval()
+        self.opts = opts
+
+    def _translate(self, segments):
+        from marian_batching import translate_segments
+
+        out = translate_segments(segments, self.tokenizer, self.mt, log=lambda *_: None, **self.opts)
+        return [(s, None) if t is None else (t, "marian") for s, t in zip(segments, out)]
+
+
+class OnnxMarianTranslator(MarianTranslator):
+    name = "marian-onnx"
+
+    def __init__(self, onnx_dir=None, threads=None, tm=None, **opts):
+        Translator.__init__(self, tm)
+        from marian_onnx import OUT_ROOT, OnnxMarian, tm_suffix
+
+        onnx_dir = Path(onnx_dir or OUT_ROOT / Path(MARIAN_MODEL).name)
+        self.mt = OnnxMarian(onnx_dir, threads=threads)
+        self.tokenizer = self.mt.tokenizer
+        self.model = self.mt.meta["source_model"] + tm_suffix(onnx_dir)
+        self.opts = opts
+
+
+class ArgosTranslator(Translator):
+    """Splits segments into paragraphs and sentences the way Argos does, then
+    sends every sentence of a translate_many() call through one CTranslate2
+    translate_batch (batched by tokens) instead of one translate() per segment."""
+
+    name = "argos"
+
+    def __init__(self, tm=None, **_):
+        super().__init__(tm)
+        import argostranslate.translate as T
+
+        langs = {lang.code: lang for lang in T.get_installed_languages()}
+        if "en" not in langs or "sw" not in langs:
+            raise SystemExit("Argos en->sw package not installed; run tools/install_argos_en_sw.py")
+        self.translation = langs["en"].get_translation(langs["sw"])
+        self.model = "en-sw"
+        # CachedTranslation -> PackageTranslation. The batched path uses its
+        # internals, so only on releases it was checked against; anything else
+        # gets one translate() call per segment
+        self.package = getattr(self.translation, "underlying", self.translation)
+        try:
+            version = metadata.version("argostranslate")
+        except metadata.PackageNotFoundError:
+            version = ""
+        self.batched = (
+            version.startswith(tuple(v + "." for v in ARGOS_BATCHED_VERSIONS))
+            and all(hasattr(self.package, a) for a in ("pkg", "sentencizer", "translator"))
+        )
+        if not self.batched:
+            print(f"Argos {version or '?'}: batched path checked on {', '.join(ARGOS_BATCHED_VERSIONS)} only;"
+                  " translating one segment at a time")
+
+    def _ctranslate2(self):
+        if self.package.translator is None:   # PackageTranslation loads it lazily
+            import ctranslate2
+            from argostranslate import settings
+
+            self.package.translator = ctranslate2.Translator(
+                str(self.package.pkg.package_path / "model"),
+                device=settings.device,
+                inter_threads=settings.inter_threads,
+                intra_threads=settings.intra_threads,
+                compute_type=settings.compute_type,
+            )
+        return self.package.translator
+
+    def _translate(self, segments):
+        if self.batched:
+            try:
+                return self._translate_batched(segments)
+            except (AttributeError, TypeError) as e:   # internals moved under us
+                print(f"Argos batched path failed ({type(e).__name__}: {e}); translating one segment at a time")
+                self.batched = False
+        return [(self.translation.translate(s), "argos") for s in segments]
+
+    def _translate_batched(self, segments):
+        from argostranslate import settings
+
+        pkg, sentencizer = self.package.pkg, self.package.sentencizer
+        tokenized, spans = [], []   # spans: per segment, (first, end) sentence range of each paragraph
+        for s in segments:
+            paragraphs = []
+            for paragraph in s.split("\n"):
+                sentences = sentencizer.split_sentences(paragraph)
+                paragraphs.append((len(tokenized), len(tokenized) + len(sentences)))
+                tokenized += [pkg.tokenizer.encode(sentence) for sentence in sentences]
+            spans.append(paragraphs)
+
+        prefix = pkg.target_prefix
+        results = self._ctranslate2().translate_batch(
+            tokenized,
+            target_prefix=[[prefix]] * len(tokenized) if prefix else None,
+            replace_unknowns=True,
+            max_batch_size=settings.batch_size,
+            batch_type="tokens",
+            beam_size=max(1, settings.beam_size),
+            num_hypotheses=1,
+            length_penalty=0.2,
+        )
+
+        def decode(first, end):
+            value = pkg.tokenizer.decode([t for r in results[first:end] for t in r.hypotheses[0]])
+            if prefix and value.startswith(prefix):
+                value = value[len(prefix):]
+            return value[1:] if value.startswith(" ") else value
+
+        return [("\n".join(decode(*span) for span in paragraphs).lstrip("\n"), "argos") for paragraphs in spans]
+
+
+class DeepTranslatorTranslator(Translator):
+    name = "deep-translator"
+    model = "en-sw"
+
+    def __init__(self, tm=None, concurrency=4, rate=5.0, batch_size=20, **_):
+        super().__init__(tm)
+        from web_translate_client import AsyncTranslateClient
+
+        self.client = AsyncTranslateClient(concurrency=concurrency, rate=rate, batch_size=batch_size)
+
+    def _translate(self, segments):
+        return self.client.translate_many(segments)
+
+
+BACKENDS = {
+    "marian": MarianTranslator,
+    "marian-onnx": OnnxMarianTranslator,
+    "argos": ArgosTranslator,
+    "deep-translator": DeepTranslatorTranslator,
+}
+
+
+def get_translator(name, **opts):
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise SystemExit(f"Unknown backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return cls(**opts)
+
+
+def add_backend_arguments(parser, default="deep-translator"):
+    parser.add_argument("--backend", choices=list(BACKENDS), default=default,
+                        help="Translator backend (--concurrency/--batch-size/--rate apply to deep-translator)")
+
+
+def translator_from_args(args, tm=None):
+    """The --backend translator; deep-translator takes the script's web client options."""
+    opts = {}
+    if args.backend == "deep-translator":
+        from web_translate_client import rate_from_args
+
+        opts = dict(concurrency=args.concurrency, rate=rate_from_args(args), batch_size=args.batch_size)
+    return get_translator(args.backend, tm=tm, **opts)
+
+
+# --- fill the de-duplicated work list ---
+
+def cmd_fill(args):
+    work = Path(args.work)
+    rows = [json.loads(line) for line in work.read_text(encoding="utf-8").splitlines() if line.strip()]
+    out_path = Path(args.out or work.with_name(f"translations_{args.backend}.jsonl"))
+
+    done = set()
+    if out_path.exists():
+        done = {json.loads(line)["seg"] for line in out_path.read_text(encoding="utf-8").splitlines() if line.strip()}
+    rows = [r for r in rows if r["seg"] not in done]
+    print(f"{work.name}: {len(rows)} segment(s) to translate with {args.backend} ({len(done)} already done)")
+
+    with TranslationMemory() as tm:
+        tr = get_translator(args.backend, tm=tm)
+        t0 = time.time()
+        n = 0
+        with out_path.open("a", encoding="utf-8") as f:
+            for k in range(0, len(rows), args.chunk):
+                chunk = rows[k:k + args.chunk]
+                for r, sw in zip(chunk, tr.translate_many([r["text"] for r in chunk])):
+                    f.write(json.dumps({"seg": r["seg"], "text": r["text"], "sw": sw}, ensure_ascii=False) + "\n")
+                f.flush()
+                n += len(chunk)
+                print(f"  {n}/{len(rows)} | ~{n / max(0.001, time.time() - t0):.1f} seg/sec")
+    print(f"Wrote {out_path}")
+
+
+# --- benchmark ---
+
+def fixed_sample(n, seed=0):
+    from dedupe_segments import iter_lines
+
+    lines = set()
+    for path in sorted((TOOLS.parent / "assets" / "corpus" / "en").glob("diseases_*.json")):
+        for it in json.loads(path.read_text(encoding="utf-8")):
+            lines.update(line.strip() for _, _, line in iter_lines(it.get("contentEn")))
+    lines = sorted(lines)
+    return random.Random(seed).sample(lines, min(n, len(lines)))
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        import sys
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    except ImportError:
+        try:
+            import psutil
+
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except Exception:
+            return None
+
+
+def _bench_one(backend, segments, queue):
+    try:
+        t0 = time.perf_counter()
+        tr = get_translator(backend)  # no translation memory: measure the backend itself
+        load_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        out = tr.translate_many(segments)
+        dt = time.perf_counter() - t0
+        queue.put({
+            "backend": backend,
+            "segments": len(segments),
+            "load_s": round(load_s, 2),
+            "translate_s": round(dt, 2),
+            "segments_per_s": round(len(segments) / max(dt, 1e-9), 2),
+            "translated": sum(1 for s, t in zip(segments, out) if t and t != s),
+            "peak_rss_mb": peak_rss_mb(),
+        })
+    except BaseException as e:  # SystemExit from missing packages included
+        queue.put({"backend": backend, "error": f"{type(e).__name__}: {e}"})
+
+
+def cmd_bench(args):
+    segments = fixed_sample(args.sample)
+    print(f"Sample: {len(segments)} segments, {sum(len(s) for s in segments)} chars")
+
+    ctx = mp.get_context("spawn")
+    results = []
+    for backend in args.backends:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_bench_one, args=(backend, segments, queue))
+        proc.start()
+        res = queue.get()
+        proc.join()
+        results.append(res)
+        if "error" in res:
+            print(f"{backend:>16}: {res['error']}")
+        else:
+            print(f"{backend:>16}: {res['segments_per_s']:>7.2f} seg/s | load {res['load_s']}s | "
+                  f"peak {res['peak_rss_mb'] or 0:.0f} MB | translated {res['translated']}/{res['segments']}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Wrote {args.report}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pluggable EN->SW translators")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("fill", help="Translate the unique-segment work list with one backend")
+    p.add_argument("--backend", choices=list(BACKENDS), default="argos")
+    p.add_argument("--work", default=str(SEGMENTS_DIR / "unique_segments.jsonl"))
+    p.add_argument("--out", default=None, help="Default: translations_<backend>.jsonl next to --work")
+    p.add_argument("--chunk", type=int, default=256, help="Segments per translate_many() call")
+
+    p = sub.add_parser("bench", help="Segments/sec and peak memory per backend")
+    p.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=["argos", "marian"])
+    p.add_argument("--sample", type=int, default=200)
+    p.add_argument("--report", default=None, help="Optional JSON output path")
+    args = ap.parse_args()
+
+    if args.command == "fill":
+        cmd_fill(args)
+    else:
+        cmd_bench(args)
+
+
+if __name__ == "__main__":
+    main()
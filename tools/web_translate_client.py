@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+web_translate_client.py
+
+Async, concurrent EN->SW web-translation client behind the deep-translator
+backend of translators.py (the default --backend of fill_translation_csvs_sw.py,
+resume_translation_sw.py and fill_missing_sw_deeptranslator.py).
+
+- a bounded number of requests in flight (asyncio.Semaphore)
+- one token bucket per provider, so wall time is bound by the provider's
+  rate limit instead of fixed sleeps; providers that make one HTTP request per
+  line (google, mymemory) are charged one token per line, not per batch
+- one reused client per provider and worker thread (no fresh GoogleTranslator
+  per line, and no client shared between threads)
+- jittered exponential retry, then a circuit breaker that stops calling a
+  provider that keeps failing and lets one probe back in after a cool-down
+- a blank line in an otherwise good response is a miss for that line only:
+  no retry, no breaker failure
+- provider chain per line: google -> mymemory -> give up (caller keeps English)
+
+The "http" provider speaks a tiny JSON protocol and is what the bundled stub
+server implements, so the client can be exercised without the network:
+
+    python tools\\web_translate_client.py stub --port 8765 --fail-rate 0.2
+    python tools\\web_translate_client.py demo --providers http --http-url http://127.0.0.1:8765 --lines 300 --rate 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+MAX_CHARS = 4500
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, tokens=1.0):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_after=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        if self.probing or time.monotonic() - self.opened_at < self.reset_after:
+            return False
+        self.probing = True   # half-open: one probe at a time until it succeeds or fails
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+class Provider:
+    name = "provider"
+    requests_per_line = False   # True if translate_batch makes one request per line
+
+    def translate_batch(self, lines):
+        raise NotImplementedError
+
+
+class DeepTranslatorProvider(Provider):
+    """deep_translator clients store the query being sent on the instance
+    (self._url_params["q"]), so a client shared by the worker threads mixes up
+    concurrent lines. Each thread gets its own client, reused across its calls."""
+
+    requests_per_line = True
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._local = threading.local()
+
+    @property
+    def client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.factory()
+        return client
+
+    def translate_batch(self, lines):
+        client = self.client
+        return [client.translate(line) for line in lines]
+
+
+class GoogleProvider(DeepTranslatorProvider):
+    name = "google"
+
+    def __init__(self):
+        from deep_translator import GoogleTranslator
+
+        super().__init__(lambda: GoogleTranslator(source="en", target="sw"))
+
+
+class MyMemoryProvider(DeepTranslatorProvider):
+    name = "mymemory"
+
+    def __init__(self):
+        from deep_translator import MyMemoryTranslator
+
+        super().__init__(lambda: MyMemoryTranslator(source="en", target="sw"))
+
+
+class HttpJsonProvider(Provider):
+    """POST {"q": [...], "source": "en", "target": "sw"} -> {"translations": [...]}"""
+
+    name = "http"
+
+    def __init__(self, url, timeout=30.0):
+        self.url = url.rstrip("/") + "/translate"
+        self.timeout = timeout
+
+    def translate_batch(self, lines):
+        body = json.dumps({"q": lines, "source": "en", "target": "sw"}).encode("utf-8")
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))["translations"]
+
+
+def make_provider(name, http_url=None):
+    if name == "google":
+        return GoogleProvider()
+    if name == "mymemory":
+        return MyMemoryProvider()
+    if name == "http":
+        return HttpJsonProvider(http_url or "http://127.0.0.1:8765")
+    raise ValueError(f"Unknown provider: {name}")
+
+
+class AsyncTranslateClient:
+    def __init__(
+        self,
+        providers=("google", "mymemory"),
+        concurrency=4,
+        rate=5.0,
+        batch_size=20,
+        max_retries=3,
+        failure_threshold=5,
+        reset_after=60.0,
+        http_url=None,
+    ):
+        self.providers = []
+        for p in providers:
+            provider = p if isinstance(p, Provider) else make_provider(p, http_url)
+            self.providers.append(provider)
+        self.concurrency = concurrency
+        self.rate = rate
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.buckets = {p.name: None for p in self.providers}
+        self.breakers = {p.name: CircuitBreaker(failure_threshold, reset_after) for p in self.providers}
+        self.stats = {p.name: {"requests": 0, "failures": 0, "lines": 0} for p in self.providers}
+
+    async def _call(self, provider, lines):
+        bucket = self.buckets[provider.name]
+        breaker = self.breakers[provider.name]
+        stats = self.stats[provider.name]
+
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                return None
+            cost = len(lines) if provider.requests_per_line else 1
+            for _ in range(cost):
+                await bucket.acquire()
+            stats["requests"] += cost
+            try:
+                out = await asyncio.to_thread(provider.translate_batch, lines)
+                if not isinstance(out, list) or len(out) != len(lines):
+                    raise ValueError("malformed response")
+            except Exception:
+                stats["failures"] += 1
+                breaker.record_failure()
+                if attempt < self.max_retries:
+                    await asyncio.sleep(min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5))
+                continue
+            breaker.record_success()
+            out = [t if isinstance(t, str) and t.strip() else None for t in out]   # blank: a miss for that line
+            stats["lines"] += sum(t is not None for t in out)
+            return out
+        return None
+
+    async def _translate_chunk(self, sem, lines):
+        async with sem:
+            result = [(ln, None) for ln in lines]
+            todo = list(range(len(lines)))
+            for provider in self.providers:
+                if not todo:
+                    break
+                out = await self._call(provider, [lines[i] for i in todo])
+                if out is None and len(todo) > 1:
+                    # one bad line can sink a whole batch: retry the lines individually
+                    singles = [await self._call(provider, [lines[i]]) for i in todo]
+                    out = [s[0] if s else None for s in singles]
+                if out is None:
+                    continue
+                for i, t in zip(todo, out):
+                    if t is not None:
+                        result[i] = (t, provider.name)
+                todo = [i for i, t in zip(todo, out) if t is None]
+            return result
+
+    async def translate_many_async(self, lines):
+        """Returns [(translation, provider)] aligned with lines. Blank lines and
+        lines no provider could translate come back unchanged with provider None."""
+        for name in self.buckets:
+            self.buckets[name] = TokenBucket(self.rate)
+
+        out = [(ln, None) for ln in lines]
+        idxs = [i for i, ln in enumerate(lines) if ln and not ln.isspace()]
+        chunks = [idxs[k:k + self.batch_size] for k in range(0, len(idxs), self.batch_size)]
+
+        sem = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*[
+            self._translate_chunk(sem, [lines[i][:MAX_CHARS] for i in chunk]) for chunk in chunks
+        ])
+        for chunk, res in zip(chunks, results):
+            for i, r in zip(chunk, res):
+                out[i] = r
+        return out
+
+    def translate_many(self, lines):
+        return asyncio.run(self.translate_many_async(list(lines)))
+
+
+def add_rate_arguments(parser, rate=5.0):
+    parser.add_argument("--rate", type=float, default=rate, help="Max requests/sec per provider")
+    parser.add_argument("--sleep", type=float, default=None,
+                        help="Deprecated: seconds between requests, same as --rate 1/SLEEP")
+
+
+def rate_from_args(args):
+    """--rate, or 1/--sleep for command lines written before --rate existed."""
+    if args.sleep is None:
+        return args.rate
+    print("⚠️ --sleep is deprecated; use --rate (requests/sec per provider)")
+    return 1.0 / args.sleep if args.sleep > 0 else args.rate
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    fail_rate = 0.0
+    latency = 0.05
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            self.send_response(503)
+            self.end_headers()
+            return
+        payload = json.dumps({"translations": [f"[sw] {q}" for q in body.get("q", [])]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_stub(port=8765, fail_rate=0.0, latency=0.05, background=False):
+    handler = type("StubHandler", (_StubHandler,), {"fail_rate": fail_rate, "latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Stub translation server on http://127.0.0.1:{server.server_port} (fail_rate={fail_rate})")
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("stub", help="Run a local stub translation server")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--fail-rate", type=float, default=0.0)
+    p.add_argument("--latency", type=float, default=0.05)
+
+    p = sub.add_parser("demo", help="Translate N synthetic lines and report throughput")
+    p.add_argument("--providers", nargs="+", default=["http"])
+    p.add_argument("--http-url", default=None, help="Default: start an in-process stub")
+    p.add_argument("--lines", type=int, default=200)
+    p.add_argument("--batch-size", type=int, default=10)
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--rate", type=float, default=20.0)
+    p.add_argument("--fail-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == "stub":
+        serve_stub(args.port, args.fail_rate, args.latency)
+        return
+
+    http_url = args.http_url
+    if "http" in args.providers and not http_url:
+        server = serve_stub(0, args.fail_rate, background=True)
+        http_url = f"http://127.0.0.1:{server.server_port}"
+
+    client = AsyncTranslateClient(
+        providers=args.providers,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        batch_size=args.batch_size,
+        http_url=http_url,
+    )
+    lines = [f"Line {i}: drink plenty of water and rest." for i in range(args.lines)]
+
+    t0 = time.perf_counter()
+    out = client.translate_many(lines)
+    dt = time.perf_counter() - t0
+
+    translated = sum(1 for _, provider in out if provider)
+    print(f"Translated {translated}/{len(lines)} lines in {dt:.2f}s ({len(lines) / dt:.1f} lines/sec)")
+    requests = len(lines) if client.providers[0].requests_per_line else -(-len(lines) // args.batch_size)
+    print(f"Rate-limit floor: {max(0.0, requests - args.rate) / args.rate:.2f}s (burst of {args.rate:g})")
+    print(json.dumps(client.stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()